@@ -0,0 +1,68 @@
+"""CPU cost of answering GetWeather from the response cache versus rebuilding it.
+
+    python benchmarks/bench_get_weather_response.py [iterations]
+
+Run it with the server settings available (server/.env or the environment).
+
+The miss path is what a hit used to cost before serialized responses were
+cached: building 14 Record messages and a Response from the service dicts,
+then serializing them. The hit path is the cache lookup plus the raw-bytes
+serializer the server is registered with.
+"""
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "server"), os.path.join(ROOT, "proto", "generated")]
+
+from core.cache import TTLCache  # noqa: E402
+from handlers.raw_bytes import _passthrough_serializer  # noqa: E402
+from handlers.weather_service_servicer import CachedResponse, build_response  # noqa: E402
+from proto.generated import weather_pb2  # noqa: E402
+
+
+def _records(days=14):
+    return {
+        f"2025-01-{day + 1:02d}": {
+            "temperature_2m_max_c": 10.0 + day,
+            "temperature_2m_min_c": 1.0 + day,
+            "precipitation_sum_mm": 0.25 * day,
+            "pressure_msl_mean_hpa": 1013.2,
+            "wind_speed_10m_max_kmh": 18.4,
+            "relative_humidity_2m_max_pct": 80,
+        }
+        for day in range(days)
+    }
+
+
+def _cpu_per_call(fn, iterations):
+    start = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - start) / iterations * 1e6
+
+
+def main(iterations=20000):
+    records = _records()
+    serializer = _passthrough_serializer(weather_pb2.Response)
+    cache = TTLCache()
+    key = ("london", "2025-01-07")
+    cache.set(key, CachedResponse(build_response("London", records)))
+    request = weather_pb2.Request(city="London")
+    conditional = weather_pb2.Request(city="London", if_none_match=cache.get(key).version)
+
+    rebuild = _cpu_per_call(lambda: serializer(build_response("London", records)), iterations)
+    hit = _cpu_per_call(lambda: serializer(cache.get(key).for_request(request)), iterations)
+    not_modified = _cpu_per_call(lambda: serializer(cache.get(key).for_request(conditional)), iterations)
+
+    print(f"iterations:        {iterations}")
+    print(f"rebuild+serialize: {rebuild:8.2f} us CPU/request")
+    print(f"cached bytes:      {hit:8.2f} us CPU/request")
+    print(f"saved:             {rebuild - hit:8.2f} us CPU/request ({rebuild / hit:.0f}x)")
+    print(f"not modified:      {not_modified:8.2f} us CPU/request "
+          f"({len(cache.get(key).not_modified_payload)} vs {len(cache.get(key).payload)} bytes)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
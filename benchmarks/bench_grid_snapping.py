@@ -0,0 +1,59 @@
+"""Forecast cache hit rate with grid-snapped keys on a synthetic coordinate workload.
+
+    python benchmarks/bench_grid_snapping.py [requests]
+
+Requests come from users scattered around a set of cities: city choice
+follows a Zipf-like popularity, and each point lies a few kilometres from
+the centre (GPS positions, map clicks). Every miss is one Open-Meteo fetch.
+Resolution 0 is the old behaviour of keying on the coordinates as given
+(here rounded to 4 decimals, about 11 m).
+"""
+import os
+import random
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "server")]
+
+from core.cache import TTLCache  # noqa: E402
+from utils.geo_index import snap_to_grid  # noqa: E402
+
+CITIES = 500
+SPREAD_KM = 4.0
+CACHE_ENTRIES = 2048
+
+
+def _workload(requests, seed=7):
+    rng = random.Random(seed)
+    centres = [(rng.uniform(-60, 70), rng.uniform(-180, 180)) for _ in range(CITIES)]
+    weights = [1 / (rank + 1) for rank in range(CITIES)]
+    spread_deg = SPREAD_KM / 111.0
+    for lat, lon in rng.choices(centres, weights, k=requests):
+        yield (
+            round(lat + rng.gauss(0, spread_deg), 4),
+            round(lon + rng.gauss(0, spread_deg), 4),
+        )
+
+
+def _run(points, resolution):
+    cache = TTLCache(CACHE_ENTRIES, ttl_seconds=3600)
+    fetches = 0
+    for lat, lon in points:
+        key = snap_to_grid(lat, lon, resolution)
+        if cache.get(key) is None:
+            fetches += 1
+            cache.set(key, True)
+    return fetches
+
+
+def main(requests=100_000):
+    points = list(_workload(requests))
+    print(f"requests: {requests}, cities: {CITIES}, spread: {SPREAD_KM} km, cache: {CACHE_ENTRIES} entries")
+    for resolution in (0, 0.05, 0.1, 0.25):
+        fetches = _run(points, resolution)
+        print(f"resolution {resolution:>4} deg: {fetches:7d} upstream fetches, "
+              f"hit rate {1 - fetches / requests:6.1%}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
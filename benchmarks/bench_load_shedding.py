@@ -0,0 +1,150 @@
+"""Goodput of a saturated server with and without load shedding.
+
+    python benchmarks/bench_load_shedding.py [seconds]
+
+Starts a gRPC server in a subprocess with the production interceptor
+(LoadShedInterceptor with a LoopLagMonitor) in front of a stand-in
+GetWeather: a little CPU, then DOWNSTREAM_SLOTS concurrent slots of
+DOWNSTREAM_SECONDS each, like a small Mongo pool or upstream limit. Calls
+beyond that queue inside the process. The benchmark measures the
+saturation rate with a closed loop, then offers 1x, 2x and 3x that rate
+open-loop (Poisson arrivals), each call with a DEADLINE_SECONDS deadline.
+Goodput is answers received within their deadline per second. A share of
+ExportWeather calls (BATCH_SHARE) shows batch work being shed first.
+
+The in-flight limit follows the usual sizing: saturation rate times the
+queueing delay you can afford (here half the deadline).
+"""
+import asyncio
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+import grpc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "server")]
+
+CPU_SECONDS = 0.0005
+DOWNSTREAM_SLOTS = 8
+DOWNSTREAM_SECONDS = 0.04
+DEADLINE_SECONDS = 0.5
+BATCH_SHARE = 0.1
+WEATHER = "/weather.WeatherService/GetWeather"
+EXPORT = "/weather.WeatherService/ExportWeather"
+
+
+def _burn(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def _serve(port, shedding, ready):
+    from core.config import get_settings
+    from core.loop_monitor import LoopLagMonitor
+    from interceptors.load_shed_interceptor import LoadShedInterceptor
+
+    async def main():
+        downstream = asyncio.Semaphore(DOWNSTREAM_SLOTS)
+
+        async def handle(request, context):
+            _burn(CPU_SECONDS)
+            async with downstream:
+                await asyncio.sleep(DOWNSTREAM_SECONDS)
+            return b"ok"
+
+        capacity = DOWNSTREAM_SLOTS / DOWNSTREAM_SECONDS
+        settings = get_settings().model_copy(update={
+            "LOAD_SHED_ENABLED": shedding,
+            "LOAD_SHED_MAX_IN_FLIGHT": int(capacity * DEADLINE_SECONDS / 2),
+        })
+        monitor = LoopLagMonitor(settings.LOOP_LAG_SAMPLE_INTERVAL_SECONDS)
+        monitor.start()
+        server = grpc.aio.server(interceptors=[LoadShedInterceptor(settings, monitor)])
+        server.add_generic_rpc_handlers((grpc.method_handlers_generic_handler("weather.WeatherService", {
+            "GetWeather": grpc.unary_unary_rpc_method_handler(handle),
+            "ExportWeather": grpc.unary_unary_rpc_method_handler(handle),
+        }),))
+        server.add_insecure_port(f"127.0.0.1:{port}")
+        await server.start()
+        ready.set()
+        await server.wait_for_termination()
+
+    asyncio.run(main())
+
+
+async def _closed_loop(target, seconds, callers=64):
+    done = 0
+    async with grpc.aio.insecure_channel(target) as channel:
+        call = channel.unary_unary(WEATHER)
+        end = time.perf_counter() + seconds
+
+        async def worker():
+            nonlocal done
+            while time.perf_counter() < end:
+                await call(b"")
+                done += 1
+        await asyncio.gather(*(worker() for _ in range(callers)))
+    return done / seconds
+
+
+async def _open_loop(target, rate, seconds):
+    results = {"good": 0, "late": 0, "shed": 0, "other": 0, "batch_shed": 0}
+    rng = random.Random(1)
+    async with grpc.aio.insecure_channel(target) as channel:
+        calls = {m: channel.unary_unary(m) for m in (WEATHER, EXPORT)}
+
+        async def one(method):
+            start = time.perf_counter()
+            try:
+                await calls[method](b"", timeout=DEADLINE_SECONDS)
+                results["good" if time.perf_counter() - start <= DEADLINE_SECONDS else "late"] += 1
+            except grpc.aio.AioRpcError as e:
+                if e.code() == grpc.StatusCode.RESOURCE_EXHAUSTED:
+                    results["batch_shed" if method == EXPORT else "shed"] += 1
+                elif e.code() == grpc.StatusCode.DEADLINE_EXCEEDED:
+                    results["late"] += 1
+                else:
+                    results["other"] += 1
+
+        tasks = []
+        end = time.perf_counter() + seconds
+        next_at = time.perf_counter()
+        while next_at < end:
+            method = EXPORT if rng.random() < BATCH_SHARE else WEATHER
+            tasks.append(asyncio.create_task(one(method)))
+            next_at += rng.expovariate(rate)
+            await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+        await asyncio.gather(*tasks)
+    return results
+
+
+def _with_server(shedding, port, fn):
+    ready = multiprocessing.Event()
+    proc = multiprocessing.Process(target=_serve, args=(port, shedding, ready), daemon=True)
+    proc.start()
+    ready.wait(30)
+    try:
+        return asyncio.run(fn(f"127.0.0.1:{port}"))
+    finally:
+        proc.terminate()
+        proc.join()
+
+
+def main(seconds=10):
+    capacity = _with_server(False, 50151, lambda t: _closed_loop(t, 3))
+    print(f"saturation ~{capacity:.0f} rps; {DOWNSTREAM_SLOTS} downstream slots of {DOWNSTREAM_SECONDS * 1000:.0f} ms, "
+          f"{DEADLINE_SECONDS * 1000:.0f} ms deadline, {BATCH_SHARE:.0%} exports")
+    for factor in (1, 2, 3):
+        for shedding in (False, True):
+            rate = capacity * factor
+            r = _with_server(shedding, 50152, lambda t: _open_loop(t, rate, seconds))
+            print(f"{factor}x {'shedding' if shedding else 'no shedding':12s} goodput {r['good'] / seconds:6.0f} rps  "
+                  f"late {r['late']:6d}  shed {r['shed']:6d}  exports shed {r['batch_shed']:5d}  errors {r['other']}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
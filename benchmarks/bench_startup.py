@@ -0,0 +1,109 @@
+"""Worker cold start: wall time and RSS from process start to the first served RPC.
+
+    python benchmarks/bench_startup.py [runs]
+
+Starts `server/server.py` the way the Docker image does (same PYTHONPATH,
+run from the directory holding `.env` and `logs/`), then polls GetWeather
+with an empty city until the server answers INVALID_ARGUMENT. That answer
+needs neither Mongo nor Open-Meteo, so it marks the first served RPC.
+Also reports how long importing the server module alone takes.
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import grpc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PYTHONPATH = os.pathsep.join(
+    [ROOT, os.path.join(ROOT, "server"), os.path.join(ROOT, "proto"), os.path.join(ROOT, "proto", "generated")]
+)
+sys.path[:0] = PYTHONPATH.split(os.pathsep)
+
+from proto.generated import weather_pb2  # noqa: E402
+import weather_pb2_grpc  # noqa: E402
+
+TARGET = "localhost:9092"
+TIMEOUT_SECONDS = 120
+
+
+def _env():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = PYTHONPATH + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+
+def _rss_kib(pid):
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _wait_first_rpc(proc):
+    deadline = time.monotonic() + TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with code {proc.returncode}")
+        # A fresh channel per attempt, so reconnect backoff never delays the answer.
+        with grpc.insecure_channel(TARGET) as channel:
+            stub = weather_pb2_grpc.WeatherServiceStub(channel)
+            try:
+                stub.GetWeather(weather_pb2.Request(city=""), timeout=0.5)
+                return
+            except grpc.RpcError as e:
+                if e.code() == grpc.StatusCode.INVALID_ARGUMENT:
+                    return
+        time.sleep(0.01)
+    raise TimeoutError("server did not answer in time")
+
+
+def measure_start():
+    started = time.monotonic()
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "server", "server.py")],
+        env=_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        _wait_first_rpc(proc)
+        elapsed = time.monotonic() - started
+        return elapsed, _rss_kib(proc.pid)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+
+def measure_import():
+    code = "import time; t = time.perf_counter(); import server; print(time.perf_counter() - t)"
+    out = subprocess.run(
+        [sys.executable, "-c", code], env=_env(), cwd=os.getcwd(),
+        capture_output=True, text=True, check=True,
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def main(runs=5):
+    os.makedirs("logs", exist_ok=True)
+    imports = [measure_import() for _ in range(runs)]
+    starts, rss = [], []
+    for _ in range(runs):
+        elapsed, kib = measure_start()
+        starts.append(elapsed)
+        if kib is not None:
+            rss.append(kib)
+
+    print(f"runs:                 {runs}")
+    print(f"import server.py:     {statistics.median(imports) * 1000:8.1f} ms (median)")
+    print(f"start -> first RPC:   {statistics.median(starts) * 1000:8.1f} ms (median)")
+    if rss:
+        print(f"RSS at first RPC:     {statistics.median(rss) / 1024:8.1f} MiB (median)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
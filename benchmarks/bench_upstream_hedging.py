@@ -0,0 +1,120 @@
+"""Open-Meteo client under load against an injected slow upstream.
+
+    python benchmarks/bench_upstream_hedging.py [requests] [concurrency]
+
+No network: the upstream is an httpx MockTransport that serves CAPACITY
+requests at a time (further requests queue, as an overloaded server would),
+takes BASE_SECONDS per request, and sends TAIL_RATE of them to a slow
+replica taking TAIL_SECONDS. Requests past QUEUE_LIMIT waiting are shed
+with 503.
+
+Three clients issue the same load:
+  unbounded  no limit, no retries, no hedging (what the service did before)
+  adaptive   AIMD limit and jittered retries
+  hedged     adaptive plus a duplicate request after the recent p95
+and the benchmark prints client-side latency quantiles, failures and how
+many requests reached the upstream.
+"""
+import asyncio
+import logging
+import os
+import random
+import statistics
+import sys
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "server")]
+
+from core.config import get_settings  # noqa: E402
+from services.open_meteo_client import OpenMeteoClient  # noqa: E402
+from utils.adaptive_limit import AdaptiveLimiter  # noqa: E402
+
+CAPACITY = 16
+QUEUE_LIMIT = 32
+BASE_SECONDS = 0.02
+TAIL_RATE = 0.05
+TAIL_SECONDS = 0.5
+# A few times the normal latency, as a deployment would configure it.
+LATENCY_TARGET_SECONDS = 0.1
+URL = "https://upstream.test/v1/forecast"
+
+
+class SlowUpstream:
+    def __init__(self, seed=7):
+        self.random = random.Random(seed)
+        self.workers = asyncio.Semaphore(CAPACITY)
+        self.waiting = 0
+        self.received = 0
+
+    async def __call__(self, request):
+        self.received += 1
+        if self.waiting >= QUEUE_LIMIT:
+            return httpx.Response(503)
+        self.waiting += 1
+        try:
+            async with self.workers:
+                self.waiting -= 1
+                slow = self.random.random() < TAIL_RATE
+                await asyncio.sleep(TAIL_SECONDS if slow else BASE_SECONDS)
+        except BaseException:
+            self.waiting -= 1
+            raise
+        return httpx.Response(200, json={})
+
+
+def _client(upstream, mode):
+    overrides = {
+        "OPEN_METEO_RETRY_BASE_SECONDS": 0.05,
+        "OPEN_METEO_LATENCY_TARGET_SECONDS": LATENCY_TARGET_SECONDS,
+        "OPEN_METEO_HEDGE_ENABLED": mode == "hedged",
+    }
+    limiter = None
+    if mode == "unbounded":
+        overrides["OPEN_METEO_RETRIES"] = 0
+        limiter = AdaptiveLimiter(initial=10**6, min_limit=10**6, max_limit=10**6)
+    settings = get_settings().model_copy(update=overrides)
+    http = httpx.AsyncClient(transport=httpx.MockTransport(upstream))
+    return OpenMeteoClient(settings, http=http, limiter=limiter)
+
+
+async def _run(mode, requests, concurrency):
+    upstream = SlowUpstream()
+    client = _client(upstream, mode)
+    loop = asyncio.get_running_loop()
+    latencies, failures = [], 0
+    users = asyncio.Semaphore(concurrency)
+
+    async def one():
+        nonlocal failures
+        async with users:
+            start = loop.time()
+            try:
+                await client.get(URL, {})
+                latencies.append(loop.time() - start)
+            except Exception:
+                failures += 1
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    await client.close()
+    latencies.sort()
+    q = lambda p: latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000 if latencies else float("nan")
+    median = statistics.median(latencies) * 1000 if latencies else float("nan")
+    print(f"{mode:10s} p50 {median:7.1f} ms  p95 {q(0.95):7.1f} ms  p99 {q(0.99):7.1f} ms  "
+          f"failed {failures:4d}  upstream requests {upstream.received:5d}  final limit {client.limiter.limit:6.1f}")
+
+
+def main(requests=2000, concurrency=None):
+    print(f"upstream capacity {CAPACITY}, {TAIL_RATE:.0%} of requests take {TAIL_SECONDS * 1000:.0f} ms")
+    # Below capacity the tail is the slow replica; above it, queueing and shedding.
+    for callers in ([concurrency] if concurrency else [CAPACITY // 2, CAPACITY * 4]):
+        print(f"\n{requests} requests, {callers} concurrent callers")
+        for mode in ("unbounded", "adaptive", "hedged"):
+            asyncio.run(_run(mode, requests, callers))
+
+
+if __name__ == "__main__":
+    logging.getLogger("services.open_meteo_client").setLevel(logging.ERROR)
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# NO CHECKED-IN PROTOBUF GENCODE
+# source: admin.proto
+# Protobuf Python Version: 6.31.1
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import runtime_version as _runtime_version
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+_runtime_version.ValidateProtobufRuntimeVersion(
+    _runtime_version.Domain.PUBLIC,
+    6,
+    31,
+    1,
+    '',
+    'admin.proto'
+)
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0b\x61\x64min.proto\x12\x05\x61\x64min\"X\n\x0eProfileRequest\x12\x0f\n\x07seconds\x18\x01 \x01(\x05\x12 \n\x04mode\x18\x02 \x01(\x0e\x32\x12.admin.ProfileMode\x12\x13\n\x0binterval_ms\x18\x03 \x01(\x05\"\xd2\x01\n\x0fProfileResponse\x12 \n\x04mode\x18\x01 \x01(\x0e\x32\x12.admin.ProfileMode\x12\x0c\n\x04\x64\x61ta\x18\x02 \x01(\x0c\x12\x0f\n\x07samples\x18\x03 \x01(\x03\x12\x46\n\x11samples_by_method\x18\x04 \x03(\x0b\x32+.admin.ProfileResponse.SamplesByMethodEntry\x1a\x36\n\x14SamplesByMethodEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x03:\x02\x38\x01*.\n\x0bProfileMode\x12\x08\n\x04WALL\x10\x00\x12\x07\n\x03\x43PU\x10\x01\x12\x0c\n\x08\x43PROFILE\x10\x02\x32H\n\x0c\x41\x64minService\x12\x38\n\x07Profile\x12\x15.admin.ProfileRequest\x1a\x16.admin.ProfileResponseb\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'admin_pb2', _globals)
+if not _descriptor._USE_C_DESCRIPTORS:
+  DESCRIPTOR._loaded_options = None
+  _globals['_PROFILERESPONSE_SAMPLESBYMETHODENTRY']._loaded_options = None
+  _globals['_PROFILERESPONSE_SAMPLESBYMETHODENTRY']._serialized_options = b'8\001'
+  _globals['_PROFILEMODE']._serialized_start=325
+  _globals['_PROFILEMODE']._serialized_end=371
+  _globals['_PROFILEREQUEST']._serialized_start=22
+  _globals['_PROFILEREQUEST']._serialized_end=110
+  _globals['_PROFILERESPONSE']._serialized_start=113
+  _globals['_PROFILERESPONSE']._serialized_end=323
+  _globals['_PROFILERESPONSE_SAMPLESBYMETHODENTRY']._serialized_start=269
+  _globals['_PROFILERESPONSE_SAMPLESBYMETHODENTRY']._serialized_end=323
+  _globals['_ADMINSERVICE']._serialized_start=373
+  _globals['_ADMINSERVICE']._serialized_end=445
+# @@protoc_insertion_point(module_scope)
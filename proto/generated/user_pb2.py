@@ -25,7 +25,7 @@ _sym_db = _symbol_database.Default()
 from google.api import annotations_pb2 as google_dot_api_dot_annotations__pb2
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\nuser.proto\x12\x04user\x1a\x1cgoogle/api/annotations.proto\">\n\rSignUpRequest\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\r\n\x05\x65mail\x18\x02 \x01(\t\x12\x10\n\x08password\x18\x03 \x01(\t\"!\n\x0eSignUpResponse\x12\x0f\n\x07user_id\x18\x01 \x01(\t\"-\n\x1cSendVerificationEmailRequest\x12\r\n\x05\x65mail\x18\x01 \x01(\t\"A\n\x1dSendVerificationEmailResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"2\n\x13\x43onfirmEmailRequest\x12\r\n\x05\x65mail\x18\x01 \x01(\t\x12\x0c\n\x04\x63ode\x18\x02 \x01(\t\"\'\n\x14\x43onfirmEmailResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\"/\n\x0cLoginRequest\x12\r\n\x05\x65mail\x18\x01 \x01(\t\x12\x10\n\x08password\x18\x02 \x01(\t\"=\n\rLoginResponse\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x0c\n\x04name\x18\x02 \x01(\t\x12\r\n\x05\x65mail\x18\x03 \x01(\t\"=\n\x13\x43reateApiKeyRequest\x12\x12\n\nuser_email\x18\x01 \x01(\t\x12\x12\n\ncreated_at\x18\x02 \x01(\t\"&\n\x10GetApiKeyRequest\x12\x12\n\nuser_email\x18\x01 \x01(\t\"C\n\nApiKeyInfo\x12\x12\n\nuser_email\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t\x12\x12\n\ncreated_at\x18\x03 \x01(\t\"2\n\x11GetApiKeyResponse\x12\x1d\n\x03key\x18\x01 \x01(\x0b\x32\x10.user.ApiKeyInfo\"\x1d\n\x0cGetMeRequest\x12\r\n\x05\x65mail\x18\x01 \x01(\t\"U\n\rGetMeResponse\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x0c\n\x04name\x18\x02 \x01(\t\x12\r\n\x05\x65mail\x18\x03 \x01(\t\x12\x16\n\x0e\x65mail_verified\x18\x04 \x01(\x08\x32\xd1\x05\n\x0bUserService\x12P\n\x06SignUp\x12\x13.user.SignUpRequest\x1a\x14.user.SignUpResponse\"\x1b\x82\xd3\xe4\x93\x02\x15\"\x10/v1/user/sign-up:\x01*\x12h\n\x0c\x43onfirmEmail\x12\x19.user.ConfirmEmailRequest\x1a\x1a.user.ConfirmEmailResponse\"!\x82\xd3\xe4\x93\x02\x1b\"\x16/v1/user/confirm-email:\x01*\x12\x8d\x01\n\x15SendVerificationEmail\x12\".user.SendVerificationEmailRequest\x1a#.user.SendVerificationEmailResponse\"+\x82\xd3\xe4\x93\x02%\" /v1/user/send-verification-email:\x01*\x12K\n\x05Login\x12\x12.user.LoginRequest\x1a\x13.user.LoginResponse\"\x19\x82\xd3\xe4\x93\x02\x13\"\x0e/v1/user/login:\x01*\x12Y\n\x0c\x43reateApiKey\x12\x19.user.CreateApiKeyRequest\x1a\x10.user.ApiKeyInfo\"\x1c\x82\xd3\xe4\x93\x02\x16\"\x11/v1/user/api-keys:\x01*\x12p\n\tGetApiKey\x12\x16.user.GetApiKeyRequest\x1a\x10.user.ApiKeyInfo\"9\x82\xd3\xe4\x93\x02\x33\x12\x10/v1/user/api-keyZ\x1f\x12\x1d/v1/user/api-key/{user_email}\x12\\\n\x05GetMe\x12\x12.user.GetMeRequest\x1a\x13.user.GetMeResponse\"*\x82\xd3\xe4\x93\x02$\x12\x0b/v1/user/meZ\x15\x12\x13/v1/user/me/{email}b\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\nuser.proto\x12\x04user\x1a\x1cgoogle/api/annotations.proto\">\n\rSignUpRequest\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\r\n\x05\x65mail\x18\x02 \x01(\t\x12\x10\n\x08password\x18\x03 \x01(\t\"!\n\x0eSignUpResponse\x12\x0f\n\x07user_id\x18\x01 \x01(\t\"-\n\x1cSendVerificationEmailRequest\x12\r\n\x05\x65mail\x18\x01 \x01(\t\"A\n\x1dSendVerificationEmailResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"2\n\x13\x43onfirmEmailRequest\x12\r\n\x05\x65mail\x18\x01 \x01(\t\x12\x0c\n\x04\x63ode\x18\x02 \x01(\t\"\'\n\x14\x43onfirmEmailResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\"/\n\x0cLoginRequest\x12\r\n\x05\x65mail\x18\x01 \x01(\t\x12\x10\n\x08password\x18\x02 \x01(\t\"g\n\rLoginResponse\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x0c\n\x04name\x18\x02 \x01(\t\x12\r\n\x05\x65mail\x18\x03 \x01(\t\x12\x14\n\x0c\x61\x63\x63\x65ss_token\x18\x04 \x01(\t\x12\x12\n\nexpires_at\x18\x05 \x01(\x03\"O\n\x13\x43reateApiKeyRequest\x12\x12\n\nuser_email\x18\x01 \x01(\t\x12\x12\n\ncreated_at\x18\x02 \x01(\t\x12\x10\n\x08ttl_days\x18\x03 \x01(\x05\"&\n\x10GetApiKeyRequest\x12\x12\n\nuser_email\x18\x01 \x01(\t\"g\n\nApiKeyInfo\x12\x12\n\nuser_email\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t\x12\x12\n\ncreated_at\x18\x03 \x01(\t\x12\x0e\n\x06prefix\x18\x04 \x01(\t\x12\x12\n\nexpires_at\x18\x05 \x01(\t\"2\n\x11GetApiKeyResponse\x12\x1d\n\x03key\x18\x01 \x01(\x0b\x32\x10.user.ApiKeyInfo\"\x1d\n\x0cGetMeRequest\x12\r\n\x05\x65mail\x18\x01 \x01(\t\"U\n\rGetMeResponse\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x0c\n\x04name\x18\x02 \x01(\t\x12\r\n\x05\x65mail\x18\x03 \x01(\t\x12\x16\n\x0e\x65mail_verified\x18\x04 \x01(\x08\x32\xd1\x05\n\x0bUserService\x12P\n\x06SignUp\x12\x13.user.SignUpRequest\x1a\x14.user.SignUpResponse\"\x1b\x82\xd3\xe4\x93\x02\x15\"\x10/v1/user/sign-up:\x01*\x12h\n\x0c\x43onfirmEmail\x12\x19.user.ConfirmEmailRequest\x1a\x1a.user.ConfirmEmailResponse\"!\x82\xd3\xe4\x93\x02\x1b\"\x16/v1/user/confirm-email:\x01*\x12\x8d\x01\n\x15SendVerificationEmail\x12\".user.SendVerificationEmailRequest\x1a#.user.SendVerificationEmailResponse\"+\x82\xd3\xe4\x93\x02%\" /v1/user/send-verification-email:\x01*\x12K\n\x05Login\x12\x12.user.LoginRequest\x1a\x13.user.LoginResponse\"\x19\x82\xd3\xe4\x93\x02\x13\"\x0e/v1/user/login:\x01*\x12Y\n\x0c\x43reateApiKey\x12\x19.user.CreateApiKeyRequest\x1a\x10.user.ApiKeyInfo\"\x1c\x82\xd3\xe4\x93\x02\x16\"\x11/v1/user/api-keys:\x01*\x12p\n\tGetApiKey\x12\x16.user.GetApiKeyRequest\x1a\x10.user.ApiKeyInfo\"9\x82\xd3\xe4\x93\x02\x33\x12\x10/v1/user/api-keyZ\x1f\x12\x1d/v1/user/api-key/{user_email}\x12\\\n\x05GetMe\x12\x12.user.GetMeRequest\x1a\x13.user.GetMeResponse\"*\x82\xd3\xe4\x93\x02$\x12\x0b/v1/user/meZ\x15\x12\x13/v1/user/me/{email}b\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -61,19 +61,19 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_LOGINREQUEST']._serialized_start=356
   _globals['_LOGINREQUEST']._serialized_end=403
   _globals['_LOGINRESPONSE']._serialized_start=405
-  _globals['_LOGINRESPONSE']._serialized_end=466
-  _globals['_CREATEAPIKEYREQUEST']._serialized_start=468
-  _globals['_CREATEAPIKEYREQUEST']._serialized_end=529
-  _globals['_GETAPIKEYREQUEST']._serialized_start=531
-  _globals['_GETAPIKEYREQUEST']._serialized_end=569
-  _globals['_APIKEYINFO']._serialized_start=571
-  _globals['_APIKEYINFO']._serialized_end=638
-  _globals['_GETAPIKEYRESPONSE']._serialized_start=640
-  _globals['_GETAPIKEYRESPONSE']._serialized_end=690
-  _globals['_GETMEREQUEST']._serialized_start=692
-  _globals['_GETMEREQUEST']._serialized_end=721
-  _globals['_GETMERESPONSE']._serialized_start=723
-  _globals['_GETMERESPONSE']._serialized_end=808
-  _globals['_USERSERVICE']._serialized_start=811
-  _globals['_USERSERVICE']._serialized_end=1532
+  _globals['_LOGINRESPONSE']._serialized_end=508
+  _globals['_CREATEAPIKEYREQUEST']._serialized_start=510
+  _globals['_CREATEAPIKEYREQUEST']._serialized_end=589
+  _globals['_GETAPIKEYREQUEST']._serialized_start=591
+  _globals['_GETAPIKEYREQUEST']._serialized_end=629
+  _globals['_APIKEYINFO']._serialized_start=631
+  _globals['_APIKEYINFO']._serialized_end=734
+  _globals['_GETAPIKEYRESPONSE']._serialized_start=736
+  _globals['_GETAPIKEYRESPONSE']._serialized_end=786
+  _globals['_GETMEREQUEST']._serialized_start=788
+  _globals['_GETMEREQUEST']._serialized_end=817
+  _globals['_GETMERESPONSE']._serialized_start=819
+  _globals['_GETMERESPONSE']._serialized_end=904
+  _globals['_USERSERVICE']._serialized_start=907
+  _globals['_USERSERVICE']._serialized_end=1628
 # @@protoc_insertion_point(module_scope)
@@ -25,7 +25,7 @@ _sym_db = _symbol_database.Default()
 from google.api import annotations_pb2 as google_dot_api_dot_annotations__pb2
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\rweather.proto\x12\x07weather\x1a\x1cgoogle/api/annotations.proto\"\x17\n\x07Request\x12\x0c\n\x04\x63ity\x18\x01 \x01(\t\"L\n\x08Response\x12\x0c\n\x04\x63ity\x18\x01 \x01(\t\x12\x10\n\x08timezone\x18\x02 \x01(\t\x12 \n\x07records\x18\x03 \x03(\x0b\x32\x0f.weather.Record\"\xd5\x01\n\x06Record\x12\x0c\n\x04\x64\x61te\x18\x01 \x01(\t\x12\x1c\n\x14temperature_2m_max_c\x18\x02 \x01(\x01\x12\x1c\n\x14temperature_2m_min_c\x18\x03 \x01(\x01\x12\x1c\n\x14precipitation_sum_mm\x18\x04 \x01(\x01\x12\x1d\n\x15pressure_msl_mean_hpa\x18\x05 \x01(\x01\x12\x1e\n\x16wind_speed_10m_max_kmh\x18\x06 \x01(\x01\x12$\n\x1crelative_humidity_2m_max_pct\x18\x07 \x01(\x05\x32n\n\x0eWeatherService\x12\\\n\nGetWeather\x12\x10.weather.Request\x1a\x11.weather.Response\")\x82\xd3\xe4\x93\x02#\x12\x0b/v1/weatherZ\x14\x12\x12/v1/weather/{city}b\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\rweather.proto\x12\x07weather\x1a\x1cgoogle/api/annotations.proto\"k\n\x07Request\x12\x0c\n\x04\x63ity\x18\x01 \x01(\t\x12\x15\n\rif_none_match\x18\x02 \x01(\t\x12\x11\n\tvariables\x18\x03 \x03(\t\x12\x11\n\tpast_days\x18\x04 \x01(\x05\x12\x15\n\rforecast_days\x18\x05 \x01(\x05\"\x98\x01\n\x08Response\x12\x0c\n\x04\x63ity\x18\x01 \x01(\t\x12\x10\n\x08timezone\x18\x02 \x01(\t\x12 \n\x07records\x18\x03 \x03(\x0b\x32\x0f.weather.Record\x12\x0f\n\x07version\x18\x04 \x01(\t\x12\x14\n\x0cnot_modified\x18\x05 \x01(\x08\x12\x10\n\x08latitude\x18\x06 \x01(\x01\x12\x11\n\tlongitude\x18\x07 \x01(\x01\"\x8d\x01\n\x12\x43oordinatesRequest\x12\x10\n\x08latitude\x18\x01 \x01(\x01\x12\x11\n\tlongitude\x18\x02 \x01(\x01\x12\x15\n\rif_none_match\x18\x03 \x01(\t\x12\x11\n\tvariables\x18\x04 \x03(\t\x12\x11\n\tpast_days\x18\x05 \x01(\x05\x12\x15\n\rforecast_days\x18\x06 \x01(\x05\"\xd5\x01\n\x06Record\x12\x0c\n\x04\x64\x61te\x18\x01 \x01(\t\x12\x1c\n\x14temperature_2m_max_c\x18\x02 \x01(\x01\x12\x1c\n\x14temperature_2m_min_c\x18\x03 \x01(\x01\x12\x1c\n\x14precipitation_sum_mm\x18\x04 \x01(\x01\x12\x1d\n\x15pressure_msl_mean_hpa\x18\x05 \x01(\x01\x12\x1e\n\x16wind_speed_10m_max_kmh\x18\x06 \x01(\x01\x12$\n\x1crelative_humidity_2m_max_pct\x18\x07 \x01(\x05\"\x83\x01\n\x0eHistoryRequest\x12\x0c\n\x04\x63ity\x18\x01 \x01(\t\x12\x12\n\nstart_date\x18\x02 \x01(\t\x12\x10\n\x08\x65nd_date\x18\x03 \x01(\t\x12\x12\n\nmax_points\x18\x04 \x01(\x05\x12)\n\x06method\x18\x05 \x01(\x0e\x32\x19.weather.DownsampleMethod\"f\n\x0fHistoryResponse\x12\x0c\n\x04\x63ity\x18\x01 \x01(\t\x12\x12\n\nstart_date\x18\x02 \x01(\t\x12\x10\n\x08\x65nd_date\x18\x03 \x01(\t\x12\x1f\n\x06series\x18\x04 \x03(\x0b\x32\x0f.weather.Series\"P\n\x06Series\x12\x10\n\x08variable\x18\x01 \x01(\t\x12\r\n\x05\x64\x61tes\x18\x02 \x03(\t\x12\x0e\n\x06values\x18\x03 \x03(\x01\x12\x15\n\rsource_points\x18\x04 \x01(\x05\"\x84\x01\n\rExportRequest\x12\x0e\n\x06\x63ities\x18\x01 \x03(\t\x12\x12\n\nstart_date\x18\x02 \x01(\t\x12\x10\n\x08\x65nd_date\x18\x03 \x01(\t\x12)\n\x08\x65ncoding\x18\x04 \x01(\x0e\x32\x17.weather.ExportEncoding\x12\x12\n\nchunk_days\x18\x05 \x01(\x05\"*\n\x06\x43olumn\x12\x10\n\x08variable\x18\x01 \x01(\t\x12\x0e\n\x06values\x18\x02 \x03(\x01\"n\n\x0b\x45xportChunk\x12\x0c\n\x04\x63ity\x18\x01 \x01(\t\x12 \n\x07records\x18\x02 \x03(\x0b\x32\x0f.weather.Record\x12\r\n\x05\x64\x61tes\x18\x03 \x03(\t\x12 \n\x07\x63olumns\x18\x04 \x03(\x0b\x32\x0f.weather.Column\"?\n\rHourlyRequest\x12\x0c\n\x04\x63ity\x18\x01 \x01(\t\x12\r\n\x05hours\x18\x02 \x01(\x05\x12\x11\n\tvariables\x18\x03 \x03(\t\"\x83\x02\n\x0eHourlyResponse\x12\x0c\n\x04\x63ity\x18\x01 \x01(\t\x12\x12\n\nstart_time\x18\x02 \x01(\x03\x12\x18\n\x10interval_seconds\x18\x03 \x01(\x05\x12\x1a\n\x12utc_offset_seconds\x18\x04 \x01(\x05\x12\r\n\x05\x63ount\x18\x05 \x01(\x05\x12\x18\n\x10temperature_2m_c\x18\x06 \x03(\x02\x12 \n\x18relative_humidity_2m_pct\x18\x07 \x03(\x02\x12\x18\n\x10precipitation_mm\x18\x08 \x03(\x02\x12\x18\n\x10pressure_msl_hpa\x18\t \x03(\x02\x12\x1a\n\x12wind_speed_10m_kmh\x18\n \x03(\x02\"4\n\x13\x41utocompleteRequest\x12\x0e\n\x06prefix\x18\x01 \x01(\t\x12\r\n\x05limit\x18\x02 \x01(\x05\"x\n\x0e\x43itySuggestion\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0f\n\x07\x63ountry\x18\x02 \x01(\t\x12\x0e\n\x06\x61\x64min1\x18\x03 \x01(\t\x12\x10\n\x08latitude\x18\x04 \x01(\x01\x12\x11\n\tlongitude\x18\x05 \x01(\x01\x12\x12\n\npopulation\x18\x06 \x01(\x03\"D\n\x14\x41utocompleteResponse\x12,\n\x0bsuggestions\x18\x01 \x03(\x0b\x32\x17.weather.CitySuggestion*)\n\x10\x44ownsampleMethod\x12\x08\n\x04LTTB\x10\x00\x12\x0b\n\x07MIN_MAX\x10\x01*1\n\x0e\x45xportEncoding\x12\x0b\n\x07RECORDS\x10\x00\x12\x12\n\x0ePACKED_COLUMNS\x10\x01\x32\xf8\x04\n\x0eWeatherService\x12\\\n\nGetWeather\x12\x10.weather.Request\x1a\x11.weather.Response\")\x82\xd3\xe4\x93\x02#\x12\x0b/v1/weatherZ\x14\x12\x12/v1/weather/{city}\x12\x61\n\x17GetWeatherByCoordinates\x12\x1b.weather.CoordinatesRequest\x1a\x11.weather.Response\"\x16\x82\xd3\xe4\x93\x02\x10\x12\x0e/v1/weather-at\x12j\n\x11GetWeatherHistory\x12\x17.weather.HistoryRequest\x1a\x18.weather.HistoryResponse\"\"\x82\xd3\xe4\x93\x02\x1c\x12\x1a/v1/weather/{city}/history\x12^\n\rExportWeather\x12\x16.weather.ExportRequest\x1a\x14.weather.ExportChunk\"\x1d\x82\xd3\xe4\x93\x02\x17\"\x12/v1/weather/export:\x01*0\x01\x12g\n\x11GetHourlyForecast\x12\x16.weather.HourlyRequest\x1a\x17.weather.HourlyResponse\"!\x82\xd3\xe4\x93\x02\x1b\x12\x19/v1/weather/{city}/hourly\x12p\n\x10\x41utocompleteCity\x12\x1c.weather.AutocompleteRequest\x1a\x1d.weather.AutocompleteResponse\"\x1f\x82\xd3\xe4\x93\x02\x19\x12\x17/v1/cities/autocompleteb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -34,12 +34,50 @@ if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
   _globals['_WEATHERSERVICE'].methods_by_name['GetWeather']._loaded_options = None
   _globals['_WEATHERSERVICE'].methods_by_name['GetWeather']._serialized_options = b'\202\323\344\223\002#\022\013/v1/weatherZ\024\022\022/v1/weather/{city}'
+  _globals['_WEATHERSERVICE'].methods_by_name['GetWeatherByCoordinates']._loaded_options = None
+  _globals['_WEATHERSERVICE'].methods_by_name['GetWeatherByCoordinates']._serialized_options = b'\202\323\344\223\002\020\022\016/v1/weather-at'
+  _globals['_WEATHERSERVICE'].methods_by_name['GetWeatherHistory']._loaded_options = None
+  _globals['_WEATHERSERVICE'].methods_by_name['GetWeatherHistory']._serialized_options = b'\202\323\344\223\002\034\022\032/v1/weather/{city}/history'
+  _globals['_WEATHERSERVICE'].methods_by_name['ExportWeather']._loaded_options = None
+  _globals['_WEATHERSERVICE'].methods_by_name['ExportWeather']._serialized_options = b'\202\323\344\223\002\027\"\022/v1/weather/export:\001*'
+  _globals['_WEATHERSERVICE'].methods_by_name['GetHourlyForecast']._loaded_options = None
+  _globals['_WEATHERSERVICE'].methods_by_name['GetHourlyForecast']._serialized_options = b'\202\323\344\223\002\033\022\031/v1/weather/{city}/hourly'
+  _globals['_WEATHERSERVICE'].methods_by_name['AutocompleteCity']._loaded_options = None
+  _globals['_WEATHERSERVICE'].methods_by_name['AutocompleteCity']._serialized_options = b'\202\323\344\223\002\031\022\027/v1/cities/autocomplete'
+  _globals['_DOWNSAMPLEMETHOD']._serialized_start=1864
+  _globals['_DOWNSAMPLEMETHOD']._serialized_end=1905
+  _globals['_EXPORTENCODING']._serialized_start=1907
+  _globals['_EXPORTENCODING']._serialized_end=1956
   _globals['_REQUEST']._serialized_start=56
-  _globals['_REQUEST']._serialized_end=79
-  _globals['_RESPONSE']._serialized_start=81
-  _globals['_RESPONSE']._serialized_end=157
-  _globals['_RECORD']._serialized_start=160
-  _globals['_RECORD']._serialized_end=373
-  _globals['_WEATHERSERVICE']._serialized_start=375
-  _globals['_WEATHERSERVICE']._serialized_end=485
+  _globals['_REQUEST']._serialized_end=163
+  _globals['_RESPONSE']._serialized_start=166
+  _globals['_RESPONSE']._serialized_end=318
+  _globals['_COORDINATESREQUEST']._serialized_start=321
+  _globals['_COORDINATESREQUEST']._serialized_end=462
+  _globals['_RECORD']._serialized_start=465
+  _globals['_RECORD']._serialized_end=678
+  _globals['_HISTORYREQUEST']._serialized_start=681
+  _globals['_HISTORYREQUEST']._serialized_end=812
+  _globals['_HISTORYRESPONSE']._serialized_start=814
+  _globals['_HISTORYRESPONSE']._serialized_end=916
+  _globals['_SERIES']._serialized_start=918
+  _globals['_SERIES']._serialized_end=998
+  _globals['_EXPORTREQUEST']._serialized_start=1001
+  _globals['_EXPORTREQUEST']._serialized_end=1133
+  _globals['_COLUMN']._serialized_start=1135
+  _globals['_COLUMN']._serialized_end=1177
+  _globals['_EXPORTCHUNK']._serialized_start=1179
+  _globals['_EXPORTCHUNK']._serialized_end=1289
+  _globals['_HOURLYREQUEST']._serialized_start=1291
+  _globals['_HOURLYREQUEST']._serialized_end=1354
+  _globals['_HOURLYRESPONSE']._serialized_start=1357
+  _globals['_HOURLYRESPONSE']._serialized_end=1616
+  _globals['_AUTOCOMPLETEREQUEST']._serialized_start=1618
+  _globals['_AUTOCOMPLETEREQUEST']._serialized_end=1670
+  _globals['_CITYSUGGESTION']._serialized_start=1672
+  _globals['_CITYSUGGESTION']._serialized_end=1792
+  _globals['_AUTOCOMPLETERESPONSE']._serialized_start=1794
+  _globals['_AUTOCOMPLETERESPONSE']._serialized_end=1862
+  _globals['_WEATHERSERVICE']._serialized_start=1959
+  _globals['_WEATHERSERVICE']._serialized_end=2591
 # @@protoc_insertion_point(module_scope)
@@ -39,6 +39,31 @@ class WeatherServiceStub(object):
                 request_serializer=weather__pb2.Request.SerializeToString,
                 response_deserializer=weather__pb2.Response.FromString,
                 _registered_method=True)
+        self.GetWeatherByCoordinates = channel.unary_unary(
+                '/weather.WeatherService/GetWeatherByCoordinates',
+                request_serializer=weather__pb2.CoordinatesRequest.SerializeToString,
+                response_deserializer=weather__pb2.Response.FromString,
+                _registered_method=True)
+        self.GetWeatherHistory = channel.unary_unary(
+                '/weather.WeatherService/GetWeatherHistory',
+                request_serializer=weather__pb2.HistoryRequest.SerializeToString,
+                response_deserializer=weather__pb2.HistoryResponse.FromString,
+                _registered_method=True)
+        self.ExportWeather = channel.unary_stream(
+                '/weather.WeatherService/ExportWeather',
+                request_serializer=weather__pb2.ExportRequest.SerializeToString,
+                response_deserializer=weather__pb2.ExportChunk.FromString,
+                _registered_method=True)
+        self.GetHourlyForecast = channel.unary_unary(
+                '/weather.WeatherService/GetHourlyForecast',
+                request_serializer=weather__pb2.HourlyRequest.SerializeToString,
+                response_deserializer=weather__pb2.HourlyResponse.FromString,
+                _registered_method=True)
+        self.AutocompleteCity = channel.unary_unary(
+                '/weather.WeatherService/AutocompleteCity',
+                request_serializer=weather__pb2.AutocompleteRequest.SerializeToString,
+                response_deserializer=weather__pb2.AutocompleteResponse.FromString,
+                _registered_method=True)
 
 
 class WeatherServiceServicer(object):
@@ -50,6 +75,37 @@ class WeatherServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def GetWeatherByCoordinates(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetWeatherHistory(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ExportWeather(self, request, context):
+        """Bulk extraction of stored daily records, streamed city by city in chunks.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetHourlyForecast(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def AutocompleteCity(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_WeatherServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -58,6 +114,31 @@ def add_WeatherServiceServicer_to_server(servicer, server):
                     request_deserializer=weather__pb2.Request.FromString,
                     response_serializer=weather__pb2.Response.SerializeToString,
             ),
+            'GetWeatherByCoordinates': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetWeatherByCoordinates,
+                    request_deserializer=weather__pb2.CoordinatesRequest.FromString,
+                    response_serializer=weather__pb2.Response.SerializeToString,
+            ),
+            'GetWeatherHistory': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetWeatherHistory,
+                    request_deserializer=weather__pb2.HistoryRequest.FromString,
+                    response_serializer=weather__pb2.HistoryResponse.SerializeToString,
+            ),
+            'ExportWeather': grpc.unary_stream_rpc_method_handler(
+                    servicer.ExportWeather,
+                    request_deserializer=weather__pb2.ExportRequest.FromString,
+                    response_serializer=weather__pb2.ExportChunk.SerializeToString,
+            ),
+            'GetHourlyForecast': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetHourlyForecast,
+                    request_deserializer=weather__pb2.HourlyRequest.FromString,
+                    response_serializer=weather__pb2.HourlyResponse.SerializeToString,
+            ),
+            'AutocompleteCity': grpc.unary_unary_rpc_method_handler(
+                    servicer.AutocompleteCity,
+                    request_deserializer=weather__pb2.AutocompleteRequest.FromString,
+                    response_serializer=weather__pb2.AutocompleteResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'weather.WeatherService', rpc_method_handlers)
@@ -95,3 +176,138 @@ class WeatherService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def GetWeatherByCoordinates(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/weather.WeatherService/GetWeatherByCoordinates',
+            weather__pb2.CoordinatesRequest.SerializeToString,
+            weather__pb2.Response.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetWeatherHistory(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/weather.WeatherService/GetWeatherHistory',
+            weather__pb2.HistoryRequest.SerializeToString,
+            weather__pb2.HistoryResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def ExportWeather(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/weather.WeatherService/ExportWeather',
+            weather__pb2.ExportRequest.SerializeToString,
+            weather__pb2.ExportChunk.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetHourlyForecast(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/weather.WeatherService/GetHourlyForecast',
+            weather__pb2.HourlyRequest.SerializeToString,
+            weather__pb2.HourlyResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def AutocompleteCity(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/weather.WeatherService/AutocompleteCity',
+            weather__pb2.AutocompleteRequest.SerializeToString,
+            weather__pb2.AutocompleteResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
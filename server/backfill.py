@@ -0,0 +1,63 @@
+"""Load archive daily weather for a list of cities into MongoDB.
+
+    python backfill.py cities.txt --start 2015-01-01 --end 2024-12-31
+
+The city file holds one name per line (blank lines and lines starting with
+'#' are ignored). Progress is checkpointed per city, so rerunning the same
+command after an interruption resumes where it stopped.
+"""
+import argparse
+import asyncio
+import logging
+from datetime import date, timedelta
+
+from core.lifecycle import run_shutdown_hooks
+from db.mongo_client import init_client, close_client
+from services.backfill_service import BackfillService, DEFAULT_WINDOW_DAYS
+from services.weather_service import WeatherService
+
+logger = logging.getLogger(__name__)
+
+
+def read_cities(path: str):
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Backfill archive daily weather for many cities.")
+    parser.add_argument("cities", help="file with one city name per line")
+    parser.add_argument("--start", type=date.fromisoformat, required=True, help="first day, YYYY-MM-DD")
+    # The archive lags a few days behind today.
+    parser.add_argument("--end", type=date.fromisoformat, default=date.today() - timedelta(days=6),
+                        help="last day, YYYY-MM-DD (default: six days ago)")
+    parser.add_argument("--checkpoint", default="backfill_checkpoint.json", help="progress file")
+    parser.add_argument("--concurrency", type=int, help="parallel archive requests")
+    parser.add_argument("--rpm", type=int, help="upstream requests per minute, across all tasks")
+    parser.add_argument("--window-days", type=int, default=DEFAULT_WINDOW_DAYS, help="days per archive request")
+    return parser.parse_args(argv)
+
+
+async def main(argv=None):
+    args = parse_args(argv)
+    init_client()
+    weather = WeatherService()
+    try:
+        await weather.init()
+        backfill = BackfillService(
+            weather,
+            checkpoint_path=args.checkpoint,
+            concurrency=args.concurrency,
+            requests_per_minute=args.rpm,
+            window_days=args.window_days,
+        )
+        stats = await backfill.run(read_cities(args.cities), args.start, args.end)
+        return 1 if stats["failed"] else 0
+    finally:
+        await run_shutdown_hooks()
+        await close_client()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="[%(asctime)s] %(levelname)s - %(name)s %(message)s")
+    raise SystemExit(asyncio.run(main()))
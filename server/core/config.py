@@ -14,19 +14,135 @@ class Settings(BaseSettings):
 	EXPECTED_API_KEY: str
 	PUBLIC_METHODS: str = ""
 	API_KEY_METHODS: str = ""
+	# Access tokens: comma separated "kid:secret" pairs. Tokens are signed with
+	# TOKEN_ACTIVE_KID (default: the first key) and accepted with any listed key.
+	TOKEN_SIGNING_KEYS: str = ""
+	TOKEN_ACTIVE_KID: str = ""
+	ACCESS_TOKEN_TTL_SECONDS: int = 900
+	# Lifetime of new API keys; 0 means they do not expire.
+	API_KEY_TTL_DAYS: int = 365
+	# Per-key limits by tier: comma separated "tier:requests_per_minute:burst"; 0 requests means unlimited.
+	RATE_LIMIT_TIERS: str = "free:60:20,pro:600:100"
+	DEFAULT_API_KEY_TIER: str = "free"
+	# Per-key daily usage is counted in memory and written to Mongo this often.
+	USAGE_FLUSH_INTERVAL_SECONDS: float = 10
 	DB_URL: str
+	DB_NAME: str = "climatechart"
+	MONGO_MAX_POOL_SIZE: int = 100
+	MONGO_MIN_POOL_SIZE: int = 10
+	MONGO_MAX_IDLE_TIME_MS: int = 300_000
+	MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 5_000
+	MONGO_CONNECT_TIMEOUT_MS: int = 5_000
+	MONGO_SOCKET_TIMEOUT_MS: int = 10_000
+	MONGO_MAX_TIME_MS: int = 5_000
+	# Command latency histograms; slower commands are logged with their filter shape and plan.
+	MONGO_MONITORING_ENABLED: bool = True
+	MONGO_SLOW_OP_MS: float = 100
+	MONGO_EXPLAIN_SLOW_OPS: bool = True
+	MONGO_EXPLAIN_INTERVAL_SECONDS: float = 600
 	API_URL: str
+	GEOCODING_API_URL: str = "https://geocoding-api.open-meteo.com/v1/search"
+	ARCHIVE_API_URL: str = "https://archive-api.open-meteo.com/v1/archive"
+	# Open-Meteo client: adaptive cap on in-flight requests, retries and hedging.
+	OPEN_METEO_TIMEOUT_SECONDS: float = 10
+	OPEN_METEO_CONCURRENCY_INITIAL: int = 16
+	OPEN_METEO_CONCURRENCY_MIN: int = 2
+	OPEN_METEO_CONCURRENCY_MAX: int = 128
+	# Answers slower than this are taken as upstream queueing and shrink the limit.
+	OPEN_METEO_LATENCY_TARGET_SECONDS: float = 2.0
+	OPEN_METEO_RETRIES: int = 2
+	OPEN_METEO_RETRY_BASE_SECONDS: float = 0.2
+	# Send a second copy of a request still unanswered after this quantile of recent latencies.
+	OPEN_METEO_HEDGE_ENABLED: bool = False
+	OPEN_METEO_HEDGE_QUANTILE: float = 0.95
+	# HTTP caching of Open-Meteo GETs by their Cache-Control/ETag; tiers as for the forecast cache, empty disables.
+	OPEN_METEO_HTTP_CACHE_TIERS: str = "memory"
+	OPEN_METEO_HTTP_CACHE_MAX_ENTRIES: int = 1024
+	# How long a stale entry with an ETag or Last-Modified is kept for conditional revalidation.
+	OPEN_METEO_HTTP_CACHE_STALE_SECONDS: float = 86400
+	OPEN_METEO_HTTP_CACHE_MAX_BODY_BYTES: int = 4 * 1024 * 1024
 
 	DEFAULT_SENDER: str
 	PASSWORD: str
 	TEMPLATE_UUID: str
 
+	GRPC_PORT: int = 9092
+	HEALTH_CHECK_INTERVAL_SECONDS: float = 10
+	# On SIGTERM: report NOT_SERVING, wait so the proxy notices, then drain in-flight RPCs.
+	# At least the proxy's check interval times its unhealthy threshold (Envoy: 5s x 2).
+	SHUTDOWN_READINESS_DELAY_SECONDS: float = 10
+	SHUTDOWN_GRACE_SECONDS: float = 20
+
+	# Optional CSV (name,country,admin1,latitude,longitude,population) seeding city autocomplete.
+	CITY_GAZETTEER_PATH: str = ""
+
+	HISTORY_CACHE_TTL_SECONDS: int = 600
+	HISTORY_CACHE_MAX_ENTRIES: int = 512
+	FORECAST_CACHE_TTL_SECONDS: int = 3600
+	FORECAST_CACHE_MAX_ENTRIES: int = 2048
+	# Forecasts are fetched and cached per grid cell (~11 km at 0.1 deg); 0 keys on exact coordinates.
+	FORECAST_GRID_RESOLUTION_DEG: float = 0.1
+	# Coordinate lookups report the nearest known city within this distance.
+	NEAREST_CITY_MAX_KM: float = 25
+	# Forecast and geocode cache tiers, fastest first: any of memory, sqlite, mongo, redis.
+	FORECAST_CACHE_TIERS: str = "memory"
+	GEOCODE_CACHE_TIERS: str = "memory"
+	GEOCODE_CACHE_TTL_SECONDS: int = 30 * 86400
+	GEOCODE_CACHE_MAX_ENTRIES: int = 4096
+	CACHE_SQLITE_PATH: str = "cache/cache.sqlite3"
+	CACHE_MONGO_COLLECTION: str = "cache"
+	CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+	CACHE_REDIS_TIMEOUT_SECONDS: float = 0.5
+	RESPONSE_CACHE_TTL_SECONDS: int = 3600
+	RESPONSE_CACHE_MAX_ENTRIES: int = 2048
+
+	# Load shedding: past these, lower-priority calls are rejected first (batch at half of them, sign-in at 1.5x).
+	# Size the in-flight limit as sustainable requests/second times the queueing delay clients can afford.
+	LOAD_SHED_ENABLED: bool = True
+	LOAD_SHED_MAX_IN_FLIGHT: int = 256
+	LOAD_SHED_MAX_LOOP_LAG_MS: float = 100
+	LOOP_LAG_SAMPLE_INTERVAL_SECONDS: float = 0.05
+	# Debug: log the stack and RPC method of any callback holding the event loop this long.
+	LOOP_WATCHDOG_ENABLED: bool = False
+	LOOP_BLOCK_THRESHOLD_MS: float = 100
+
+	# Admin RPCs (profiling) on a separate, unproxied port; off while ADMIN_API_KEY is empty.
+	ADMIN_API_KEY: str = ""
+	ADMIN_KEY_HEADER: str = "x-admin-key"
+	ADMIN_GRPC_ADDRESS: str = "127.0.0.1:9093"
+	PROFILE_MAX_SECONDS: int = 60
+	PROFILE_SAMPLE_INTERVAL_MS: float = 5
+
+	# Concurrent ExportWeather streams; further exports are rejected so they cannot starve GetWeather.
+	EXPORT_MAX_CONCURRENT: int = 2
+
+	# Historical backfill (backfill.py): parallel archive requests and the shared request budget.
+	BACKFILL_CONCURRENCY: int = 4
+	BACKFILL_REQUESTS_PER_MINUTE: int = 300
+
+	# Fetched forecasts are persisted from a background queue instead of in the request.
+	WRITE_BEHIND_ENABLED: bool = True
+	WRITE_BEHIND_BATCH_SIZE: int = 500
+	WRITE_BEHIND_FLUSH_INTERVAL_SECONDS: float = 1.0
+	# Bound on queued documents; requests wait for room once it is reached.
+	WRITE_BEHIND_MAX_QUEUE: int = 10000
+
 	model_config = SettingsConfigDict(env_file=".env", env_nested_delimiter="__")
 	
 	def __init__(self, **values):
 		super().__init__(**values)
 		self.PUBLIC_METHODS = {m.strip() for m in self.PUBLIC_METHODS.split(",") if m.strip()}
 		self.API_KEY_METHODS = {m.strip() for m in self.API_KEY_METHODS.split(",") if m.strip()}
+		self.RATE_LIMIT_TIERS = {
+			tier.strip(): (float(rpm), float(burst))
+			for tier, rpm, burst in (t.split(":") for t in self.RATE_LIMIT_TIERS.split(",") if t.strip())
+		}
+		self.FORECAST_CACHE_TIERS = [t.strip() for t in self.FORECAST_CACHE_TIERS.split(",") if t.strip()]
+		self.OPEN_METEO_HTTP_CACHE_TIERS = [t.strip() for t in self.OPEN_METEO_HTTP_CACHE_TIERS.split(",") if t.strip()]
+		self.GEOCODE_CACHE_TIERS = [t.strip() for t in self.GEOCODE_CACHE_TIERS.split(",") if t.strip()]
+		self.TOKEN_SIGNING_KEYS = dict(
+			pair.strip().split(":", 1) for pair in self.TOKEN_SIGNING_KEYS.split(",") if ":" in pair
+		)
 
 @lru_cache
 def get_settings() -> Settings:
@@ -0,0 +1,48 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+# Absolute time.monotonic() by which the current request must be answered; None means no deadline.
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request's deadline has passed, or too little of it is left to do the work."""
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current request's deadline, or None when it has none."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def check(needed: float = 0.0):
+    """Raise DeadlineExceeded unless more than `needed` seconds are left."""
+    left = remaining()
+    if left is not None and left <= needed:
+        raise DeadlineExceeded(f"Deadline exceeded ({max(left, 0.0):.3f}s left, {needed:.3f}s needed)")
+
+
+def timeout(default: Optional[float]) -> Optional[float]:
+    """`default` capped by the time left; raises DeadlineExceeded once none is."""
+    check()
+    left = remaining()
+    if left is None:
+        return default
+    return left if default is None else min(default, left)
+
+
+@contextmanager
+def scope(seconds: Optional[float]):
+    """Run the block with a deadline `seconds` from now; an earlier enclosing deadline still applies."""
+    if seconds is None:
+        yield
+        return
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(deadline if current is None else min(current, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
@@ -0,0 +1,81 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Tuple
+from grpc_health.v1 import health_pb2
+from grpc_health.v1.health import aio as health_aio
+
+logger = logging.getLogger(__name__)
+
+SERVING = health_pb2.HealthCheckResponse.SERVING
+NOT_SERVING = health_pb2.HealthCheckResponse.NOT_SERVING
+
+# The overall server status is reported under the empty service name. It is
+# what the proxy checks, so it follows local readiness only: an outage of a
+# remote dependency must not take every worker out of rotation.
+OVERALL = ""
+
+Probe = Callable[[], Awaitable[bool]]
+
+
+class HealthMonitor:
+    """Drives a grpc.health.v1 servicer from dependency probes.
+
+    Every service starts NOT_SERVING. Once mark_ready() is called (pools and
+    caches warm) the probes run periodically and a service is SERVING only
+    while all of its dependencies are up. The overall status depends on the
+    `local` probes alone. After shutdown() every service stays NOT_SERVING.
+    """
+
+    def __init__(self, probes: Dict[str, Probe], dependencies: Dict[str, Tuple[str, ...]],
+                 local: Tuple[str, ...] = (), interval_seconds: float = 10.0,
+                 probe_timeout_seconds: float = 2.0):
+        self.servicer = health_aio.HealthServicer()
+        self.probes = probes
+        self.dependencies = dependencies
+        self.local = local
+        self.interval_seconds = interval_seconds
+        self.probe_timeout_seconds = probe_timeout_seconds
+        self.ready = False
+        self._task = None
+
+    async def init(self):
+        for service in (OVERALL, *self.dependencies):
+            await self.servicer.set(service, NOT_SERVING)
+
+    async def _probe(self, name: str, probe: Probe) -> bool:
+        try:
+            return bool(await asyncio.wait_for(probe(), self.probe_timeout_seconds))
+        except Exception as e:
+            logger.warning(f"Health probe '{name}' failed: {e}")
+            return False
+
+    async def check(self) -> Dict[str, bool]:
+        names = list(self.probes)
+        results = await asyncio.gather(*(self._probe(n, self.probes[n]) for n in names))
+        status = dict(zip(names, results))
+        if self.ready:
+            for service, deps in self.dependencies.items():
+                up = all(status.get(dep, False) for dep in deps)
+                await self.servicer.set(service, SERVING if up else NOT_SERVING)
+            up = all(status.get(dep, False) for dep in self.local)
+            await self.servicer.set(OVERALL, SERVING if up else NOT_SERVING)
+        return status
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            await self.check()
+
+    async def mark_ready(self):
+        self.ready = True
+        status = await self.check()
+        logger.info(f"Server ready, dependency status: {status}")
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def shutdown(self):
+        self.ready = False
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.servicer.enter_graceful_shutdown()
@@ -0,0 +1,21 @@
+import logging
+from typing import Awaitable, Callable, List
+
+logger = logging.getLogger(__name__)
+
+_shutdown_hooks: List[Callable[[], Awaitable[None]]] = []
+
+
+def on_shutdown(hook: Callable[[], Awaitable[None]]):
+    """Register a coroutine function run after the server has drained, e.g. to flush a queue."""
+    _shutdown_hooks.append(hook)
+
+
+async def run_shutdown_hooks():
+    # Last registered, first run: later components may depend on earlier ones.
+    while _shutdown_hooks:
+        hook = _shutdown_hooks.pop()
+        try:
+            await hook()
+        except Exception as e:
+            logger.exception(f"Shutdown hook {getattr(hook, '__qualname__', hook)} failed: {e}")
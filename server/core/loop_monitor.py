@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+import weakref
+from typing import List, Optional
+
+from core import metrics
+
+logger = logging.getLogger(__name__)
+
+# RPC method per handler task, so a blocked loop can be blamed on the call that blocked it.
+_rpc_methods: "weakref.WeakKeyDictionary[asyncio.Task, str]" = weakref.WeakKeyDictionary()
+
+
+def mark_rpc(method: str):
+    """Record that the current task handles `method`; called by the first interceptor."""
+    task = asyncio.current_task()
+    if task is not None:
+        _rpc_methods[task] = method
+
+
+def running_method(loop: asyncio.AbstractEventLoop) -> str:
+    """RPC method of the task `loop` is running right now. Callable from other threads."""
+    current = getattr(asyncio.tasks, "_current_tasks", {}).get(loop)
+    if current is None:
+        return "<loop callback>"
+    return _rpc_methods.get(current) or f"<task {current.get_name()}>"
+
+
+class BlockReport:
+    """A callback that held the loop for at least `blocked_seconds`, with the stack it was blocked in."""
+
+    def __init__(self, method: str, blocked_seconds: float, stack: str):
+        self.method = method
+        self.blocked_seconds = blocked_seconds
+        self.stack = stack
+
+
+class LoopLagMonitor:
+    """Measures event-loop lag: how late a sleep of `interval` seconds wakes up.
+
+    Lag is the time ready callbacks wait for the loop, i.e. the queueing
+    delay every RPC on this process pays before its code runs. `lag` is the
+    latest sample in seconds; samples also go to the event_loop_lag_seconds
+    histogram.
+
+    With `block_threshold` set (debug mode), a watchdog thread notices when
+    the loop has not come round for that long, captures the loop thread's
+    stack and the RPC method of the running task, logs them and keeps them
+    in `reports`.
+    """
+
+    def __init__(self, interval: float = 0.05, block_threshold: Optional[float] = None):
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self.lag = 0.0
+        self.reports: List[BlockReport] = []
+        self.lag_seconds = metrics.histogram("event_loop_lag_seconds", "Event-loop lag samples")
+        self.lag_gauge = metrics.gauge("event_loop_lag_current_seconds", "Latest event-loop lag sample")
+        self.blocked = metrics.counter("event_loop_blocked_total", "Callbacks that held the loop past the threshold")
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._beat = time.monotonic()
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._task = asyncio.create_task(self._run(), name="loop-lag-monitor")
+        if self.block_threshold:
+            self._stop.clear()
+            self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._watchdog.start()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self._beat = time.monotonic()
+            self.lag = max(0.0, loop.time() - start - self.interval)
+            self.lag_seconds.observe(self.lag)
+            self.lag_gauge.set(self.lag)
+
+    def _watch(self):
+        reported_beat = None
+        while not self._stop.wait(self.block_threshold / 4):
+            beat = self._beat
+            stalled = time.monotonic() - beat - self.interval
+            if stalled < self.block_threshold or beat == reported_beat:
+                continue
+            reported_beat = beat
+            frame = sys._current_frames().get(self._loop_thread)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else ""
+            # The loop thread is stuck, so its current task cannot change while we look.
+            report = BlockReport(running_method(self._loop), stalled, stack)
+            self.reports.append(report)
+            self.blocked.inc()
+            logger.warning(
+                f"Event loop blocked for {stalled * 1000:.0f} ms+ in {report.method}:\n{stack}"
+            )
+
+    async def close(self):
+        self._stop.set()
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join)
+            self._watchdog = None
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
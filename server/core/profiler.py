@@ -0,0 +1,117 @@
+import asyncio
+import cProfile
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+from core.loop_monitor import running_method
+
+WALL = "wall"
+CPU = "cpu"
+
+
+def _frame_name(code) -> str:
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ",")
+
+
+def _stack(frame) -> str:
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame.f_code))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class SamplingProfiler:
+    """Samples the event-loop thread's stack every `interval` seconds from a side thread.
+
+    Each sample is rooted at the RPC method of the task the loop is running
+    (see core.loop_monitor.mark_rpc), so the aggregate splits by method.
+    In WALL mode every sample counts once, idle loop included; in CPU mode
+    a sample weighs the loop thread's CPU microseconds since the previous
+    one, so waiting costs nothing. Nothing runs between start() and stop()
+    calls, and the RPC path is not touched.
+    """
+
+    def __init__(self, interval: float = 0.005, mode: str = WALL):
+        if mode == CPU and not hasattr(time, "pthread_getcpuclockid"):
+            raise ValueError("CPU profiles need per-thread CPU clocks, which this platform lacks.")
+        self.interval = interval
+        self.mode = mode
+        self.stacks: Counter = Counter()
+        self.by_method: Counter = Counter()
+        self.samples = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        clock = time.pthread_getcpuclockid(self._loop_thread) if self.mode == CPU else None
+        cpu_before = time.clock_gettime(clock) if clock is not None else 0.0
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            method = running_method(self._loop)
+            weight = 1
+            if clock is not None:
+                cpu_now = time.clock_gettime(clock)
+                weight = round((cpu_now - cpu_before) * 1e6)
+                cpu_before = cpu_now
+                if weight <= 0:
+                    continue
+            self.stacks[f"{method};{_stack(frame)}"] += weight
+            self.by_method[method] += weight
+            self.samples += 1
+
+    async def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            await asyncio.to_thread(self._thread.join)
+            self._thread = None
+
+    def collapsed(self) -> str:
+        """Aggregate in the folded format flamegraph.pl and speedscope read: "stack count" per line."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+async def sample(seconds: float, interval: float = 0.005, mode: str = WALL) -> SamplingProfiler:
+    profiler = SamplingProfiler(interval, mode)
+    profiler.start()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        await profiler.stop()
+    return profiler
+
+
+async def trace(seconds: float) -> bytes:
+    """cProfile the loop thread for `seconds`; returns what pstats.Stats reads from a file.
+
+    Deterministic, so every call on the loop pays for it while it runs, and
+    not split by RPC method: handlers show up under their own names.
+    """
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        profile.disable()
+    stats: Dict = pstats.Stats(profile).stats
+    return marshal.dumps(stats)
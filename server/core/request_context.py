@@ -0,0 +1,8 @@
+from contextvars import ContextVar
+from typing import Optional
+
+# Claims of the verified access token for the RPC being handled, if any.
+current_claims: ContextVar[Optional[dict]] = ContextVar("current_claims", default=None)
+
+# The API key (ApiKeyInfo, without its value) that authenticated the RPC, if any.
+current_api_key: ContextVar[Optional[object]] = ContextVar("current_api_key", default=None)
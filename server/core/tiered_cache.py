@@ -0,0 +1,275 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, List, Optional, Tuple
+
+from core import metrics
+from utils.resp_client import RespClient
+
+logger = logging.getLogger(__name__)
+
+# A backend maps str keys to (value, expires_at) with expires_at in epoch
+# seconds, so every tier agrees on when an entry dies, and tiers shared by
+# several processes agree too. Backends with stores_objects keep Python
+# objects as they are; the others hold bytes from the cache's codec. Every
+# method is a coroutine; get() returns None for missing or expired keys.
+
+
+class JsonCodec:
+    """Values to JSON bytes and back, through a to_dict/from_dict pair."""
+
+    def __init__(self, to_dict: Callable[[Any], Any] = None, from_dict: Callable[[Any], Any] = None):
+        self.to_dict = to_dict or (lambda value: value)
+        self.from_dict = from_dict or (lambda doc: doc)
+
+    def encode(self, value) -> bytes:
+        return json.dumps(self.to_dict(value), separators=(",", ":")).encode()
+
+    def decode(self, data: bytes):
+        return self.from_dict(json.loads(data))
+
+
+class MemoryBackend:
+    """In-process LRU; values are kept as objects, nothing is serialized."""
+
+    name = "memory"
+    stores_objects = True
+
+    def __init__(self, max_entries: int = 1024, clock=time.time):
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+
+    async def init(self):
+        pass
+
+    async def get(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= self.clock():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    async def set(self, key: str, value, expires_at: float):
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def delete(self, key: str):
+        self._entries.pop(key, None)
+
+    async def close(self):
+        self._entries.clear()
+
+
+class SQLiteBackend:
+    """Local on-disk store. sqlite3 blocks, so every statement runs in a worker thread."""
+
+    name = "sqlite"
+    stores_objects = False
+    # Expired rows are removed once every this many writes.
+    PURGE_EVERY = 1000
+
+    def __init__(self, path: str, clock=time.time):
+        self.path = path
+        self.clock = clock
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _connect(self):
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def _run(self, sql: str, params=()):
+        with self._lock:
+            return self._connect().execute(sql, params).fetchone()
+
+    async def init(self):
+        await asyncio.to_thread(self._connect)
+
+    async def get(self, key: str):
+        row = await asyncio.to_thread(
+            self._run, "SELECT value, expires_at FROM cache WHERE key = ? AND expires_at > ?", (key, self.clock())
+        )
+        return (bytes(row[0]), row[1]) if row else None
+
+    async def set(self, key: str, value: bytes, expires_at: float):
+        await asyncio.to_thread(
+            self._run, "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)", (key, value, expires_at)
+        )
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            await asyncio.to_thread(self._run, "DELETE FROM cache WHERE expires_at <= ?", (self.clock(),))
+
+    async def delete(self, key: str):
+        await asyncio.to_thread(self._run, "DELETE FROM cache WHERE key = ?", (key,))
+
+    async def close(self):
+        def close():
+            with self._lock:
+                if self._conn is not None:
+                    self._conn.close()
+                    self._conn = None
+        await asyncio.to_thread(close)
+
+
+class RedisBackend:
+    """Any server speaking the Redis protocol; expiry is left to the server (PX)."""
+
+    name = "redis"
+    stores_objects = False
+
+    def __init__(self, client: RespClient, clock=time.time):
+        self.client = client
+        self.clock = clock
+
+    async def init(self):
+        pass
+
+    async def get(self, key: str):
+        value, ttl_ms = await self.client.pipeline(("GET", key), ("PTTL", key))
+        if value is None or isinstance(value, Exception):
+            return None
+        # PTTL is -1 for a key set without expiry elsewhere: usable now, not copied to faster tiers.
+        expires_at = self.clock() + ttl_ms / 1000.0 if isinstance(ttl_ms, int) and ttl_ms > 0 else self.clock()
+        return value, expires_at
+
+    async def set(self, key: str, value: bytes, expires_at: float):
+        ttl_ms = int((expires_at - self.clock()) * 1000)
+        if ttl_ms > 0:
+            await self.client.execute("SET", key, value, "PX", ttl_ms)
+
+    async def delete(self, key: str):
+        await self.client.execute("DEL", key)
+
+    async def close(self):
+        await self.client.close()
+
+
+class TieredCache:
+    """Looks a key up in `tiers` fastest first; a hit fills the faster tiers it missed.
+
+    Values keep the expiry they were set with in every tier. Tier failures
+    are counted and treated as misses, so a cache outage slows requests down
+    but never fails them. `name` prefixes keys (tiers can be shared between
+    caches) and metric names: cache_<name>_<tier>_hits_total,
+    cache_<name>_misses_total and cache_<name>_<tier>_errors_total.
+    """
+
+    def __init__(self, name: str, tiers: List, codec: JsonCodec = None, ttl_seconds: float = 600, clock=time.time):
+        self.name = name
+        self.tiers = tiers
+        self.codec = codec or JsonCodec()
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self.hits = [metrics.counter(f"cache_{name}_{t.name}_hits_total", f"{name} cache hits in {t.name}") for t in tiers]
+        self.errors = [metrics.counter(f"cache_{name}_{t.name}_errors_total", f"{name} cache {t.name} failures") for t in tiers]
+        self.misses = metrics.counter(f"cache_{name}_misses_total", f"{name} cache misses in every tier")
+
+    def _key(self, key: str) -> str:
+        return f"{self.name}:{key}"
+
+    async def init(self):
+        for i, tier in enumerate(self.tiers):
+            try:
+                await tier.init()
+            except Exception as e:
+                self.errors[i].inc()
+                logger.error(f"Cache {self.name}: {tier.name} tier unavailable at start: {e}")
+
+    async def get(self, key: str) -> Optional[Any]:
+        full_key = self._key(key)
+        for i, tier in enumerate(self.tiers):
+            try:
+                hit = await tier.get(full_key)
+                if hit is None:
+                    continue
+                stored, expires_at = hit
+                value = stored if tier.stores_objects else self.codec.decode(stored)
+            except Exception as e:
+                self.errors[i].inc()
+                logger.debug(f"Cache {self.name}: {tier.name} get failed: {e}")
+                continue
+            self.hits[i].inc()
+            await self._fill(self.tiers[:i], full_key, value, expires_at)
+            return value
+        self.misses.inc()
+        return None
+
+    async def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None):
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        await self._fill(self.tiers, self._key(key), value, self.clock() + ttl)
+
+    async def _fill(self, tiers, full_key: str, value, expires_at: float):
+        encoded = None
+        for tier in tiers:
+            try:
+                if tier.stores_objects:
+                    await tier.set(full_key, value, expires_at)
+                else:
+                    if encoded is None:
+                        encoded = self.codec.encode(value)
+                    await tier.set(full_key, encoded, expires_at)
+            except Exception as e:
+                self.errors[self.tiers.index(tier)].inc()
+                logger.debug(f"Cache {self.name}: {tier.name} set failed: {e}")
+
+    async def delete(self, key: str):
+        for i, tier in enumerate(self.tiers):
+            try:
+                await tier.delete(self._key(key))
+            except Exception as e:
+                self.errors[i].inc()
+                logger.debug(f"Cache {self.name}: {tier.name} delete failed: {e}")
+
+    async def close(self):
+        for tier in self.tiers:
+            try:
+                await tier.close()
+            except Exception as e:
+                logger.error(f"Cache {self.name}: closing {tier.name} failed: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "hits": {tier.name: counter.value for tier, counter in zip(self.tiers, self.hits)},
+            "errors": {tier.name: counter.value for tier, counter in zip(self.tiers, self.errors)},
+            "misses": self.misses.value,
+        }
+
+
+def build_tiers(spec: List[str], settings, max_entries: int = 1024) -> List:
+    """Backends for tier names such as ["memory", "sqlite"], fastest first."""
+    tiers = []
+    for name in spec:
+        if name == "memory":
+            tiers.append(MemoryBackend(max_entries))
+        elif name == "sqlite":
+            tiers.append(SQLiteBackend(settings.CACHE_SQLITE_PATH))
+        elif name == "redis":
+            tiers.append(RedisBackend(RespClient(settings.CACHE_REDIS_URL, settings.CACHE_REDIS_TIMEOUT_SECONDS)))
+        elif name == "mongo":
+            from repositories.cache_repository import CacheRepository
+            tiers.append(CacheRepository(settings.CACHE_MONGO_COLLECTION))
+        else:
+            raise ValueError(f"Unknown cache tier '{name}'")
+    return tiers
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, List, Optional
+
+from core import metrics
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class WriteBehindQueue:
+    """Buffers writes in memory and flushes them in batches from a background task.
+
+    A batch is flushed once it holds `batch_size` items or `flush_interval`
+    seconds after its first item, whichever comes first. The queue holds at
+    most `max_queue` items; put() waits when it is full, so a slow database
+    pushes back on producers instead of growing memory. close() flushes
+    whatever is queued.
+
+    `flush` receives a list of items and returns how many of them were
+    written (None when the whole batch failed). The rest are logged and
+    dropped.
+    """
+
+    def __init__(self, name: str, flush: Callable[[List[Any]], Awaitable[Optional[int]]],
+                 batch_size: int = 500, flush_interval: float = 1.0, max_queue: int = 10_000):
+        self.name = name
+        self._flush = flush
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+        self.depth = metrics.gauge(f"{name}_queue_depth", "Items waiting to be flushed")
+        self.flush_seconds = metrics.histogram(f"{name}_flush_seconds", "Batch flush latency")
+        self.written = metrics.counter(f"{name}_written_total", "Items flushed successfully")
+        self.failed = metrics.counter(f"{name}_failed_total", "Items dropped after a failed flush")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=f"{self.name}-flush")
+
+    def __len__(self):
+        return self._queue.qsize()
+
+    async def put(self, item: Any):
+        if self._closed:
+            # Late writes during shutdown go straight through.
+            await self._write([item])
+            return
+        await self._queue.put(item)
+        self.depth.set(self._queue.qsize())
+
+    async def _write(self, batch: List[Any]):
+        start = time.perf_counter()
+        try:
+            written = await self._flush(batch)
+        except Exception as e:
+            logger.exception(f"[{self.name}] Flush of {len(batch)} items failed: {e}")
+            written = None
+        self.flush_seconds.observe(time.perf_counter() - start)
+        written = written or 0
+        self.written.inc(written)
+        if written < len(batch):
+            self.failed.inc(len(batch) - written)
+            logger.error(f"[{self.name}] Dropped {len(batch) - written} of {len(batch)} items after a failed flush.")
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self.depth.set(self._queue.qsize())
+            await self._write(batch)
+
+    async def close(self):
+        """Stop accepting queued writes and flush everything already queued."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._task is None:
+            return
+        # The sentinel queues behind pending items, so they are all flushed first.
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+        self.depth.set(0)
+        logger.info(f"[{self.name}] Flushed and stopped.")
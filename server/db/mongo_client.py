@@ -1,13 +1,92 @@
+import asyncio
+import logging
+from typing import Dict, Optional
 from pymongo import AsyncMongoClient
+from pymongo.asynchronous.collection import AsyncCollection
+from core import deadline
 from core.config import get_settings
+from db.mongo_monitoring import CommandMonitor
 
-# Singleton async client (recommended)
-_async_client = AsyncMongoClient(get_settings().DB_URL)
+logger = logging.getLogger(__name__)
 
-async def get_client() -> AsyncMongoClient:
+_async_client: Optional[AsyncMongoClient] = None
+_collections: Dict[str, AsyncCollection] = {}
+
+def init_client() -> AsyncMongoClient:
+	"""Create the process-wide client. Called from serve(); get_client() falls back to it."""
+	global _async_client
+	if _async_client is None:
+		settings = get_settings()
+		listeners = []
+		if settings.MONGO_MONITORING_ENABLED:
+			listeners.append(CommandMonitor(
+				settings.MONGO_SLOW_OP_MS,
+				_explain if settings.MONGO_EXPLAIN_SLOW_OPS else None,
+				settings.MONGO_EXPLAIN_INTERVAL_SECONDS,
+			))
+		_async_client = AsyncMongoClient(
+			settings.DB_URL,
+			appname=settings.APP_NAME,
+			maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+			minPoolSize=settings.MONGO_MIN_POOL_SIZE,
+			maxIdleTimeMS=settings.MONGO_MAX_IDLE_TIME_MS,
+			serverSelectionTimeoutMS=settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+			connectTimeoutMS=settings.MONGO_CONNECT_TIMEOUT_MS,
+			socketTimeoutMS=settings.MONGO_SOCKET_TIMEOUT_MS,
+			event_listeners=listeners,
+		)
 	return _async_client
 
-async def get_collection(collection_name: str):
+async def get_client() -> AsyncMongoClient:
+	return _async_client or init_client()
+
+async def _explain(database: str, command: dict) -> dict:
+	client = await get_client()
+	return await client[database].command(command)
+
+async def get_collection(collection_name: str) -> AsyncCollection:
+	collection = _collections.get(collection_name)
+	if collection is None:
+		client = await get_client()
+		collection = client[get_settings().DB_NAME][collection_name]
+		_collections[collection_name] = collection
+	return collection
+
+def max_time_ms() -> int:
+	"""Server-side time limit (maxTimeMS) for queries: the default, capped by the request deadline."""
+	limit = get_settings().MONGO_MAX_TIME_MS
+	left = deadline_ms()
+	return limit if left is None else min(limit, left)
+
+def deadline_ms() -> Optional[int]:
+	"""Milliseconds left before the request deadline (at least 1), or None without one."""
+	left = deadline.remaining()
+	return None if left is None else max(1, int(left * 1000))
+
+async def ping() -> bool:
 	client = await get_client()
-	db = client["climatechart"]
-	return db[collection_name]
\ No newline at end of file
+	await client.admin.command("ping")
+	return True
+
+async def warm_up(connections: Optional[int] = None) -> bool:
+	"""Ping the server and open `connections` pooled sockets (default: the pool minimum),
+	so the first requests after a deploy do not pay for connection setup."""
+	client = await get_client()
+	connections = connections or get_settings().MONGO_MIN_POOL_SIZE
+	try:
+		await client.admin.command("ping")
+		# Concurrent pings each check out their own connection.
+		await asyncio.gather(*(client.admin.command("ping") for _ in range(connections)))
+		logger.info(f"MongoDB connection pool warmed up with {connections} connections.")
+		return True
+	except Exception as e:
+		logger.error(f"MongoDB warm-up failed: {e}")
+		return False
+
+async def close_client():
+	global _async_client
+	if _async_client is not None:
+		await _async_client.close()
+		_async_client = None
+		_collections.clear()
+		logger.info("MongoDB client closed.")
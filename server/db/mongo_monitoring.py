@@ -0,0 +1,216 @@
+import asyncio
+import json
+import logging
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from pymongo import monitoring
+from core import metrics
+from core.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+REDACTED = "?"
+
+# Handshakes, auth and our own explains: frequent or meaningless to time per collection.
+IGNORED_COMMANDS = {
+	"hello", "ismaster", "isMaster", "ping", "buildinfo", "buildInfo", "saslStart", "saslContinue",
+	"authenticate", "endSessions", "killCursors", "explain",
+}
+
+# Reads whose plan is worth fetching when they are slow; explain at queryPlanner verbosity runs nothing.
+EXPLAINABLE = {"find", "aggregate", "count", "distinct"}
+
+# Per-call fields an explained command must not carry; the explain has its own time limit.
+_CALL_FIELDS = {"lsid", "txnNumber", "autocommit", "startTransaction", "readConcern", "writeConcern", "maxTimeMS"}
+EXPLAIN_MAX_TIME_MS = 1000
+
+def filter_shape(value):
+	"""The query with every value replaced by "?": field names and operators only."""
+	if isinstance(value, dict):
+		return {k: filter_shape(v) for k, v in value.items()}
+	if isinstance(value, (list, tuple)):
+		shapes = []
+		for item in value:
+			shape = filter_shape(item)
+			if shape not in shapes:
+				shapes.append(shape)
+		return shapes
+	return REDACTED
+
+def command_filter(command_name: str, command: dict):
+	"""The part of a command that decides which documents it touches."""
+	if command_name == "find":
+		return command.get("filter", {})
+	if command_name == "aggregate":
+		return command.get("pipeline", [])
+	if command_name in ("count", "distinct", "findAndModify"):
+		return command.get("query", {})
+	if command_name == "update":
+		return [u.get("q", {}) for u in command.get("updates", [])]
+	if command_name == "delete":
+		return [d.get("q", {}) for d in command.get("deletes", [])]
+	return {}
+
+def command_collection(command_name: str, command: dict) -> str:
+	if command_name == "getMore":
+		return command.get("collection", "")
+	target = command.get(command_name)
+	return target if isinstance(target, str) else ""
+
+def _winning_plan(explain):
+	if isinstance(explain, dict):
+		planner = explain.get("queryPlanner")
+		if isinstance(planner, dict) and "winningPlan" in planner:
+			plan = planner["winningPlan"]
+			# Slot-based engine: the classic-style tree is under queryPlan.
+			return plan.get("queryPlan", plan)
+		values = explain.values()
+	elif isinstance(explain, list):
+		values = explain
+	else:
+		return None
+	for value in values:
+		plan = _winning_plan(value)
+		if plan is not None:
+			return plan
+	return None
+
+def _describe(stage: dict) -> str:
+	name = stage.get("stage", "?")
+	if stage.get("indexName"):
+		name = f"{name}({stage['indexName']})"
+	inputs = stage.get("inputStages") or ([stage["inputStage"]] if "inputStage" in stage else [])
+	if not inputs:
+		return name
+	if len(inputs) == 1:
+		return f"{name} <- {_describe(inputs[0])}"
+	return f"{name} <- [{', '.join(_describe(s) for s in inputs)}]"
+
+def plan_summary(explain: dict) -> str:
+	"""Winning plan as a stage chain, e.g. "FETCH <- IXSCAN(city_1_date_1)"; COLLSCAN means no index."""
+	plan = _winning_plan(explain)
+	return _describe(plan) if plan else "unknown"
+
+def explain_command(command: dict) -> dict:
+	body = {k: v for k, v in command.items() if not k.startswith("$") and k not in _CALL_FIELDS}
+	return {"explain": body, "verbosity": "queryPlanner", "maxTimeMS": EXPLAIN_MAX_TIME_MS}
+
+class CommandMonitor(monitoring.CommandListener, monitoring.ConnectionPoolListener):
+	"""Times Mongo commands per collection and command, and connection pool check-outs.
+
+	Latencies go to mongo_<command>_<collection>_seconds histograms, pool
+	waits to mongo_pool_wait_seconds. Commands slower than `slow_ms` are
+	logged with their filter shape (values replaced by "?"). With `explain`
+	set, a slow read is also explained in the background, at most once per
+	shape every `explain_interval` seconds, and its winning plan is logged,
+	so a COLLSCAN stands out.
+	"""
+
+	def __init__(self, slow_ms: float = 100, explain: Optional[Callable[[str, dict], Awaitable[dict]]] = None,
+				 explain_interval: float = 600):
+		self.slow_seconds = slow_ms / 1000.0
+		self.explain = explain
+		self._explained = TTLCache(1024, explain_interval)
+		self._pending: Dict[Tuple, Tuple[str, dict]] = {}
+		self._timers: Dict[Tuple[str, str], metrics.Histogram] = {}
+		self._tasks = set()
+		self.failures = metrics.counter("mongo_command_failures_total", "Mongo commands that failed")
+		self.slow_ops = metrics.counter("mongo_slow_operations_total", "Mongo commands over the slow threshold")
+		self.pool_wait = metrics.histogram("mongo_pool_wait_seconds", "Time spent checking out a pooled connection")
+		self.pool_failures = metrics.counter("mongo_pool_checkout_failures_total", "Failed connection check-outs")
+
+	def _timer(self, collection: str, command_name: str) -> metrics.Histogram:
+		key = (collection, command_name)
+		timer = self._timers.get(key)
+		if timer is None:
+			name = f"mongo_{command_name}_{collection or 'admin'}_seconds"
+			timer = self._timers[key] = metrics.histogram(name, f"Mongo {command_name} on {collection or 'admin'}")
+		return timer
+
+	def started(self, event):
+		if event.command_name in IGNORED_COMMANDS:
+			return
+		collection = command_collection(event.command_name, event.command)
+		self._pending[(event.connection_id, event.request_id)] = (collection, event.command)
+
+	def _finish(self, event):
+		pending = self._pending.pop((event.connection_id, event.request_id), None)
+		if pending is None:
+			return None
+		collection, command = pending
+		seconds = event.duration_micros / 1e6
+		self._timer(collection, event.command_name).observe(seconds)
+		if seconds >= self.slow_seconds:
+			self._slow(event, collection, command, seconds)
+		return pending
+
+	def succeeded(self, event):
+		self._finish(event)
+
+	def failed(self, event):
+		if self._finish(event) is not None:
+			self.failures.inc()
+
+	def _slow(self, event, collection: str, command: dict, seconds: float):
+		self.slow_ops.inc()
+		shape = filter_shape(command_filter(event.command_name, command))
+		logger.warning(
+			f"Slow Mongo {event.command_name} on {event.database_name}.{collection}: "
+			f"{seconds * 1000:.0f} ms, filter {json.dumps(shape)}"
+		)
+		if self.explain is None or event.command_name not in EXPLAINABLE:
+			return
+		key = (event.database_name, collection, event.command_name, json.dumps(shape, sort_keys=True))
+		if self._explained.get(key):
+			return
+		try:
+			loop = asyncio.get_running_loop()
+		except RuntimeError:
+			return
+		self._explained.set(key, True)
+		task = loop.create_task(self._log_plan(event.database_name, collection, event.command_name, shape, command))
+		self._tasks.add(task)
+		task.add_done_callback(self._tasks.discard)
+
+	async def _log_plan(self, database: str, collection: str, command_name: str, shape, command: dict):
+		try:
+			plan = plan_summary(await self.explain(database, explain_command(command)))
+		except Exception as e:
+			logger.debug(f"Explain of slow {command_name} on {collection} failed: {e}")
+			return
+		logger.warning(f"Plan of slow Mongo {command_name} on {database}.{collection} {json.dumps(shape)}: {plan}")
+
+	def connection_checked_out(self, event):
+		if event.duration is not None:
+			self.pool_wait.observe(event.duration)
+
+	def connection_check_out_failed(self, event):
+		self.pool_failures.inc()
+		if event.duration is not None:
+			self.pool_wait.observe(event.duration)
+
+	def pool_created(self, event):
+		pass
+
+	def pool_ready(self, event):
+		pass
+
+	def pool_cleared(self, event):
+		pass
+
+	def pool_closed(self, event):
+		pass
+
+	def connection_created(self, event):
+		pass
+
+	def connection_ready(self, event):
+		pass
+
+	def connection_closed(self, event):
+		pass
+
+	def connection_check_out_started(self, event):
+		pass
+
+	def connection_checked_in(self, event):
+		pass
@@ -0,0 +1,59 @@
+import asyncio
+import hmac
+import logging
+import grpc
+from proto.generated import admin_pb2, admin_pb2_grpc
+from core import profiler
+from core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+SAMPLING_MODES = {
+    admin_pb2.WALL: profiler.WALL,
+    admin_pb2.CPU: profiler.CPU,
+}
+
+class AdminServiceServicer(admin_pb2_grpc.AdminServiceServicer):
+    """Operator RPCs. Every call must carry ADMIN_API_KEY in ADMIN_KEY_HEADER."""
+
+    def __init__(self, settings=None):
+        self.settings = settings or get_settings()
+        # One profile at a time: overlapping ones would profile each other.
+        self._profiling = asyncio.Lock()
+
+    async def _authorize(self, context):
+        expected = self.settings.ADMIN_API_KEY
+        header = self.settings.ADMIN_KEY_HEADER.lower()
+        given = next((v for k, v in context.invocation_metadata() or () if k.lower() == header), "")
+        if not expected or not hmac.compare_digest(given.encode(), expected.encode()):
+            logger.warning("[Admin] Rejected call without a valid admin key")
+            await context.abort(grpc.StatusCode.UNAUTHENTICATED, "Admin key required.")
+
+    async def Profile(self, request, context):
+        await self._authorize(context)
+        seconds = request.seconds
+        if not 0 < seconds <= self.settings.PROFILE_MAX_SECONDS:
+            await context.abort(
+                grpc.StatusCode.INVALID_ARGUMENT,
+                f"seconds must be between 1 and {self.settings.PROFILE_MAX_SECONDS}.",
+            )
+        # 0 picks the default; a negative wait would make the sampler spin and starve the loop.
+        if request.interval_ms < 0:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "interval_ms must not be negative.")
+        if self._profiling.locked():
+            await context.abort(grpc.StatusCode.FAILED_PRECONDITION, "A profile is already running.")
+        interval = (request.interval_ms or self.settings.PROFILE_SAMPLE_INTERVAL_MS) / 1000.0
+        async with self._profiling:
+            logger.info(f"[Admin] Profiling for {seconds}s, mode={admin_pb2.ProfileMode.Name(request.mode)}")
+            try:
+                if request.mode == admin_pb2.CPROFILE:
+                    return admin_pb2.ProfileResponse(mode=request.mode, data=await profiler.trace(seconds))
+                sampled = await profiler.sample(seconds, interval, SAMPLING_MODES[request.mode])
+            except ValueError as e:
+                await context.abort(grpc.StatusCode.FAILED_PRECONDITION, str(e))
+            return admin_pb2.ProfileResponse(
+                mode=request.mode,
+                data=sampled.collapsed().encode(),
+                samples=sampled.samples,
+                samples_by_method=dict(sampled.by_method),
+            )
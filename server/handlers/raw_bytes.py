@@ -0,0 +1,35 @@
+import grpc
+from google.protobuf import message_factory
+
+
+def _passthrough_serializer(response_class):
+    serialize = response_class.SerializeToString
+
+    def serializer(response):
+        # Handlers may return an already serialized message straight from a cache.
+        if isinstance(response, bytes):
+            return response
+        return serialize(response)
+    return serializer
+
+
+def add_servicer_to_server(servicer, server, file_descriptor, service_name: str):
+    """Register every method of a service like the generated add_*_to_server helpers,
+    except that a handler can return raw protobuf bytes instead of a message."""
+    service = file_descriptor.services_by_name[service_name]
+    rpc_method_handlers = {}
+    for method in service.methods:
+        request_class = message_factory.GetMessageClass(method.input_type)
+        response_class = message_factory.GetMessageClass(method.output_type)
+        if method.server_streaming:
+            handler_factory = grpc.unary_stream_rpc_method_handler
+        else:
+            handler_factory = grpc.unary_unary_rpc_method_handler
+        rpc_method_handlers[method.name] = handler_factory(
+            getattr(servicer, method.name),
+            request_deserializer=request_class.FromString,
+            response_serializer=_passthrough_serializer(response_class),
+        )
+    generic_handler = grpc.method_handlers_generic_handler(service.full_name, rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
+    server.add_registered_method_handlers(service.full_name, rpc_method_handlers)
@@ -4,19 +4,32 @@ import base64
 import os
 from proto.generated import user_pb2, user_pb2_grpc
 from services.user_service import UserService
-from services.api_key_service import ApiKeyService
+from services.api_key_service import ApiKeyService, format_time
 from services.email_service import EmailService
+from services.token_service import TokenService
+from core.request_context import current_claims
 import random
 
 logger = logging.getLogger(__name__)
 
 INTERNAL_SERVER_ERROR_MSG = "Internal server error."
 
+def build_api_key_info(api_key) -> user_pb2.ApiKeyInfo:
+    return user_pb2.ApiKeyInfo(
+        user_email=api_key.user_email,
+        value=api_key.value,
+        created_at=format_time(api_key.created_at),
+        prefix=api_key.prefix,
+        expires_at=format_time(api_key.expires_at),
+    )
+
 class UserServiceServicer(user_pb2_grpc.UserServiceServicer):
-    def __init__(self):
-        self.users = UserService()
-        self.api_keys = ApiKeyService()
-        self.emails = EmailService()
+    def __init__(self, users: UserService = None, api_keys: ApiKeyService = None, emails: EmailService = None,
+                 tokens: TokenService = None):
+        self.users = users or UserService()
+        self.api_keys = api_keys or ApiKeyService()
+        self.emails = emails or EmailService()
+        self.tokens = tokens or TokenService()
 
     async def SignUp(self, request, context):
         name = (request.name or "").strip()
@@ -49,10 +62,13 @@ class UserServiceServicer(user_pb2_grpc.UserServiceServicer):
                 logger.warning(f"Login failed for email: {email}")
                 await context.abort(grpc.StatusCode.UNAUTHENTICATED, "Invalid credentials.")
             logger.info(f"User logged in: {user.email}")
+            access_token, expires_at = self.tokens.issue(user)
             return user_pb2.LoginResponse(
                 user_id=user.user_id,
                 name=user.name,
                 email=user.email,
+                access_token=access_token,
+                expires_at=expires_at,
             )
         except ConnectionError as e:
             logger.error(f"Login connection error: {e}")
@@ -95,6 +111,15 @@ class UserServiceServicer(user_pb2_grpc.UserServiceServicer):
     async def GetMe(self, request, context):
         email = (request.email or "").strip().lower()
         logger.info(f"[GetMe] Incoming request: email={email}")
+        claims = current_claims.get()
+        if claims and (not email or email == claims.get("email")):
+            # Answered from the verified access token, without a database lookup.
+            return user_pb2.GetMeResponse(
+                user_id=claims["sub"],
+                name=claims.get("name", ""),
+                email=claims.get("email", ""),
+                email_verified=bool(claims.get("email_verified")),
+            )
         if not email:
             logger.warning("[GetMe] Missing email param")
             await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "email is required.")
@@ -127,6 +152,8 @@ class UserServiceServicer(user_pb2_grpc.UserServiceServicer):
         if not user_email:
             logger.warning("CreateApiKey missing user_email")
             await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "user_email is required.")
+        if request.ttl_days < 0:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "ttl_days must not be negative.")
         try:
             info_user = await self.users.find_by_email(user_email)
             if not info_user:
@@ -135,16 +162,12 @@ class UserServiceServicer(user_pb2_grpc.UserServiceServicer):
             if info_user.email_verified is False:
                 logger.warning(f"CreateApiKey email not verified for email: {user_email}")
                 await context.abort(grpc.StatusCode.FAILED_PRECONDITION, "Email not verified.")
-            api_key = await self.api_keys.create_key(user_email)
+            api_key = await self.api_keys.create_key(user_email, request.ttl_days or None)
             if not api_key:
                 logger.warning(f"CreateApiKey failed for user_email: {user_email}")
                 await context.abort(grpc.StatusCode.INTERNAL, "Failed to create API key.")
             logger.info(f"API key created for user_email: {user_email}")
-            return user_pb2.ApiKeyInfo(
-                user_email=api_key.user_email,
-                value=api_key.value,
-                created_at=api_key.created_at
-            )
+            return build_api_key_info(api_key)
         except Exception as e:
             logger.error(f"CreateApiKey error: {e}")
             await context.abort(grpc.StatusCode.INTERNAL, INTERNAL_SERVER_ERROR_MSG)
@@ -160,11 +183,7 @@ class UserServiceServicer(user_pb2_grpc.UserServiceServicer):
                 logger.warning(f"GetApiKey not found for user_email: {user_email}")
                 await context.abort(grpc.StatusCode.NOT_FOUND, "API key not found.")
             logger.info(f"API key found for user_email: {user_email}")
-            return user_pb2.ApiKeyInfo(
-                user_email=api_key.user_email,
-                value=api_key.value,
-                created_at=api_key.created_at
-            )
+            return build_api_key_info(api_key)
         except Exception as e:
             logger.error(f"GetApiKey error: {e}")
             await context.abort(grpc.StatusCode.INTERNAL, INTERNAL_SERVER_ERROR_MSG)
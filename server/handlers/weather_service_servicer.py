@@ -1,39 +1,272 @@
 from proto.generated import weather_pb2, weather_pb2_grpc
+import asyncio
 import grpc
-from services.weather_service import WeatherService
+import hashlib
+from datetime import date, timedelta
+from core.cache import TTLCache
+from core.config import get_settings
+from core.deadline import DeadlineExceeded
+from services.weather_service import (
+    WeatherService, current_hour, normalize_hourly_selection, normalize_selection,
+)
+from utils.downsampling import LTTB, MIN_MAX
+from utils.geo_index import validate_coordinates
+
+DEFAULT_HISTORY_DAYS = 365
+DEFAULT_EXPORT_CHUNK_DAYS = 366
+MAX_EXPORT_CHUNK_DAYS = 5000
+DEFAULT_AUTOCOMPLETE_LIMIT = 10
+MAX_AUTOCOMPLETE_LIMIT = 50
+
+DOWNSAMPLE_METHODS = {
+    weather_pb2.LTTB: LTTB,
+    weather_pb2.MIN_MAX: MIN_MAX,
+}
+
+RECORD_FIELD_TYPES = {
+    "temperature_2m_max_c": float,
+    "temperature_2m_min_c": float,
+    "precipitation_sum_mm": float,
+    "pressure_msl_mean_hpa": float,
+    "wind_speed_10m_max_kmh": float,
+    "relative_humidity_2m_max_pct": int,
+}
+
+def build_record(day: str, rec: dict) -> weather_pb2.Record:
+    # Unselected or missing values are left unset (0 on the wire).
+    fields = {
+        name: cast(rec[name])
+        for name, cast in RECORD_FIELD_TYPES.items()
+        if rec.get(name) is not None
+    }
+    return weather_pb2.Record(date=day, **fields)
+
+def build_response(city: str, records) -> weather_pb2.Response:
+    if isinstance(records, dict):
+        proto_records = [build_record(day, rec) for day, rec in records.items()]
+    else:
+        proto_records = [build_record(r.get("date", ""), r) for r in records]
+    response = weather_pb2.Response(timezone="", records=proto_records)
+    response.version = records_version(response)
+    response.city = city
+    return response
+
+def records_version(response: weather_pb2.Response) -> str:
+    """Hash of the records only, so it is the same for every spelling of the city."""
+    content = weather_pb2.Response(records=response.records).SerializeToString(deterministic=True)
+    return hashlib.blake2b(content, digest_size=8).hexdigest()
+
+class CachedResponse:
+    """Serialized GetWeather answers for one (city, day)."""
+
+    def __init__(self, response: weather_pb2.Response):
+        self.version = response.version
+        self.payload = response.SerializeToString()
+        self.not_modified_payload = weather_pb2.Response(
+            city=response.city, version=response.version, not_modified=True
+        ).SerializeToString()
+
+    def for_request(self, request) -> bytes:
+        if request.if_none_match and request.if_none_match == self.version:
+            return self.not_modified_payload
+        return self.payload
+
+def build_hourly_response(city: str, forecast) -> weather_pb2.HourlyResponse:
+    response = weather_pb2.HourlyResponse(
+        city=city,
+        start_time=forecast.start_time,
+        interval_seconds=forecast.interval_seconds,
+        utc_offset_seconds=forecast.utc_offset_seconds,
+        count=forecast.count,
+    )
+    for var, column in forecast.columns.items():
+        getattr(response, var).extend(column.tolist())
+    return response
+
+def build_export_chunk(city: str, days, columns, encoding) -> weather_pb2.ExportChunk:
+    if encoding == weather_pb2.PACKED_COLUMNS:
+        return weather_pb2.ExportChunk(
+            city=city,
+            dates=days.tolist(),
+            columns=[weather_pb2.Column(variable=var, values=col.tolist()) for var, col in columns.items()],
+        )
+    values = {var: col.tolist() for var, col in columns.items()}
+    records = [
+        # NaN marks a missing value; build_record leaves it unset.
+        build_record(day, {var: v[i] if v[i] == v[i] else None for var, v in values.items()})
+        for i, day in enumerate(days.tolist())
+    ]
+    return weather_pb2.ExportChunk(city=city, records=records)
 
 class WeatherServiceServicer(weather_pb2_grpc.WeatherServiceServicer):
+    def __init__(self, weather: WeatherService = None):
+        settings = get_settings()
+        self.weather = weather or WeatherService()
+        # Finished GetWeather responses, already serialized, per (city, day, selection).
+        self.response_cache = TTLCache(settings.RESPONSE_CACHE_MAX_ENTRIES, settings.RESPONSE_CACHE_TTL_SECONDS)
+        # Exports have their own budget; interactive RPCs never wait on it.
+        self.export_slots = asyncio.Semaphore(settings.EXPORT_MAX_CONCURRENT)
 
     async def GetWeather(self, request, context):
-        svc = WeatherService()
+        svc = self.weather
         city = (request.city or "").strip()
         if not city:
             await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "city is required")
         try:
-            records = await svc.get_forecast_by_city(city)
-            print("SERVICE DATA:", records)
-            if isinstance(records, dict):
-                records = [{"date": date, **rec} for date, rec in records.items()]
-            proto_records = [
-                weather_pb2.Record(
-                    date=r.get("date", ""),
-                    temperature_2m_max_c=r.get("temperature_2m_max_c", 0.0),
-                    temperature_2m_min_c=r.get("temperature_2m_min_c", 0.0),
-                    precipitation_sum_mm=r.get("precipitation_sum_mm", 0.0),
-                    pressure_msl_mean_hpa=r.get("pressure_msl_mean_hpa", 0.0),
-                    wind_speed_10m_max_kmh=r.get("wind_speed_10m_max_kmh", 0.0),
-                    relative_humidity_2m_max_pct=int(r.get("relative_humidity_2m_max_pct", 0)),
-                )
-                for r in records
-            ]
-            return weather_pb2.Response(
-                city=city,
-                timezone="",
-                records=proto_records,
+            selection = normalize_selection(request.variables, request.past_days, request.forecast_days)
+        except ValueError as e:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        cache_key = (city.lower(), date.today().isoformat(), *selection)
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            return cached.for_request(request)
+        try:
+            records = await svc.get_forecast_by_city(city, *selection)
+            cached = CachedResponse(build_response(city, records))
+            self.response_cache.set(cache_key, cached)
+            return cached.for_request(request)
+        except DeadlineExceeded as e:
+            await context.abort(grpc.StatusCode.DEADLINE_EXCEEDED, str(e))
+        except ConnectionError as e:
+            await context.abort(grpc.StatusCode.UNAVAILABLE, str(e))
+        except LookupError as e:
+            await context.abort(grpc.StatusCode.NOT_FOUND, str(e))
+        except Exception as e:
+            await context.abort(grpc.StatusCode.INTERNAL, f"Error fetching weather data: {e}")
+
+    async def GetWeatherByCoordinates(self, request, context):
+        try:
+            validate_coordinates(request.latitude, request.longitude)
+            selection = normalize_selection(request.variables, request.past_days, request.forecast_days)
+        except ValueError as e:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        # Every point in a grid cell gets the same answer.
+        latitude, longitude = self.weather.grid_point(request.latitude, request.longitude)
+        cache_key = ("coordinates", latitude, longitude, date.today().isoformat(), *selection)
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            return cached.for_request(request)
+        try:
+            nearest, _, records = await self.weather.get_forecast_by_coordinates(
+                request.latitude, request.longitude, *selection
             )
+            response = build_response(nearest.name if nearest else "", records)
+            response.latitude, response.longitude = latitude, longitude
+            cached = CachedResponse(response)
+            self.response_cache.set(cache_key, cached)
+            return cached.for_request(request)
+        except DeadlineExceeded as e:
+            await context.abort(grpc.StatusCode.DEADLINE_EXCEEDED, str(e))
         except ConnectionError as e:
             await context.abort(grpc.StatusCode.UNAVAILABLE, str(e))
         except LookupError as e:
             await context.abort(grpc.StatusCode.NOT_FOUND, str(e))
         except Exception as e:
             await context.abort(grpc.StatusCode.INTERNAL, f"Error fetching weather data: {e}")
+
+    async def ExportWeather(self, request, context):
+        if request.chunk_days < 0 or request.chunk_days > MAX_EXPORT_CHUNK_DAYS:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"chunk_days must be between 0 and {MAX_EXPORT_CHUNK_DAYS}")
+        try:
+            end_date = request.end_date or date.today().isoformat()
+            start_date = request.start_date or (
+                date.fromisoformat(end_date) - timedelta(days=DEFAULT_HISTORY_DAYS)
+            ).isoformat()
+            if date.fromisoformat(start_date) > date.fromisoformat(end_date):
+                raise ValueError("start_date must not be after end_date")
+        except ValueError as e:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        if self.export_slots.locked():
+            await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, "Too many exports in progress, retry later")
+        cities = [c.strip() for c in request.cities if c.strip()]
+        async with self.export_slots:
+            try:
+                chunks = self.weather.export(
+                    cities, start_date, end_date, request.chunk_days or DEFAULT_EXPORT_CHUNK_DAYS
+                )
+                async for city, days, columns in chunks:
+                    # write() waits for the client to take the previous message (flow control).
+                    await context.write(build_export_chunk(city, days, columns, request.encoding))
+            except DeadlineExceeded as e:
+                await context.abort(grpc.StatusCode.DEADLINE_EXCEEDED, str(e))
+            except ConnectionError as e:
+                await context.abort(grpc.StatusCode.UNAVAILABLE, str(e))
+            except Exception as e:
+                await context.abort(grpc.StatusCode.INTERNAL, f"Error exporting weather data: {e}")
+
+    async def GetHourlyForecast(self, request, context):
+        city = (request.city or "").strip()
+        if not city:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "city is required")
+        try:
+            selection = normalize_hourly_selection(request.variables, request.hours)
+        except ValueError as e:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        cache_key = ("hourly", city.lower(), current_hour(), *selection)
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        try:
+            forecast = await self.weather.get_hourly_forecast_by_city(city, *selection)
+            payload = build_hourly_response(city, forecast).SerializeToString()
+            self.response_cache.set(cache_key, payload)
+            return payload
+        except DeadlineExceeded as e:
+            await context.abort(grpc.StatusCode.DEADLINE_EXCEEDED, str(e))
+        except ConnectionError as e:
+            await context.abort(grpc.StatusCode.UNAVAILABLE, str(e))
+        except LookupError as e:
+            await context.abort(grpc.StatusCode.NOT_FOUND, str(e))
+        except Exception as e:
+            await context.abort(grpc.StatusCode.INTERNAL, f"Error fetching hourly forecast: {e}")
+
+    async def GetWeatherHistory(self, request, context):
+        city = (request.city or "").strip()
+        if not city:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "city is required")
+        if request.max_points < 0:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "max_points must not be negative")
+        try:
+            end_date = request.end_date or date.today().isoformat()
+            start_date = request.start_date or (
+                date.fromisoformat(end_date) - timedelta(days=DEFAULT_HISTORY_DAYS)
+            ).isoformat()
+            series = await self.weather.get_downsampled_history(
+                city, start_date, end_date,
+                max_points=request.max_points,
+                method=DOWNSAMPLE_METHODS.get(request.method, LTTB),
+            )
+        except ValueError as e:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        except DeadlineExceeded as e:
+            await context.abort(grpc.StatusCode.DEADLINE_EXCEEDED, str(e))
+        except ConnectionError as e:
+            await context.abort(grpc.StatusCode.UNAVAILABLE, str(e))
+        except Exception as e:
+            await context.abort(grpc.StatusCode.INTERNAL, f"Error fetching weather history: {e}")
+        return weather_pb2.HistoryResponse(
+            city=city,
+            start_date=start_date,
+            end_date=end_date,
+            series=[weather_pb2.Series(**s) for s in series],
+        )
+
+    async def AutocompleteCity(self, request, context):
+        prefix = (request.prefix or "").strip()
+        if not prefix:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "prefix is required")
+        limit = min(request.limit or DEFAULT_AUTOCOMPLETE_LIMIT, MAX_AUTOCOMPLETE_LIMIT)
+        cities = self.weather.autocomplete(prefix, limit)
+        return weather_pb2.AutocompleteResponse(
+            suggestions=[
+                weather_pb2.CitySuggestion(
+                    name=c.name,
+                    country=c.country,
+                    admin1=c.admin1,
+                    latitude=c.latitude,
+                    longitude=c.longitude,
+                    population=c.population,
+                )
+                for c in cities
+            ]
+        )
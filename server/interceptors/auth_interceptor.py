@@ -1,11 +1,12 @@
 import logging
-import hmac
 import grpc
 from core.config import get_settings
+from core.request_context import current_api_key, current_claims
+from repositories.api_key_repository import PREFIX_LENGTH
 from services.api_key_service import ApiKeyService
+from services.token_service import InvalidToken, TokenService
 
-settings = get_settings()
-api_key_service = ApiKeyService()
+BEARER_PREFIX = "bearer "
 
 
 def _get_md(md, key):
@@ -20,48 +21,102 @@ def _get_md(md, key):
         return None
 
 
-async def _valid_api_key(value, user_email):
-    try:
-        if not value or not user_email:
-            return False
-        key_info = await api_key_service.get_key(user_email)
-        if not key_info or not key_info.value:
-            return False
-        return hmac.compare_digest(value, key_info.value)
-    except Exception as e:
-        logging.error(f"Error in _valid_api_key: {e}")
-        return False
+def _with_context(handler, var, value):
+    """Run the handler with the context variable `var` set to `value`."""
+    if handler is None:
+        return None
+    if handler.unary_unary is not None:
+        inner = handler.unary_unary
+
+        async def unary_unary(request, context):
+            token = var.set(value)
+            try:
+                return await inner(request, context)
+            finally:
+                var.reset(token)
+        return handler._replace(unary_unary=unary_unary)
+    if handler.unary_stream is not None:
+        inner = handler.unary_stream
+
+        async def unary_stream(request, context):
+            token = var.set(value)
+            try:
+                return await inner(request, context)
+            finally:
+                var.reset(token)
+        return handler._replace(unary_stream=unary_stream)
+    return handler
+
 
 class AuthInterceptor(grpc.aio.ServerInterceptor):
+    """Authenticates calls by bearer access token, or by API key for API_KEY_METHODS.
+
+    A token is checked in memory and its claims reach the handler through
+    core.request_context.current_claims. An API key alone is enough: it is
+    found by its digest in one indexed lookup and exposed as
+    current_api_key. x-user-email is optional and must match the key's owner.
+    """
+
+    def __init__(self, api_key_service: ApiKeyService, settings=None, tokens: TokenService = None):
+        self.api_key_service = api_key_service
+        self.settings = settings or get_settings()
+        self.tokens = tokens or TokenService(self.settings)
+
+    def _bearer_token(self, md):
+        value = _get_md(md, self.settings.AUTHZ_HEADER)
+        if value and value[:len(BEARER_PREFIX)].lower() == BEARER_PREFIX:
+            return value[len(BEARER_PREFIX):].strip()
+        return None
+
+    async def _authenticate_api_key(self, value, user_email=None):
+        try:
+            if not value:
+                return None
+            key_info = await self.api_key_service.authenticate(value)
+            if key_info is None:
+                return None
+            if user_email and user_email.strip().lower() != key_info.user_email:
+                return None
+            return key_info
+        except Exception as e:
+            logging.error(f"Error in _authenticate_api_key: {e}")
+            return None
+
     async def intercept_service(self, continuation, handler_call_details):
+        settings = self.settings
         try:
             logging.info(f"AuthInterceptor: intercepting service {handler_call_details.method}")
             method = handler_call_details.method
             md = handler_call_details.invocation_metadata
-            api_key = _get_md(md, settings.API_KEY_HEADER)
-            user_email =  _get_md(md, "x-user-email")
 
-            if method in settings.PUBLIC_METHODS:
+            public = method in settings.PUBLIC_METHODS
+            token = self._bearer_token(md)
+            if token:
+                try:
+                    claims = self.tokens.verify(token)
+                except InvalidToken as e:
+                    if not public:
+                        return self._deny(f"Invalid access token: {e}")
+                else:
+                    return _with_context(await continuation(handler_call_details), current_claims, claims)
+            if public:
                 return await continuation(handler_call_details)
             if method in settings.API_KEY_METHODS:
-                key_info = None
-                if user_email:
-                    key_info = await api_key_service.get_key(user_email)
-                expected_key = key_info.value if key_info and key_info.value else None
-                if not await _valid_api_key(api_key, user_email):
-                    logging.warning(f"API key mismatch: expected='{expected_key}' received='{api_key}' for user_email='{user_email}'")
-                    return self._deny("API key required or invalid")
-                return await continuation(handler_call_details)
+                api_key = _get_md(md, settings.API_KEY_HEADER)
+                user_email = _get_md(md, "x-user-email")
+                key_info = await self._authenticate_api_key(api_key, user_email)
+                if key_info is None:
+                    # Only the prefix is logged; it identifies the key without revealing it.
+                    logging.warning(f"Invalid API key '{(api_key or '')[:PREFIX_LENGTH]}...' for user_email='{user_email}'")
+                    return self._deny("Access token or API key required or invalid")
+                return _with_context(await continuation(handler_call_details), current_api_key, key_info)
             return await continuation(handler_call_details)
         except Exception as e:
             logging.error(f"AuthInterceptor error: {e}")
             return self._deny("Authentication error")
 
     def _deny(self, msg):
-        def deny(_, ctx):
-            try:
-                logging.warning(f"Denied authentication: {msg}")
-                ctx.abort(grpc.StatusCode.UNAUTHENTICATED, msg)
-            except Exception as e:
-                logging.error(f"Error during deny abort: {e}", exc_info=True)
-        return grpc.unary_unary_rpc_method_handler(deny)
\ No newline at end of file
+        async def deny(_, ctx):
+            logging.warning(f"Denied authentication: {msg}")
+            await ctx.abort(grpc.StatusCode.UNAUTHENTICATED, msg)
+        return grpc.unary_unary_rpc_method_handler(deny)
@@ -0,0 +1,54 @@
+import logging
+import grpc
+from core import deadline
+
+
+class DeadlineInterceptor(grpc.aio.ServerInterceptor):
+    """Makes the client's deadline (context.time_remaining()) the request deadline.
+
+    Handlers run inside core.deadline.scope(), so upstream timeouts and Mongo
+    maxTimeMS shrink to the time the client is still waiting. A call whose
+    deadline has already passed is rejected with DEADLINE_EXCEEDED before the
+    handler runs, as is a DeadlineExceeded that escapes the handler. When the
+    client cancels or the deadline expires, gRPC cancels the handler task;
+    the CancelledError is left to propagate.
+    """
+
+    async def _enter(self, context):
+        remaining = context.time_remaining()
+        if remaining is not None and remaining <= 0:
+            await context.abort(grpc.StatusCode.DEADLINE_EXCEEDED, "Deadline exceeded before the call started")
+        return remaining
+
+    async def _deadline_exceeded(self, context, method, e):
+        logging.warning(f"{method}: {e}")
+        await context.abort(grpc.StatusCode.DEADLINE_EXCEEDED, str(e))
+
+    async def intercept_service(self, continuation, handler_call_details):
+        handler = await continuation(handler_call_details)
+        if handler is None:
+            return None
+        method = handler_call_details.method
+        if handler.unary_unary is not None:
+            inner = handler.unary_unary
+
+            async def unary_unary(request, context):
+                remaining = await self._enter(context)
+                try:
+                    with deadline.scope(remaining):
+                        return await inner(request, context)
+                except deadline.DeadlineExceeded as e:
+                    await self._deadline_exceeded(context, method, e)
+            return handler._replace(unary_unary=unary_unary)
+        if handler.unary_stream is not None:
+            inner = handler.unary_stream
+
+            async def unary_stream(request, context):
+                remaining = await self._enter(context)
+                try:
+                    with deadline.scope(remaining):
+                        return await inner(request, context)
+                except deadline.DeadlineExceeded as e:
+                    await self._deadline_exceeded(context, method, e)
+            return handler._replace(unary_stream=unary_stream)
+        return handler
@@ -0,0 +1,107 @@
+import logging
+import grpc
+from core import metrics
+from core.config import get_settings
+from core.loop_monitor import LoopLagMonitor, mark_rpc
+
+# Priority classes, lowest first. CRITICAL is never shed.
+BATCH = "batch"
+INTERACTIVE = "interactive"
+AUTH = "auth"
+CRITICAL = "critical"
+
+# Share of the configured thresholds at which each class starts being shed:
+# batch work goes first, sign-in last, since every other call depends on it.
+SHED_AT = {BATCH: 0.5, INTERACTIVE: 1.0, AUTH: 1.5}
+
+# Full method or "/package.Service/" prefix -> class; anything else is INTERACTIVE.
+METHOD_PRIORITIES = {
+    "/grpc.health.v1.Health/": CRITICAL,
+    "/user.UserService/": AUTH,
+    "/weather.WeatherService/ExportWeather": BATCH,
+    "/weather.WeatherService/GetWeatherHistory": BATCH,
+}
+
+RETRY_AFTER_SECONDS = "1"
+
+
+def method_priority(method: str) -> str:
+    priority = METHOD_PRIORITIES.get(method)
+    if priority is None:
+        priority = METHOD_PRIORITIES.get(method[:method.rfind("/") + 1], INTERACTIVE)
+    return priority
+
+
+class LoadShedInterceptor(grpc.aio.ServerInterceptor):
+    """Rejects low-priority calls with RESOURCE_EXHAUSTED while the server is overloaded.
+
+    Load is the larger of in-flight RPCs over LOAD_SHED_MAX_IN_FLIGHT and
+    event-loop lag over LOAD_SHED_MAX_LOOP_LAG_MS; loop lag is how long work
+    already queued on this process waits to run. A call is admitted while
+    load is below its class's SHED_AT share. Health checks are always
+    admitted. Put it first, so shed calls cost no authentication lookups.
+    """
+
+    def __init__(self, settings=None, monitor: LoopLagMonitor = None):
+        settings = settings or get_settings()
+        self.enabled = settings.LOAD_SHED_ENABLED
+        self.max_in_flight = settings.LOAD_SHED_MAX_IN_FLIGHT
+        self.max_lag = settings.LOAD_SHED_MAX_LOOP_LAG_MS / 1000.0
+        self.monitor = monitor
+        self.in_flight = 0
+        self.in_flight_gauge = metrics.gauge("grpc_in_flight", "RPCs being handled")
+        self.shed = {
+            priority: metrics.counter(f"load_shed_{priority}_total", f"{priority} calls rejected under load")
+            for priority in SHED_AT
+        }
+
+    def load(self) -> float:
+        load = self.in_flight / self.max_in_flight if self.max_in_flight else 0.0
+        if self.monitor is not None and self.max_lag:
+            load = max(load, self.monitor.lag / self.max_lag)
+        return load
+
+    def admit(self, priority: str) -> bool:
+        if not self.enabled or priority == CRITICAL:
+            return True
+        return self.load() < SHED_AT[priority]
+
+    def _reject(self, method, priority):
+        load = self.load()
+
+        async def reject(_, context):
+            # Debug only: a warning per rejected call would add to the overload.
+            logging.debug(f"Shedding {priority} call {method} at load {load:.2f}")
+            await context.abort(
+                grpc.StatusCode.RESOURCE_EXHAUSTED,
+                "Server overloaded, retry later.",
+                trailing_metadata=(("retry-after", RETRY_AFTER_SECONDS),),
+            )
+        return grpc.unary_unary_rpc_method_handler(reject)
+
+    def _track(self, method, inner):
+        async def tracked(request, context):
+            mark_rpc(method)
+            self.in_flight += 1
+            self.in_flight_gauge.set(self.in_flight)
+            try:
+                return await inner(request, context)
+            finally:
+                self.in_flight -= 1
+                self.in_flight_gauge.set(self.in_flight)
+        return tracked
+
+    async def intercept_service(self, continuation, handler_call_details):
+        method = handler_call_details.method
+        priority = method_priority(method)
+        if not self.admit(priority):
+            self.shed[priority].inc()
+            return self._reject(method, priority)
+        handler = await continuation(handler_call_details)
+        if handler is None or priority == CRITICAL:
+            return handler
+        if handler.unary_unary is not None:
+            return handler._replace(unary_unary=self._track(method, handler.unary_unary))
+        if handler.unary_stream is not None:
+            return handler._replace(unary_stream=self._track(method, handler.unary_stream))
+        return handler
@@ -1,5 +1,9 @@
 import logging
 from grpc.aio import ServerInterceptor
+from core.config import get_settings
+
+# Credentials are logged by their first characters only.
+VISIBLE_SECRET_CHARS = 8
 
 endpoint_logger = logging.getLogger("endpoint_logger")
 endpoint_logger.setLevel(logging.INFO)
@@ -8,10 +12,20 @@ formatter = logging.Formatter("%(asctime)s %(levelname)s %(message)s")
 file_handler.setFormatter(formatter)
 endpoint_logger.addHandler(file_handler)
 
+def _redact(value) -> str:
+	value = str(value)
+	return f"{value[:VISIBLE_SECRET_CHARS]}..." if value else value
+
 class LogInterceptor(ServerInterceptor):
+	def __init__(self, settings=None):
+		settings = settings or get_settings()
+		self.secret_headers = {settings.API_KEY_HEADER.lower(), settings.AUTHZ_HEADER.lower()}
+
 	async def intercept_service(self, continuation, handler_call_details):
 		method = handler_call_details.method
 		metadata = handler_call_details.invocation_metadata
-		meta_str = ", ".join([f"{m.key}={m.value}" for m in metadata]) if metadata else "No metadata"
+		meta_str = ", ".join([
+			f"{m.key}={_redact(m.value) if m.key.lower() in self.secret_headers else m.value}" for m in metadata
+		]) if metadata else "No metadata"
 		endpoint_logger.info(f"Endpoint called: {method} | Metadata: {meta_str}")
 		return await continuation(handler_call_details)
\ No newline at end of file
@@ -0,0 +1,97 @@
+import logging
+import math
+import time
+import grpc
+from core import metrics
+from core.cache import TTLCache
+from core.config import get_settings
+from core.request_context import current_api_key
+from services.usage_service import UsageService
+from utils.rate_limit import TokenBucket
+
+RETRY_AFTER_KEY = "retry-after"
+# Buckets of keys idle this long are dropped; a new bucket starts full, which is where an idle one would be anyway.
+BUCKET_IDLE_SECONDS = 3600
+MAX_BUCKETS = 100_000
+
+
+class RateLimitInterceptor(grpc.aio.ServerInterceptor):
+    """Limits calls per API key with an in-memory token bucket per key.
+
+    Must come after AuthInterceptor, which exposes the authenticated key
+    through core.request_context.current_api_key. Limits come from
+    RATE_LIMIT_TIERS by the key's tier. Over-limit calls are rejected with
+    RESOURCE_EXHAUSTED and a retry-after trailer (whole seconds); accepted
+    calls are counted in the UsageService. Calls without an API key pass.
+    """
+
+    def __init__(self, usage: UsageService = None, settings=None, clock=None):
+        self.settings = settings or get_settings()
+        self.usage = usage
+        self._clock = clock or time.monotonic
+        self._buckets = TTLCache(MAX_BUCKETS, BUCKET_IDLE_SECONDS)
+        self.rejected = metrics.counter("rate_limited_total", "Calls rejected by the per-key rate limit")
+
+    def _limit(self, tier):
+        tiers = self.settings.RATE_LIMIT_TIERS
+        return tiers.get(tier) or tiers.get(self.settings.DEFAULT_API_KEY_TIER)
+
+    def _bucket(self, key_info):
+        bucket = self._buckets.get(key_info.digest)
+        if bucket is None:
+            limit = self._limit(key_info.tier)
+            if not limit or limit[0] <= 0:
+                return None
+            requests_per_minute, burst = limit
+            bucket = TokenBucket(requests_per_minute / 60.0, burst, clock=self._clock)
+        # Re-set on every call so the idle timeout counts from the last use.
+        self._buckets.set(key_info.digest, bucket)
+        return bucket
+
+    def check(self, key_info) -> float:
+        """Take a token for the key; returns 0 when allowed, else seconds until it would be."""
+        bucket = self._bucket(key_info)
+        wait = bucket.try_acquire() if bucket is not None else 0.0
+        if wait:
+            self.rejected.inc()
+            return wait
+        if self.usage is not None:
+            self.usage.record(key_info.digest)
+        return 0.0
+
+    async def _reject(self, key_info, wait, context):
+        retry_after = max(1, math.ceil(wait))
+        logging.warning(f"Rate limit exceeded for API key '{key_info.prefix}...' (tier '{key_info.tier or self.settings.DEFAULT_API_KEY_TIER}')")
+        await context.abort(
+            grpc.StatusCode.RESOURCE_EXHAUSTED,
+            f"Rate limit exceeded, retry after {retry_after}s.",
+            trailing_metadata=((RETRY_AFTER_KEY, str(retry_after)),),
+        )
+
+    async def intercept_service(self, continuation, handler_call_details):
+        handler = await continuation(handler_call_details)
+        if handler is None:
+            return None
+        if handler.unary_unary is not None:
+            inner = handler.unary_unary
+
+            async def unary_unary(request, context):
+                key_info = current_api_key.get()
+                if key_info is not None:
+                    wait = self.check(key_info)
+                    if wait:
+                        await self._reject(key_info, wait, context)
+                return await inner(request, context)
+            return handler._replace(unary_unary=unary_unary)
+        if handler.unary_stream is not None:
+            inner = handler.unary_stream
+
+            async def unary_stream(request, context):
+                key_info = current_api_key.get()
+                if key_info is not None:
+                    wait = self.check(key_info)
+                    if wait:
+                        await self._reject(key_info, wait, context)
+                return await inner(request, context)
+            return handler._replace(unary_stream=unary_stream)
+        return handler
@@ -1,17 +1,49 @@
 class ApiKeyInfo:
+    """An API key as stored: a display prefix and the SHA-256 digest of the key.
+
+    `value` holds the plaintext only on the object returned when the key is
+    created; it is never stored.
+    """
+
     def __init__(
         self,
         user_email: str,
-        value: str,
-        created_at: str,
+        value: str = "",
+        created_at=None,
+        prefix: str = "",
+        digest: str = "",
+        expires_at=None,
+        tier: str = "",
     ):
         self.user_email = user_email
         self.value = value
         self.created_at = created_at
+        self.prefix = prefix
+        self.digest = digest
+        self.expires_at = expires_at
+        # Rate limit tier; empty means the configured default.
+        self.tier = tier
 
     def to_dict(self):
-        return {
+        doc = {
             "user_email": self.user_email,
-            "value": self.value,
+            "prefix": self.prefix,
+            "digest": self.digest,
             "created_at": self.created_at,
         }
+        if self.expires_at is not None:
+            doc["expires_at"] = self.expires_at
+        if self.tier:
+            doc["tier"] = self.tier
+        return doc
+
+    @classmethod
+    def from_dict(cls, doc: dict) -> "ApiKeyInfo":
+        return cls(
+            user_email=doc.get("user_email", ""),
+            created_at=doc.get("created_at"),
+            prefix=doc.get("prefix", ""),
+            digest=doc.get("digest", ""),
+            expires_at=doc.get("expires_at"),
+            tier=doc.get("tier", ""),
+        )
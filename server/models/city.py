@@ -0,0 +1,43 @@
+class City:
+    def __init__(
+        self,
+        name: str,
+        country: str,
+        latitude: float,
+        longitude: float,
+        admin1: str = "",
+        population: int = 0,
+    ):
+        self.name = name
+        self.country = country
+        self.latitude = latitude
+        self.longitude = longitude
+        self.admin1 = admin1
+        self.population = population
+
+    @property
+    def key(self) -> str:
+        # Same name in the same country can still be a different place.
+        return f"{self.name}|{self.country}|{self.latitude:.2f}|{self.longitude:.2f}"
+
+    def to_dict(self):
+        return {
+            "key": self.key,
+            "name": self.name,
+            "country": self.country,
+            "admin1": self.admin1,
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+            "population": self.population,
+        }
+
+    @classmethod
+    def from_dict(cls, doc: dict) -> "City":
+        return cls(
+            name=doc.get("name", ""),
+            country=doc.get("country", ""),
+            latitude=float(doc.get("latitude", 0.0)),
+            longitude=float(doc.get("longitude", 0.0)),
+            admin1=doc.get("admin1", "") or "",
+            population=int(doc.get("population", 0) or 0),
+        )
@@ -1,11 +1,7 @@
 from pydantic import BaseModel
-from typing import List
+from typing import Dict, List, Optional
 
 class DailyWeatherData(BaseModel):
     times: List[str]
-    daily_temperature_2m_max: List[float]
-    daily_temperature_2m_min: List[float]
-    daily_precipitation_sum: List[float]
-    daily_pressure_msl_mean: List[float]
-    daily_wind_speed_10m_max: List[float]
-    daily_relative_humidity_2m_max: List[int]
+    # Record field name -> one value per entry in `times`.
+    values: Dict[str, List[Optional[float]]]
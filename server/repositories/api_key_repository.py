@@ -1,41 +1,85 @@
+import hashlib
 import logging
-from db.mongo_client import get_collection
+from datetime import datetime, timezone
+from db.mongo_client import get_collection, max_time_ms
 from models.api_key_info import ApiKeyInfo
+from pymongo import DESCENDING
 from pymongo.errors import PyMongoError, DuplicateKeyError, OperationFailure, ConnectionFailure, ServerSelectionTimeoutError
-from typing import Optional
+from typing import List, Optional
 
 logger = logging.getLogger(__name__)
 
 MONGODB_CONN_FAILED_MSG = "MongoDB connection failed."
+# Index on the plaintext value from before keys were hashed.
+LEGACY_VALUE_INDEX = "value_1"
+PREFIX_LENGTH = 8
+
+
+def hash_key(value: str) -> str:
+    return hashlib.sha256(value.encode()).hexdigest()
+
+
+def _active_filter() -> dict:
+    # The TTL monitor runs about once a minute, so expired keys are also filtered here.
+    return {"$or": [{"expires_at": {"$exists": False}}, {"expires_at": {"$gt": datetime.now(timezone.utc)}}]}
+
 
 class ApiKeyRepository:
     def __init__(self, collection_name="api_keys"):
         self.collection_name = collection_name
 
     async def ensure_indexes(self):
+        """Drop the plaintext index, hash leftover plaintext keys, then build the current indexes.
+
+        Order matters: migrated and new documents have no `value`, so they
+        collide on null under the legacy unique `value_1` index, and the
+        unique `digest` index can only be built once every key has a digest.
+        Every step is safe to re-run after a partial failure.
+        """
         try:
             collection = await get_collection(self.collection_name)
-            await collection.create_index("value", unique=True, expireAfterSeconds=86400)
         except Exception as e:
             logger.error(f"Failed ensuring indexes for api_keys: {e}")
+            return
+        try:
+            if LEGACY_VALUE_INDEX in await collection.index_information():
+                await collection.drop_index(LEGACY_VALUE_INDEX)
+        except Exception as e:
+            logger.error(f"Failed dropping legacy index {LEGACY_VALUE_INDEX} on api_keys: {e}")
+        try:
+            await self._migrate_plaintext(collection)
+        except Exception as e:
+            logger.error(f"Failed hashing plaintext API keys: {e}")
+        try:
+            await collection.create_index("digest", unique=True)
+            await collection.create_index("user_email")
+            # Each key expires at its own expires_at; keys without one never do.
+            await collection.create_index("expires_at", expireAfterSeconds=0)
+        except Exception as e:
+            logger.error(f"Failed ensuring indexes for api_keys: {e}")
+
+    async def _migrate_plaintext(self, collection):
+        """Replace plaintext `value` fields left by older versions with prefix and digest."""
+        migrated = 0
+        async for doc in collection.find({"value": {"$exists": True}}, {"value": 1}):
+            value = doc["value"] or ""
+            # Only while the plaintext is still there, so concurrent or repeated runs are no-ops.
+            result = await collection.update_one(
+                {"_id": doc["_id"], "value": {"$exists": True}},
+                {"$set": {"prefix": value[:PREFIX_LENGTH], "digest": hash_key(value)}, "$unset": {"value": ""}},
+            )
+            migrated += result.modified_count
+        if migrated:
+            logger.info(f"Hashed {migrated} plaintext API keys.")
 
     async def insert(self, api_key_info: ApiKeyInfo) -> Optional[ApiKeyInfo]:
-        from datetime import datetime
         try:
             collection = await get_collection(self.collection_name)
-            doc = api_key_info.to_dict()
-            if "created_at" in doc:
-                if isinstance(doc["created_at"], str):
-                    try:
-                        doc["created_at"] = datetime.fromisoformat(doc["created_at"])
-                    except Exception:
-                        from datetime import timezone
-                        doc["created_at"] = datetime.now(timezone.utc)
-            await collection.insert_one(doc)
-            logger.info(f"Inserted API key for user '{api_key_info.user_email}' value '{api_key_info.value}'.")
+            await collection.insert_one(api_key_info.to_dict())
+            logger.info(f"Inserted API key '{api_key_info.prefix}...' for user '{api_key_info.user_email}'.")
             return api_key_info
         except DuplicateKeyError:
-            logger.warning(f"Duplicate API key for user '{api_key_info.user_email}' and value '{api_key_info.value}'.")
+            logger.warning(f"Duplicate API key '{api_key_info.prefix}...' for user '{api_key_info.user_email}'.")
         except (ConnectionFailure, ServerSelectionTimeoutError):
             logger.error(MONGODB_CONN_FAILED_MSG)
         except OperationFailure as e:
@@ -46,22 +90,31 @@ class ApiKeyRepository:
             logger.exception(f"Unexpected error during API key insert: {e}")
         return None
 
+    async def find_by_digest(self, digest: str) -> Optional[ApiKeyInfo]:
+        """Active key with this digest: one point lookup on the unique index."""
+        try:
+            collection = await get_collection(self.collection_name)
+            doc = await collection.find_one({"digest": digest, **_active_filter()}, max_time_ms=max_time_ms())
+            return ApiKeyInfo.from_dict(doc) if doc else None
+        except (ConnectionFailure, ServerSelectionTimeoutError):
+            logger.error(MONGODB_CONN_FAILED_MSG)
+        except OperationFailure as e:
+            logger.error(f"MongoDB operation failed: {e}")
+        except PyMongoError as e:
+            logger.error(f"Unexpected PyMongo error: {e}")
+        except Exception as e:
+            logger.exception(f"Unexpected error during API key lookup: {e}")
+        return None
 
-    async def get(self, user_email: str) -> Optional[ApiKeyInfo]:
+    async def find_by_user(self, user_email: str) -> List[ApiKeyInfo]:
+        """Active keys of a user, newest first."""
         try:
-            from datetime import datetime
             collection = await get_collection(self.collection_name)
-            doc = await collection.find_one({"user_email": user_email})
-            if doc:
-                created_at = doc.get("created_at", "")
-                if isinstance(created_at, datetime):
-                    created_at = created_at.isoformat()
-                return ApiKeyInfo(
-                    user_email=doc.get("user_email", ""),
-                    value=doc.get("value", ""),
-                    created_at=created_at,
-                )
-            return None
+            cursor = collection.find(
+                {"user_email": user_email, **_active_filter()}, sort=[("created_at", DESCENDING)],
+                max_time_ms=max_time_ms(),
+            )
+            return [ApiKeyInfo.from_dict(doc) async for doc in cursor]
         except (ConnectionFailure, ServerSelectionTimeoutError):
             logger.error(MONGODB_CONN_FAILED_MSG)
         except OperationFailure as e:
@@ -70,4 +123,4 @@ class ApiKeyRepository:
             logger.error(f"Unexpected PyMongo error: {e}")
         except Exception as e:
             logger.exception(f"Unexpected error during API key get: {e}")
-        return None
\ No newline at end of file
+        return []
@@ -0,0 +1,56 @@
+import logging
+from datetime import datetime, timezone
+from bson import Binary
+from db.mongo_client import get_collection
+from pymongo import ASCENDING
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+class CacheRepository:
+    """Cache tier in Mongo (see core.tiered_cache): one document per key, removed by a TTL index.
+
+    The TTL monitor runs about once a minute, so reads also check expires_at.
+    Errors propagate: the tiered cache counts them and carries on as a miss.
+    """
+
+    name = "mongo"
+    stores_objects = False
+
+    def __init__(self, collection_name="cache"):
+        self.collection_name = collection_name
+
+    async def init(self):
+        await self.ensure_indexes()
+
+    async def ensure_indexes(self):
+        try:
+            collection = await get_collection(self.collection_name)
+            await collection.create_index([("expires_at", ASCENDING)], expireAfterSeconds=0)
+        except PyMongoError as e:
+            logger.error(f"Failed ensuring indexes for {self.collection_name}: {e}")
+
+    async def get(self, key: str):
+        collection = await get_collection(self.collection_name)
+        doc = await collection.find_one({"_id": key, "expires_at": {"$gt": datetime.now(timezone.utc)}})
+        if doc is None:
+            return None
+        expires_at = doc["expires_at"]
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        return bytes(doc["value"]), expires_at.timestamp()
+
+    async def set(self, key: str, value: bytes, expires_at: float):
+        collection = await get_collection(self.collection_name)
+        await collection.replace_one(
+            {"_id": key},
+            {"value": Binary(value), "expires_at": datetime.fromtimestamp(expires_at, timezone.utc)},
+            upsert=True,
+        )
+
+    async def delete(self, key: str):
+        collection = await get_collection(self.collection_name)
+        await collection.delete_one({"_id": key})
+
+    async def close(self):
+        pass
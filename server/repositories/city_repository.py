@@ -0,0 +1,49 @@
+import logging
+from typing import List
+from db.mongo_client import get_collection, max_time_ms
+from models.city import City
+from pymongo.errors import PyMongoError, OperationFailure, ConnectionFailure, ServerSelectionTimeoutError
+
+logger = logging.getLogger(__name__)
+
+MONGODB_CONN_FAILED_MSG = "MongoDB connection failed."
+
+class CityRepository:
+    def __init__(self, collection_name="cities"):
+        self.collection_name = collection_name
+
+    async def ensure_indexes(self):
+        try:
+            collection = await get_collection(self.collection_name)
+            await collection.create_index("key", unique=True)
+        except Exception as e:
+            logger.error(f"Failed ensuring indexes for cities: {e}")
+
+    async def upsert(self, city: City) -> bool:
+        try:
+            collection = await get_collection(self.collection_name)
+            doc = city.to_dict()
+            await collection.update_one({"key": doc["key"]}, {"$set": doc}, upsert=True)
+            return True
+        except (ConnectionFailure, ServerSelectionTimeoutError):
+            logger.error(MONGODB_CONN_FAILED_MSG)
+        except OperationFailure as e:
+            logger.error(f"MongoDB operation failed: {e}")
+        except PyMongoError as e:
+            logger.error(f"Unexpected PyMongo error: {e}")
+        except Exception as e:
+            logger.exception(f"Unexpected error during city upsert: {e}")
+        return False
+
+    async def find_all(self) -> List[City]:
+        try:
+            collection = await get_collection(self.collection_name)
+            cursor = collection.find({}, {"_id": 0}, max_time_ms=max_time_ms())
+            return [City.from_dict(doc) async for doc in cursor]
+        except (ConnectionFailure, ServerSelectionTimeoutError):
+            logger.error(MONGODB_CONN_FAILED_MSG)
+        except PyMongoError as e:
+            logger.error(f"PyMongoError during cities find: {e}")
+        except Exception as e:
+            logger.exception(f"Unexpected error during cities find: {e}")
+        return []
@@ -1,5 +1,5 @@
 import logging
-from db.mongo_client import get_collection
+from db.mongo_client import get_collection, max_time_ms
 from pymongo.errors import PyMongoError, DuplicateKeyError, OperationFailure, ConnectionFailure, ServerSelectionTimeoutError
 from datetime import timezone
 
@@ -44,7 +44,7 @@ class EmailRepository:
     async def get_by_user_email(self, user_email: str):
         try:
             collection = await get_collection(self.collection_name)
-            doc = await collection.find_one({"user_email": user_email})
+            doc = await collection.find_one({"user_email": user_email}, max_time_ms=max_time_ms())
             return doc
         except (ConnectionFailure, ServerSelectionTimeoutError):
             logger.error("MongoDB connection failed.")
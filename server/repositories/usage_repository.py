@@ -0,0 +1,53 @@
+import logging
+from typing import Dict, Optional, Tuple
+from db.mongo_client import get_collection
+from pymongo import ASCENDING, UpdateOne
+from pymongo.errors import PyMongoError, OperationFailure, ConnectionFailure, ServerSelectionTimeoutError
+
+logger = logging.getLogger(__name__)
+
+MONGODB_CONN_FAILED_MSG = "MongoDB connection failed."
+
+class UsageRepository:
+    """Request counts per API key (by digest) per UTC day."""
+
+    def __init__(self, collection_name="api_key_usage"):
+        self.collection_name = collection_name
+
+    async def ensure_indexes(self):
+        try:
+            collection = await get_collection(self.collection_name)
+            await collection.create_index([("digest", ASCENDING), ("day", ASCENDING)], unique=True)
+        except Exception as e:
+            logger.error(f"Failed ensuring indexes for api_key_usage: {e}")
+
+    async def increment(self, counts: Dict[Tuple[str, str], int]) -> Optional[bool]:
+        """Add counts keyed by (digest, day) in one unordered bulk write of $inc upserts."""
+        if not counts:
+            return True
+        ops = [
+            UpdateOne({"digest": digest, "day": day}, {"$inc": {"count": count}}, upsert=True)
+            for (digest, day), count in counts.items()
+        ]
+        try:
+            collection = await get_collection(self.collection_name)
+            await collection.bulk_write(ops, ordered=False)
+            return True
+        except (ConnectionFailure, ServerSelectionTimeoutError):
+            logger.error(MONGODB_CONN_FAILED_MSG)
+        except OperationFailure as e:
+            logger.error(f"MongoDB operation failed: {e}")
+        except PyMongoError as e:
+            logger.error(f"Unexpected PyMongo error: {e}")
+        except Exception as e:
+            logger.exception(f"Unexpected error during usage increment: {e}")
+        return None
+
+    async def get(self, digest: str, day: str) -> int:
+        try:
+            collection = await get_collection(self.collection_name)
+            doc = await collection.find_one({"digest": digest, "day": day})
+            return int(doc.get("count", 0)) if doc else 0
+        except PyMongoError as e:
+            logger.error(f"PyMongoError during usage get: {e}")
+        return 0
@@ -1,9 +1,10 @@
+import asyncio
 import logging
 import os
 import base64
 import hashlib
 from typing import Optional, Dict, Any
-from db.mongo_client import get_collection
+from db.mongo_client import get_collection, max_time_ms
 from pymongo.errors import PyMongoError, DuplicateKeyError, OperationFailure, ConnectionFailure, ServerSelectionTimeoutError
 
 logger = logging.getLogger(__name__)
@@ -24,11 +25,12 @@ class UserRepository:
     async def create_user(self, user_id: str, name: str, email: str, password: str) -> Optional[str]:
         try:
             coll = await self._get_collection()
-            existing = await coll.find_one({"email": email})
+            existing = await coll.find_one({"email": email}, max_time_ms=max_time_ms())
             if existing:
                 logger.info(f"User with email '{email}' already exists.")
                 return str(existing.get("_id"))
-            ph = self._hash_password(password)
+            # 100k PBKDF2 rounds take tens of milliseconds; keep them off the event loop.
+            ph = await asyncio.to_thread(self._hash_password, password)
             doc = {
                 "user_id": user_id,
                 "name": name,
@@ -54,7 +56,7 @@ class UserRepository:
     async def find_by_email(self, email: str) -> Optional[Dict[str, Any]]:
         try:
             coll = await self._get_collection()
-            return await coll.find_one({"email": email})
+            return await coll.find_one({"email": email}, max_time_ms=max_time_ms())
         except Exception as e:
             logger.error(f"Error finding user by email '{email}': {e}")
             return None
@@ -71,11 +73,13 @@ class UserRepository:
     async def login(self, email: str, password: str) -> Optional[Dict[str, Any]]:
         try:
             coll = await self._get_collection()
-            doc = await coll.find_one({"email": email})
+            doc = await coll.find_one({"email": email}, max_time_ms=max_time_ms())
             if not doc:
                 return None
             salt_b = base64.b64decode(doc.get("password_salt", ""))
-            test_hash = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt_b, 100_000)
+            test_hash = await asyncio.to_thread(
+                hashlib.pbkdf2_hmac, "sha256", password.encode("utf-8"), salt_b, 100_000
+            )
             if base64.b64encode(test_hash).decode() == doc.get("password_hash"):
                 return doc
             return None
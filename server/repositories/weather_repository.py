@@ -1,15 +1,89 @@
 import logging
-from db.mongo_client import get_collection
+from typing import Any, AsyncIterator, Mapping, Optional, Tuple
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from core import deadline
+from db.mongo_client import deadline_ms, get_collection, max_time_ms
+from pymongo import ASCENDING, UpdateOne
 from pymongo.errors import (
-    PyMongoError, ServerSelectionTimeoutError, DuplicateKeyError,
+    BulkWriteError, PyMongoError, ServerSelectionTimeoutError, DuplicateKeyError,
     OperationFailure, ConnectionFailure, ExecutionTimeout)
 
 logger = logging.getLogger(__name__)
 
+DUPLICATE_KEY_ERROR = 11000
+DEFAULT_BATCH_SIZE = 500
+KEYSET_SORT = [("city", ASCENDING), ("date", ASCENDING)]
+RAW_CODEC_OPTIONS = CodecOptions(document_class=RawBSONDocument)
+
 class WeatherRepository:
     def __init__(self, collection_name="weather"):
         self.collection_name = collection_name
 
+    async def ensure_indexes(self):
+        try:
+            collection = await get_collection(self.collection_name)
+            await collection.create_index([("city", ASCENDING), ("date", ASCENDING)], unique=True)
+        except Exception as e:
+            logger.error(f"Failed ensuring indexes for weather: {e}")
+
+    async def bulk_upsert(self, docs):
+        """Merge (city, date) documents into storage in one unordered bulk write.
+
+        Each value under records is set by its own day.variable path, so a
+        later fetch that covers more days or variables adds to the stored
+        document instead of being dropped, and a narrower one leaves the
+        rest alone. Returns how many documents were written, or None if the
+        write failed outright.
+        """
+        docs = [d for d in docs or [] if self._is_valid_doc(d) and d.get("city") and d.get("date")]
+        if not docs:
+            return 0
+        ops = [self._merge_op(d) for d in docs]
+        try:
+            collection = await get_collection(self.collection_name)
+            try:
+                result = await collection.bulk_write(ops, ordered=False)
+                return result.upserted_count + result.matched_count
+            except BulkWriteError as e:
+                errors = e.details.get("writeErrors", [])
+                # Racing upserts of the same (city, date) hit the unique index; the
+                # document exists now, so the losers are retried as plain merges.
+                retry = [ops[err["index"]] for err in errors if err.get("code") == DUPLICATE_KEY_ERROR]
+                errors = [err for err in errors if err.get("code") != DUPLICATE_KEY_ERROR]
+                if retry:
+                    try:
+                        await collection.bulk_write(retry, ordered=False)
+                    except BulkWriteError as retry_error:
+                        errors.extend(retry_error.details.get("writeErrors", []))
+                if errors:
+                    logger.error(f"Bulk upsert had {len(errors)} write errors, first: {errors[0].get('errmsg')}")
+                return len(docs) - len(errors)
+        except (ConnectionFailure, ServerSelectionTimeoutError):
+            logger.error("MongoDB connection failed during bulk upsert.")
+        except OperationFailure as e:
+            logger.error(f"MongoDB operation failed: {e}")
+        except PyMongoError as e:
+            logger.error(f"Unexpected PyMongo error: {e}")
+        except Exception as e:
+            logger.exception(f"Unexpected error during bulk upsert: {e}")
+        return None
+
+    @staticmethod
+    def _merge_op(doc) -> UpdateOne:
+        values = {
+            f"records.{day}.{var}": value
+            for day, record in (doc.get("records") or {}).items()
+            for var, value in (record or {}).items()
+        }
+        on_insert = {k: v for k, v in doc.items() if k not in ("city", "date", "records", "_id")}
+        if not values:
+            on_insert["records"] = {}
+        update = {"$setOnInsert": on_insert}
+        if values:
+            update["$set"] = values
+        return UpdateOne({"city": doc["city"], "date": doc["date"]}, update, upsert=True)
+
     async def insert(self, doc):
         if not self._is_valid_doc(doc):
             logger.warning("Insert called without a valid document.")
@@ -21,7 +95,7 @@ class WeatherRepository:
 
             if await self._doc_exists(collection, city, date):
                 logger.info(f"Weather data for city '{city}' and date '{date}' already exists in the database.")
-                existing = await collection.find_one({"city": city, "date": date})
+                existing = await collection.find_one({"city": city, "date": date}, max_time_ms=max_time_ms())
                 return existing.get("_id") if existing else None
 
             result = await collection.insert_one(doc)
@@ -46,7 +120,7 @@ class WeatherRepository:
 
     async def _doc_exists(self, collection, city, date):
         if city and date:
-            existing = await collection.find_one({"city": city, "date": date})
+            existing = await collection.find_one({"city": city, "date": date}, max_time_ms=max_time_ms())
             return existing is not None
         return False
 
@@ -58,22 +132,124 @@ class WeatherRepository:
         else:
             logger.warning("Duplicate key error while inserting document (missing or invalid doc).")
 
-    async def find(self, query=None):
+    async def find(self, query=None, projection=None, sort=None, limit: int = 0):
         if query is None:
             query = {}
 
         try:
-            collection = await get_collection(self.collection_name)
-            cursor = collection.find(query)
-            return [doc async for doc in cursor]
-
+            return [doc async for doc in self.stream(query, projection=projection, sort=sort, limit=limit)]
+        except ConnectionError:
+            pass
         except ExecutionTimeout:
             logger.warning("Query execution timeout.")
-        except (ConnectionFailure, ServerSelectionTimeoutError):
-            logger.error("MongoDB connection failed during find.")
         except PyMongoError as e:
             logger.error(f"PyMongoError during find: {e}")
         except Exception as e:
             logger.exception(f"Unexpected error during find: {e}")
 
         return []
+
+    async def distinct_cities(self):
+        try:
+            collection = await get_collection(self.collection_name)
+            return sorted(await collection.distinct("city", maxTimeMS=max_time_ms()))
+        except (ConnectionFailure, ServerSelectionTimeoutError) as e:
+            logger.error("MongoDB connection failed during distinct.")
+            raise ConnectionError(f"MongoDB connection failed: {e}") from e
+        except PyMongoError as e:
+            logger.error(f"PyMongoError during distinct: {e}")
+            raise
+
+    async def bulk_merge_days(self, city, records):
+        """Store archive days as one document per city and day, in one unordered bulk write.
+
+        Each day's record is set into the document for (city, day), creating it
+        when missing, so a rerun overwrites rather than duplicates. Returns the
+        number of days written, or None if the write failed outright.
+        """
+        if not city or not records:
+            return 0
+        ops = [
+            UpdateOne(
+                {"city": city, "date": day},
+                {"$set": {f"records.{day}": record}, "$setOnInsert": {"fetch_date": day}},
+                upsert=True,
+            )
+            for day, record in records.items()
+        ]
+        try:
+            collection = await get_collection(self.collection_name)
+            result = await collection.bulk_write(ops, ordered=False)
+            return result.upserted_count + result.matched_count
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            logger.error(f"Bulk merge for '{city}' had {len(errors)} write errors: {e}")
+            return len(ops) - len(errors)
+        except (ConnectionFailure, ServerSelectionTimeoutError):
+            logger.error("MongoDB connection failed during bulk merge.")
+        except PyMongoError as e:
+            logger.error(f"Unexpected PyMongo error: {e}")
+        except Exception as e:
+            logger.exception(f"Unexpected error during bulk merge: {e}")
+        return None
+
+    @staticmethod
+    def after_filter(after: Tuple[str, str]) -> dict:
+        """Documents strictly after (city, date) in KEYSET_SORT order."""
+        city, date = after
+        return {"$or": [{"city": {"$gt": city}}, {"city": city, "date": {"$gt": date}}]}
+
+    async def stream(
+        self,
+        query: Optional[Mapping[str, Any]] = None,
+        projection: Optional[Mapping[str, Any]] = None,
+        sort=None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        after: Optional[Tuple[str, str]] = None,
+        limit: int = 0,
+        raw: bool = False,
+        time_limit_ms: Optional[int] = None,
+    ) -> AsyncIterator[Mapping[str, Any]]:
+        """Yield matching documents one server batch at a time.
+
+        Only `batch_size` documents are held in memory. Passing `after` (the
+        (city, date) of the last document seen) resumes in (city, date) order,
+        which the unique index serves without an in-memory sort. With
+        `raw=True` documents are RawBSONDocuments, decoded lazily per field.
+        maxTimeMS covers the whole cursor, so long exports can pass
+        `time_limit_ms=0` to lift the default limit; the request deadline,
+        if any, still applies.
+
+        Errors are logged and raised; a connection failure surfaces as
+        ConnectionError so a partially read stream is never mistaken for
+        a complete one.
+        """
+        query = dict(query or {})
+        if after is not None:
+            query = {"$and": [query, self.after_filter(after)]} if query else self.after_filter(after)
+            sort = sort or KEYSET_SORT
+
+        try:
+            collection = await get_collection(self.collection_name)
+            if raw:
+                collection = collection.with_options(codec_options=RAW_CODEC_OPTIONS)
+            if time_limit_ms is None:
+                time_limit_ms = max_time_ms()
+            cursor = collection.find(
+                query, projection, sort=sort, limit=limit, batch_size=batch_size,
+                max_time_ms=time_limit_ms or deadline_ms(),
+            )
+            async with cursor:
+                async for doc in cursor:
+                    yield doc
+        except ExecutionTimeout as e:
+            logger.warning("Query execution timeout while streaming.")
+            # Cut short by the request deadline rather than the default limit.
+            deadline.check()
+            raise
+        except (ConnectionFailure, ServerSelectionTimeoutError) as e:
+            logger.error("MongoDB connection failed during find.")
+            raise ConnectionError(f"MongoDB connection failed: {e}") from e
+        except PyMongoError as e:
+            logger.error(f"PyMongoError during find: {e}")
+            raise
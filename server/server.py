@@ -1,13 +1,31 @@
 import asyncio
+import functools
+import signal
 import grpc.aio
+from grpc_health.v1 import health_pb2_grpc
 from interceptors.auth_interceptor import AuthInterceptor
+from interceptors.deadline_interceptor import DeadlineInterceptor
+from interceptors.load_shed_interceptor import LoadShedInterceptor
 from interceptors.log_interceptor import LogInterceptor
+from interceptors.rate_limit_interceptor import RateLimitInterceptor
+from handlers.admin_servicer import AdminServiceServicer
 from handlers.weather_service_servicer import WeatherServiceServicer
 from handlers.user_service_servicer import UserServiceServicer
-from proto.generated import weather_pb2_grpc
+from handlers.raw_bytes import add_servicer_to_server
+from proto.generated import weather_pb2
 from proto.generated import user_pb2_grpc
+from proto.generated import admin_pb2_grpc
 from services.email_service import EmailService
 from services.api_key_service import ApiKeyService
+from services.user_service import UserService
+from services.weather_service import WeatherService
+from services.token_service import TokenService
+from services.usage_service import UsageService
+from core.config import get_settings
+from core.health import HealthMonitor
+from core.lifecycle import on_shutdown, run_shutdown_hooks
+from core.loop_monitor import LoopLagMonitor
+from db.mongo_client import init_client, warm_up, close_client, ping
 import logging 
 
 logging.basicConfig(
@@ -22,26 +40,104 @@ logger = logging.getLogger(__name__)
 
 logger.info("Starting server...")
 
+def _stop_on_signals(stop: asyncio.Event):
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            pass
+
 async def serve():
     logger.info("Trying to start gRPC aio server...")
+    server = None
+    health = None
+    stop = asyncio.Event()
+    _stop_on_signals(stop)
     try:
-        
+        settings = get_settings()
+        init_client()
+
         email_service = EmailService()
-        await email_service.init()
         api_key_service = ApiKeyService()
-        await api_key_service.init()
+        user_service = UserService()
+        weather_service = WeatherService()
+        tokens = TokenService(settings)
+        usage_service = UsageService()
+
+        health = HealthMonitor(
+            probes={"mongo": ping, "open-meteo": weather_service.upstream_available},
+            dependencies={
+                "user.UserService": ("mongo",),
+                "weather.WeatherService": ("mongo",),
+                # Upstream status, for dashboards and alerts; caches still answer while it is down.
+                "open-meteo": ("open-meteo",),
+            },
+            local=("mongo",),
+            interval_seconds=settings.HEALTH_CHECK_INTERVAL_SECONDS,
+        )
+        await health.init()
+
+        loop_monitor = LoopLagMonitor(
+            settings.LOOP_LAG_SAMPLE_INTERVAL_SECONDS,
+            settings.LOOP_BLOCK_THRESHOLD_MS / 1000.0 if settings.LOOP_WATCHDOG_ENABLED else None,
+        )
+        loop_monitor.start()
+        on_shutdown(loop_monitor.close)
 
         server = grpc.aio.server(
-            interceptors=[AuthInterceptor(), LogInterceptor()]
+            interceptors=[
+                LoadShedInterceptor(settings, loop_monitor),
+                AuthInterceptor(api_key_service, settings, tokens),
+                RateLimitInterceptor(usage_service, settings),
+                DeadlineInterceptor(),
+                LogInterceptor(),
+            ]
         )
-        weather_pb2_grpc.add_WeatherServiceServicer_to_server(WeatherServiceServicer(), server)
-        user_pb2_grpc.add_UserServiceServicer_to_server(UserServiceServicer(), server)
-        server.add_insecure_port("[::]:9092")
-        logger.info("[gRPC] aio server running on port 9092...")
+        add_servicer_to_server(WeatherServiceServicer(weather_service), server, weather_pb2.DESCRIPTOR, "WeatherService")
+        user_pb2_grpc.add_UserServiceServicer_to_server(
+            UserServiceServicer(user_service, api_key_service, email_service, tokens), server
+        )
+        health_pb2_grpc.add_HealthServicer_to_server(health.servicer, server)
+        server.add_insecure_port(f"[::]:{settings.GRPC_PORT}")
         await server.start()
-        await server.wait_for_termination()
+        logger.info(f"[gRPC] aio server running on port {settings.GRPC_PORT} (not ready yet)...")
+
+        if settings.ADMIN_API_KEY:
+            # Own server on the same loop: the proxy only knows GRPC_PORT, and the profiler samples this loop.
+            admin_server = grpc.aio.server()
+            admin_pb2_grpc.add_AdminServiceServicer_to_server(AdminServiceServicer(settings), admin_server)
+            admin_server.add_insecure_port(settings.ADMIN_GRPC_ADDRESS)
+            await admin_server.start()
+            on_shutdown(functools.partial(admin_server.stop, 0))
+            logger.info(f"[gRPC] admin server on {settings.ADMIN_GRPC_ADDRESS}")
+
+        # Health checks are answered while warming up, but report NOT_SERVING.
+        await warm_up()
+        await email_service.init()
+        await api_key_service.init()
+        await usage_service.init()
+        await weather_service.init()
+        await health.mark_ready()
+
+        await stop.wait()
+        logger.info("Shutdown requested, draining...")
     except Exception as e:
         logger.exception(f"Exception during aio server startup: {repr(e)}")
+    finally:
+        await _shutdown(server, health)
+
+async def _shutdown(server, health):
+    settings = get_settings()
+    if health is not None:
+        await health.shutdown()
+        await asyncio.sleep(settings.SHUTDOWN_READINESS_DELAY_SECONDS)
+    if server is not None:
+        # Refuses new RPCs at once and cancels whatever is still running after the grace period.
+        await server.stop(settings.SHUTDOWN_GRACE_SECONDS)
+    await run_shutdown_hooks()
+    await close_client()
+    logger.info("Server stopped.")
 
 if __name__ == "__main__":
     asyncio.run(serve())
@@ -1,16 +1,24 @@
 import logging
-import time
 import os
 import base64
-from typing import Optional
-from repositories.api_key_repository import ApiKeyRepository
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from core.config import get_settings
+from repositories.api_key_repository import ApiKeyRepository, PREFIX_LENGTH, hash_key
 from models.api_key_info import ApiKeyInfo
 
 logger = logging.getLogger(__name__)
 
 ISO_FMT = "%Y-%m-%dT%H:%M:%SZ"
 
+def format_time(value) -> str:
+	if isinstance(value, datetime):
+		return value.astimezone(timezone.utc).strftime(ISO_FMT)
+	return value or ""
+
 class ApiKeyService:
+	"""API keys are shown once at creation; only a prefix and a SHA-256 digest are stored."""
+
 	def __init__(self):
 		self.repo = ApiKeyRepository()
 
@@ -21,23 +29,42 @@ class ApiKeyService:
 	def _generate_key(self, length: int = 32) -> str:
 		return base64.urlsafe_b64encode(os.urandom(length)).decode().rstrip("=")
 
-	async def create_key(self, user_email: str) -> Optional[ApiKeyInfo]:
+	async def create_key(self, user_email: str, ttl_days: Optional[int] = None) -> Optional[ApiKeyInfo]:
+		"""Create another key for the user; the returned info is the only copy of its plaintext value."""
 		user_email = (user_email or "").strip().lower()
 		if not user_email:
 			logger.warning("create_key called without user_email")
 			return None
+		if ttl_days is None:
+			ttl_days = get_settings().API_KEY_TTL_DAYS
 		value = self._generate_key()
-		created_at = time.strftime(ISO_FMT, time.gmtime(time.time()))
+		created_at = datetime.now(timezone.utc)
 		info = ApiKeyInfo(
 			user_email=user_email,
-			value=value,
 			created_at=created_at,
+			prefix=value[:PREFIX_LENGTH],
+			digest=hash_key(value),
+			expires_at=created_at + timedelta(days=ttl_days) if ttl_days > 0 else None,
 		)
 		result = await self.repo.insert(info)
+		if result is None:
+			return None
+		result.value = value
 		return result
 
 	async def get_key(self, user_email: str) -> Optional[ApiKeyInfo]:
+		"""Newest active key of the user, without its value."""
+		keys = await self.get_keys(user_email)
+		return keys[0] if keys else None
+
+	async def get_keys(self, user_email: str) -> List[ApiKeyInfo]:
 		user_email = (user_email or "").strip().lower()
 		if not user_email:
+			return []
+		return await self.repo.find_by_user(user_email)
+
+	async def authenticate(self, value: str) -> Optional[ApiKeyInfo]:
+		"""The active key matching a presented value, found by digest alone."""
+		if not value:
 			return None
-		return await self.repo.get(user_email)
\ No newline at end of file
+		return await self.repo.find_by_digest(hash_key(value))
@@ -0,0 +1,171 @@
+import asyncio
+import json
+import logging
+import os
+import random
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from httpx import AsyncClient, HTTPError, HTTPStatusError
+
+from core.config import get_settings
+from repositories.weather_repository import WeatherRepository
+from services.weather_service import DAILY_VARIABLES, INTEGER_VARIABLES, RECORD_VARIABLES, WeatherService
+from utils.rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# One archive request per city and window; a year is a few kB of JSON.
+DEFAULT_WINDOW_DAYS = 366
+MAX_ATTEMPTS = 4
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+def date_windows(start: date, end: date, days: int) -> List[Tuple[date, date]]:
+    """Split [start, end] into consecutive inclusive windows of at most `days` days."""
+    windows = []
+    while start <= end:
+        window_end = min(start + timedelta(days=days - 1), end)
+        windows.append((start, window_end))
+        start = window_end + timedelta(days=1)
+    return windows
+
+
+def parse_archive_daily(data: dict) -> Dict[str, dict]:
+    """Map an archive API JSON `daily` block onto records keyed by ISO date."""
+    daily = data.get("daily") or {}
+    times = daily.get("time") or []
+    records = {}
+    for i, day in enumerate(times):
+        record = {}
+        for var in RECORD_VARIABLES:
+            values = daily.get(DAILY_VARIABLES[var]) or []
+            value = values[i] if i < len(values) else None
+            if value is not None:
+                value = int(value) if var in INTEGER_VARIABLES else float(value)
+            record[var] = value
+        records[day] = record
+    return records
+
+
+class Checkpoint:
+    """Last completed date per city, saved as JSON after every window.
+
+    Writes go to a temporary file that replaces the old one, so an
+    interrupted run leaves either the previous or the new checkpoint.
+    """
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.done: Dict[str, str] = {}
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.done = json.load(f)
+
+    def completed_through(self, city: str) -> Optional[date]:
+        day = self.done.get(city)
+        return date.fromisoformat(day) if day else None
+
+    def mark(self, city: str, through: date):
+        current = self.completed_through(city)
+        if current is None or through > current:
+            self.done[city] = through.isoformat()
+        if self.path:
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.done, f, indent=1, sort_keys=True)
+            os.replace(tmp, self.path)
+
+
+class BackfillService:
+    """Loads archive daily data for many cities into the weather collection.
+
+    Cities are resolved through WeatherService (city index, then geocoding),
+    so already known cities cost no request. Archive windows are fetched by
+    at most `concurrency` tasks, and every upstream request, geocoding
+    included, takes a token from one requests-per-minute budget.
+    """
+
+    def __init__(self, weather: WeatherService = None, repo: WeatherRepository = None,
+                 checkpoint_path: Optional[str] = None, concurrency: int = None,
+                 requests_per_minute: int = None, window_days: int = DEFAULT_WINDOW_DAYS,
+                 archive_url: str = None):
+        settings = get_settings()
+        self.weather = weather or WeatherService()
+        self.repo = repo or self.weather.repo
+        self.checkpoint = Checkpoint(checkpoint_path)
+        self.concurrency = concurrency or settings.BACKFILL_CONCURRENCY
+        self.budget = TokenBucket.per_minute(requests_per_minute or settings.BACKFILL_REQUESTS_PER_MINUTE)
+        self.window_days = window_days
+        self.archive_url = archive_url or settings.ARCHIVE_API_URL
+        self.stats = {"windows": 0, "days": 0, "skipped": 0, "failed": 0}
+        self.retry_base_seconds = 0.5
+
+    async def _get_json(self, client: AsyncClient, params: dict) -> dict:
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            await self.budget.acquire()
+            try:
+                response = await client.get(self.archive_url, params=params)
+                response.raise_for_status()
+                return response.json()
+            except HTTPStatusError as e:
+                if e.response.status_code not in RETRY_STATUS or attempt == MAX_ATTEMPTS:
+                    raise
+            except HTTPError:
+                if attempt == MAX_ATTEMPTS:
+                    raise
+            await asyncio.sleep(min(self.retry_base_seconds * 2 ** attempt, 30) * random.uniform(0.5, 1.0))
+
+    async def _resolve(self, name: str):
+        if self.weather.cities.lookup(name) is None:
+            await self.budget.acquire()
+        return await self.weather.resolve_city(name)
+
+    async def backfill_window(self, client: AsyncClient, name: str, city, start: date, end: date) -> int:
+        data = await self._get_json(client, {
+            "latitude": city.latitude,
+            "longitude": city.longitude,
+            "start_date": start.isoformat(),
+            "end_date": end.isoformat(),
+            "daily": ",".join(DAILY_VARIABLES[v] for v in RECORD_VARIABLES),
+            "wind_speed_unit": "kmh",
+            "timezone": "auto",
+        })
+        records = parse_archive_daily(data)
+        written = await self.repo.bulk_merge_days(name, records)
+        if written is None:
+            raise ConnectionError(f"Could not store archive data for '{name}'")
+        return written
+
+    async def _backfill_city(self, client: AsyncClient, slots: asyncio.Semaphore, name: str,
+                             start: date, end: date):
+        done = self.checkpoint.completed_through(name)
+        if done is not None and done >= end:
+            self.stats["skipped"] += 1
+            return
+        if done is not None:
+            start = max(start, done + timedelta(days=1))
+        try:
+            async with slots:
+                city = await self._resolve(name)
+            # Windows run in order so the checkpoint is always a contiguous prefix.
+            for window_start, window_end in date_windows(start, end, self.window_days):
+                async with slots:
+                    written = await self.backfill_window(client, name, city, window_start, window_end)
+                self.checkpoint.mark(name, window_end)
+                self.stats["windows"] += 1
+                self.stats["days"] += written
+            logger.info(f"[Backfill] '{name}' done through {end.isoformat()}.")
+        except Exception as e:
+            self.stats["failed"] += 1
+            logger.error(f"[Backfill] '{name}' failed, rerun to resume: {e}")
+
+    async def run(self, cities: Iterable[str], start: date, end: date) -> dict:
+        if start > end:
+            raise ValueError("start must not be after end")
+        names = list(dict.fromkeys(c.strip() for c in cities if c and c.strip()))
+        slots = asyncio.Semaphore(self.concurrency)
+        async with AsyncClient(timeout=30.0) as client:
+            await asyncio.gather(*(self._backfill_city(client, slots, n, start, end) for n in names))
+        logger.info(f"[Backfill] Finished {len(names)} cities: {self.stats}")
+        return self.stats
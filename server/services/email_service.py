@@ -1,6 +1,6 @@
+import asyncio
 import logging
 from repositories.email_repository import EmailRepository
-import mailtrap as mt 
 from core.config import get_settings
 
 logger = logging.getLogger(__name__)
@@ -19,6 +19,7 @@ class EmailService:
         return await self.repo.get_by_user_email(user_email)
     
     async def send_verification_email(self, user_email: str, code: str):
+        import mailtrap as mt
         settings = get_settings()
         mail = mt.MailFromTemplate(
             sender=mt.Address(email=settings.DEFAULT_SENDER, name="ClimateChart Service"),
@@ -30,5 +31,6 @@ class EmailService:
             }
         )
         client = mt.MailtrapClient(token=settings.PASSWORD)
-        response = client.send(mail)
+        # The Mailtrap client is synchronous; a slow API must not stall every other RPC.
+        response = await asyncio.to_thread(client.send, mail)
         print(response)
@@ -0,0 +1,236 @@
+import hashlib
+import json
+import logging
+import time
+from email.utils import parsedate_to_datetime
+from typing import List, Optional, Tuple
+
+from httpx import AsyncBaseTransport, Headers, QueryParams, Request, Response
+
+from core import metrics
+from core.tiered_cache import TieredCache
+
+logger = logging.getLogger(__name__)
+
+CACHEABLE_STATUS = {200, 203}
+# Headers a 304 must not overwrite, and headers that describe the wire body rather than the content.
+_BODY_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+# Share of (Date - Last-Modified) taken as the freshness lifetime when none is given (RFC 9111, 4.2.2).
+HEURISTIC_FRACTION = 0.1
+MAX_HEURISTIC_SECONDS = 86400
+
+
+def cache_directives(value: Optional[str]) -> dict:
+    """Parse a Cache-Control header into {directive: argument or True}."""
+    directives = {}
+    for part in (value or "").split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip('"') if arg else True
+    return directives
+
+
+def _seconds(value) -> Optional[int]:
+    try:
+        return max(0, int(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _http_date(value: Optional[str]) -> Optional[float]:
+    try:
+        return parsedate_to_datetime(value).timestamp() if value else None
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def freshness_lifetime(headers: Headers) -> float:
+    """Seconds a response stays fresh in a shared cache: s-maxage, max-age, Expires, then the heuristic."""
+    directives = cache_directives(headers.get("cache-control"))
+    if "no-cache" in directives:
+        return 0.0
+    for name in ("s-maxage", "max-age"):
+        seconds = _seconds(directives.get(name))
+        if seconds is not None:
+            return seconds
+    date = _http_date(headers.get("date"))
+    if "expires" in headers:
+        expires = _http_date(headers["expires"])
+        return max(0.0, expires - (date or time.time())) if expires is not None else 0.0
+    modified = _http_date(headers.get("last-modified"))
+    if modified is not None:
+        return min(MAX_HEURISTIC_SECONDS, max(0.0, ((date or time.time()) - modified) * HEURISTIC_FRACTION))
+    return 0.0
+
+
+def cache_key(request: Request) -> str:
+    # Query order does not change the answer, so it does not change the key.
+    params = QueryParams(sorted(request.url.params.multi_items()))
+    url = str(request.url.copy_with(query=str(params).encode() or None))
+    return hashlib.blake2b(f"{request.method} {url}".encode(), digest_size=16).hexdigest()
+
+
+class CachedHttpResponse:
+    """A stored response: its headers, decoded body and when it was received."""
+
+    def __init__(self, status_code: int, headers: List[Tuple[str, str]], content: bytes,
+                 stored_at: float, lifetime: float):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.stored_at = stored_at
+        self.lifetime = lifetime
+
+    def age(self, now: float) -> float:
+        initial = _seconds(Headers(self.headers).get("age")) or 0
+        return initial + max(0.0, now - self.stored_at)
+
+    @property
+    def validators(self) -> dict:
+        headers = Headers(self.headers)
+        conditional = {}
+        if "etag" in headers:
+            conditional["if-none-match"] = headers["etag"]
+        if "last-modified" in headers:
+            conditional["if-modified-since"] = headers["last-modified"]
+        return conditional
+
+    def to_response(self, request: Request, now: float, status: str) -> Response:
+        headers = Headers(self.headers)
+        headers["age"] = str(int(self.age(now)))
+        return Response(
+            self.status_code, headers=headers, content=self.content, request=request,
+            extensions={"http_cache": status},
+        )
+
+
+class HttpResponseCodec:
+    """Codec for CachedHttpResponse: a JSON header line, then the body as is."""
+
+    def encode(self, entry: CachedHttpResponse) -> bytes:
+        meta = {
+            "status_code": entry.status_code,
+            "headers": entry.headers,
+            "stored_at": entry.stored_at,
+            "lifetime": entry.lifetime,
+        }
+        return json.dumps(meta, separators=(",", ":")).encode() + b"\n" + entry.content
+
+    def decode(self, data: bytes) -> CachedHttpResponse:
+        meta, _, content = data.partition(b"\n")
+        meta = json.loads(meta)
+        return CachedHttpResponse(
+            meta["status_code"], [tuple(h) for h in meta["headers"]], content, meta["stored_at"], meta["lifetime"],
+        )
+
+
+class CachingTransport(AsyncBaseTransport):
+    """HTTP caching for GETs in front of another httpx transport (RFC 9111, shared-cache rules).
+
+    Fresh entries are answered from `cache` without a request. Stale ones
+    that carry an ETag or Last-Modified are revalidated with a conditional
+    request; a 304 refreshes the stored entry and returns its body. Entries
+    with validators are kept `stale_seconds` past their freshness so they
+    can be revalidated. no-store and private responses are never stored,
+    nor are bodies over `max_body_bytes`. The store is a TieredCache, whose
+    tiers never block the event loop.
+
+    Responses carry extensions["http_cache"]: "hit", "revalidated" or "miss".
+    lookup() answers from a fresh entry only, so callers can skip their own
+    admission and deadline checks for requests that never leave the process.
+    """
+
+    def __init__(self, transport: AsyncBaseTransport, cache: TieredCache, stale_seconds: float = 86400,
+                 max_body_bytes: int = 4 * 1024 * 1024, clock=time.time):
+        self.transport = transport
+        self.cache = cache
+        self.stale_seconds = stale_seconds
+        self.max_body_bytes = max_body_bytes
+        self.clock = clock
+        self.hits = metrics.counter("http_cache_hits_total", "Upstream GETs answered from the HTTP cache")
+        self.revalidated = metrics.counter("http_cache_revalidated_total", "Stale entries confirmed by a 304")
+        self.misses = metrics.counter("http_cache_misses_total", "Upstream GETs that went to the network")
+
+    @staticmethod
+    def _cacheable(request: Request, directives: dict) -> bool:
+        return request.method == "GET" and "no-store" not in directives
+
+    def _fresh(self, entry: Optional[CachedHttpResponse], directives: dict, now: float) -> bool:
+        return entry is not None and "no-cache" not in directives and entry.age(now) < entry.lifetime
+
+    async def lookup(self, request: Request) -> Optional[Response]:
+        """The response a fresh entry holds for `request`, or None when it would need the network."""
+        directives = cache_directives(request.headers.get("cache-control"))
+        if not self._cacheable(request, directives):
+            return None
+        entry = await self.cache.get(cache_key(request))
+        now = self.clock()
+        if not self._fresh(entry, directives, now):
+            return None
+        self.hits.inc()
+        return entry.to_response(request, now, "hit")
+
+    async def handle_async_request(self, request: Request) -> Response:
+        request_directives = cache_directives(request.headers.get("cache-control"))
+        if not self._cacheable(request, request_directives):
+            return await self.transport.handle_async_request(request)
+
+        key = cache_key(request)
+        entry = await self.cache.get(key)
+        now = self.clock()
+        if self._fresh(entry, request_directives, now):
+            self.hits.inc()
+            return entry.to_response(request, now, "hit")
+
+        if entry is not None:
+            for name, value in entry.validators.items():
+                request.headers[name] = value
+        response = await self.transport.handle_async_request(request)
+
+        if entry is not None and response.status_code == 304:
+            await response.aclose()
+            refreshed = self._refresh(entry, response.headers)
+            await self._store(key, refreshed)
+            self.revalidated.inc()
+            return refreshed.to_response(request, self.clock(), "revalidated")
+
+        self.misses.inc()
+        if response.status_code not in CACHEABLE_STATUS:
+            if entry is not None and response.status_code < 500:
+                await self.cache.delete(key)
+            return response
+        directives = cache_directives(response.headers.get("cache-control"))
+        if "no-store" in directives or "private" in directives:
+            return response
+        content = await response.aread()
+        if len(content) <= self.max_body_bytes:
+            headers = [(k, v) for k, v in response.headers.multi_items() if k.lower() not in _BODY_HEADERS]
+            await self._store(key, CachedHttpResponse(
+                response.status_code, headers, content, self.clock(), freshness_lifetime(response.headers),
+            ))
+        # The body has been read and decoded, so it goes back without its wire encoding.
+        headers = Headers([(k, v) for k, v in response.headers.multi_items() if k.lower() not in _BODY_HEADERS])
+        return Response(
+            response.status_code, headers=headers, content=content, request=request,
+            extensions={**response.extensions, "http_cache": "miss"},
+        )
+
+    def _refresh(self, entry: CachedHttpResponse, headers: Headers) -> CachedHttpResponse:
+        updated = Headers(entry.headers)
+        for name, value in headers.items():
+            if name.lower() not in _BODY_HEADERS:
+                updated[name] = value
+        if "age" not in headers:
+            updated.pop("age", None)
+        return CachedHttpResponse(
+            entry.status_code, list(updated.multi_items()), entry.content, self.clock(), freshness_lifetime(updated),
+        )
+
+    async def _store(self, key: str, entry: CachedHttpResponse):
+        keep = entry.lifetime + (self.stale_seconds if entry.validators else 0)
+        if keep > 0:
+            await self.cache.set(key, entry, keep)
+
+    async def aclose(self):
+        await self.transport.aclose()
+        await self.cache.close()
@@ -0,0 +1,236 @@
+import asyncio
+import logging
+import random
+from collections import deque
+from typing import List, Optional
+
+from httpx import (
+    AsyncClient, AsyncHTTPTransport, HTTPStatusError, Limits, Response, TimeoutException, TransportError,
+)
+from openmeteo_sdk.WeatherApiResponse import WeatherApiResponse
+
+from core import deadline, metrics
+from core.config import get_settings
+from core.tiered_cache import TieredCache, build_tiers
+from services.http_cache import CachingTransport, HttpResponseCodec
+from utils.adaptive_limit import AdaptiveLimiter
+
+logger = logging.getLogger(__name__)
+
+# Statuses worth retrying; they also count as overload signals for the limiter.
+RETRY_STATUS = {429, 500, 502, 503, 504}
+MAX_RETRY_DELAY_SECONDS = 10.0
+# Latencies kept for the hedging delay, and how many are needed before hedging starts.
+LATENCY_WINDOW = 512
+MIN_HEDGE_SAMPLES = 20
+MIN_HEDGE_DELAY_SECONDS = 0.05
+# In a flatbuffers stream an error message starts with "Unexpected" instead of a length.
+_STREAM_ERROR_MARKER = 0x78656E55
+
+
+def decode_weather_api(data: bytes) -> List[WeatherApiResponse]:
+    """Split a length-prefixed flatbuffers body into one WeatherApiResponse per location."""
+    messages = []
+    pos = 0
+    while pos < len(data):
+        length = int.from_bytes(data[pos:pos + 4], byteorder="little")
+        if length == _STREAM_ERROR_MARKER:
+            raise ValueError(data[pos:].decode("utf-8", "replace"))
+        messages.append(WeatherApiResponse.GetRootAs(data, pos + 4))
+        pos += length + 4
+    return messages
+
+
+def http_transport(settings):
+    """Pooled transport, behind an HTTP cache unless OPEN_METEO_HTTP_CACHE_TIERS is empty."""
+    transport = AsyncHTTPTransport(limits=Limits(max_connections=settings.OPEN_METEO_CONCURRENCY_MAX))
+    if not settings.OPEN_METEO_HTTP_CACHE_TIERS:
+        return transport
+    cache = TieredCache(
+        "open_meteo_http",
+        build_tiers(settings.OPEN_METEO_HTTP_CACHE_TIERS, settings, settings.OPEN_METEO_HTTP_CACHE_MAX_ENTRIES),
+        HttpResponseCodec(),
+    )
+    return CachingTransport(
+        transport, cache,
+        stale_seconds=settings.OPEN_METEO_HTTP_CACHE_STALE_SECONDS,
+        max_body_bytes=settings.OPEN_METEO_HTTP_CACHE_MAX_BODY_BYTES,
+    )
+
+
+class _NoCapacity(Exception):
+    pass
+
+
+class OpenMeteoClient:
+    """Shared async client for the Open-Meteo APIs.
+
+    All calls share one connection pool and pass through an AdaptiveLimiter
+    that caps in-flight requests, shrinking on timeouts, 429/5xx and slow
+    answers and growing back while the upstream keeps up. Failed GETs are
+    retried with full-jitter exponential backoff (honouring Retry-After). With
+    hedging on, a request still unanswered after the recent p95 latency is
+    sent once more if the limiter has room, and the first answer wins.
+    GETs a fresh HTTP cache entry answers skip all of that: they take no
+    slot and are served whatever deadline is left.
+    """
+
+    def __init__(self, settings=None, http: AsyncClient = None, limiter: AdaptiveLimiter = None,
+                 http_cache: CachingTransport = None):
+        settings = settings or get_settings()
+        # The caching transport under `http`, when there is one; pass it along with a custom client.
+        self.http_cache: Optional[CachingTransport] = http_cache
+        if http is None:
+            transport = http_transport(settings)
+            if isinstance(transport, CachingTransport):
+                self.http_cache = transport
+            http = AsyncClient(timeout=settings.OPEN_METEO_TIMEOUT_SECONDS, transport=transport)
+        self.http = http
+        self.limiter = limiter or AdaptiveLimiter(
+            initial=settings.OPEN_METEO_CONCURRENCY_INITIAL,
+            min_limit=settings.OPEN_METEO_CONCURRENCY_MIN,
+            max_limit=settings.OPEN_METEO_CONCURRENCY_MAX,
+            latency_target=settings.OPEN_METEO_LATENCY_TARGET_SECONDS,
+        )
+        self.timeout_seconds = settings.OPEN_METEO_TIMEOUT_SECONDS
+        self.retries = settings.OPEN_METEO_RETRIES
+        self.retry_base_seconds = settings.OPEN_METEO_RETRY_BASE_SECONDS
+        self.hedge = settings.OPEN_METEO_HEDGE_ENABLED
+        self.hedge_quantile = settings.OPEN_METEO_HEDGE_QUANTILE
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self.request_seconds = metrics.histogram("open_meteo_request_seconds", "Open-Meteo request latency")
+        self.limit_gauge = metrics.gauge("open_meteo_concurrency_limit", "Adaptive limit on in-flight Open-Meteo requests")
+        self.retried = metrics.counter("open_meteo_retries_total", "Open-Meteo requests retried")
+        self.hedged = metrics.counter("open_meteo_hedges_total", "Hedged Open-Meteo requests sent")
+        self.hedge_wins = metrics.counter("open_meteo_hedge_wins_total", "Hedged requests answered first")
+
+    def hedge_delay(self) -> Optional[float]:
+        """The recent latency quantile to hedge after, or None while hedging is off or unwarmed."""
+        if not self.hedge or len(self._latencies) < MIN_HEDGE_SAMPLES:
+            return None
+        ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, int(self.hedge_quantile * len(ordered)))
+        return max(MIN_HEDGE_DELAY_SECONDS, ordered[index])
+
+    def expected_latency(self) -> float:
+        """Median recent latency; a request with less time left than this is not sent."""
+        if len(self._latencies) < MIN_HEDGE_SAMPLES:
+            return 0.0
+        return sorted(self._latencies)[len(self._latencies) // 2]
+
+    async def _attempt(self, url: str, params: dict, hedge: bool = False) -> Response:
+        if hedge:
+            # A hedge only takes a free slot; it never queues behind real requests.
+            if not self.limiter.try_acquire():
+                raise _NoCapacity()
+        else:
+            try:
+                await self.limiter.acquire(deadline.remaining())
+            except asyncio.TimeoutError as e:
+                raise deadline.DeadlineExceeded("Deadline exceeded waiting for an Open-Meteo slot") from e
+        async with self.limiter.slot(acquired=True) as slot:
+            try:
+                response = await self.http.get(url, params=params, timeout=deadline.timeout(self.timeout_seconds))
+            except TimeoutException:
+                # Our own deadline ran out; that says nothing about the upstream's load.
+                deadline.check()
+                slot.failed()
+                raise
+            except TransportError:
+                slot.failed()
+                raise
+            elapsed = slot.elapsed()
+            if response.status_code in RETRY_STATUS:
+                slot.failed()
+            elif response.extensions.get("http_cache") == "hit":
+                # Filled while this call waited for its slot: answered locally, so it
+                # says nothing about upstream latency or load.
+                slot.uncounted()
+            else:
+                self._latencies.append(elapsed)
+                self.request_seconds.observe(elapsed)
+        self.limit_gauge.set(self.limiter.limit)
+        response.raise_for_status()
+        return response
+
+    async def _hedged(self, url: str, params: dict) -> Response:
+        delay = self.hedge_delay()
+        if delay is None:
+            return await self._attempt(url, params)
+        tasks = {asyncio.create_task(self._attempt(url, params))}
+        primary = next(iter(tasks))
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done and self.limiter.has_capacity:
+                tasks.add(asyncio.create_task(self._attempt(url, params, hedge=True)))
+                self.hedged.inc()
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.hedge_wins.inc()
+                        return task.result()
+            # Neither answered; report the original request's error.
+            return primary.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _retry_delay(self, attempt: int, retry_after: Optional[str]) -> float:
+        delay = random.uniform(0, min(MAX_RETRY_DELAY_SECONDS, self.retry_base_seconds * 2 ** attempt))
+        try:
+            delay = max(delay, float(retry_after)) if retry_after else delay
+        except ValueError:
+            pass
+        return min(delay, MAX_RETRY_DELAY_SECONDS)
+
+    async def get(self, url: str, params: dict) -> Response:
+        """GET with limiting, retries and optional hedging; only for idempotent reads.
+
+        Raises httpx errors once retries are exhausted, ValueError when
+        Open-Meteo rejects the parameters (400), and DeadlineExceeded when the
+        request deadline (core.deadline) leaves no time for an answer.
+        """
+        if self.http_cache is not None:
+            cached = await self.http_cache.lookup(self.http.build_request("GET", url, params=params))
+            if cached is not None:
+                return cached
+        for attempt in range(self.retries + 1):
+            retry_after = None
+            # Fail fast when the caller cannot wait for a typical answer.
+            deadline.check(self.expected_latency())
+            try:
+                return await self._hedged(url, params)
+            except HTTPStatusError as e:
+                if e.response.status_code == 400:
+                    try:
+                        reason = e.response.json().get("reason")
+                    except ValueError:
+                        reason = e.response.text
+                    raise ValueError(f"Open-Meteo rejected the request: {reason}") from e
+                if e.response.status_code not in RETRY_STATUS or attempt == self.retries:
+                    raise
+                retry_after = e.response.headers.get("retry-after")
+            except TransportError:
+                if attempt == self.retries:
+                    raise
+            delay = self._retry_delay(attempt, retry_after)
+            deadline.check(delay)
+            self.retried.inc()
+            logger.warning(f"[OpenMeteo] Attempt {attempt + 1} for {url} failed; retrying in {delay:.2f}s.")
+            await asyncio.sleep(delay)
+
+    async def weather_api(self, url: str, params: dict) -> List[WeatherApiResponse]:
+        params = {k: ",".join(v) if isinstance(v, (list, tuple)) else v for k, v in params.items()}
+        params["format"] = "flatbuffers"
+        response = await self.get(url, params)
+        return decode_weather_api(response.content)
+
+    async def init(self):
+        if self.http_cache is not None:
+            await self.http_cache.cache.init()
+
+    async def close(self):
+        # Closes the transport, and with it the HTTP cache.
+        await self.http.aclose()
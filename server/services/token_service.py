@@ -0,0 +1,75 @@
+import logging
+import secrets
+import time
+from typing import Dict, Optional, Tuple
+
+import jwt
+
+from core.config import get_settings
+from models.user import User
+
+logger = logging.getLogger(__name__)
+
+ALGORITHM = "HS256"
+
+
+class InvalidToken(ValueError):
+    pass
+
+
+class TokenService:
+    """Issues and verifies short-lived HMAC-signed (HS256 JWT) access tokens.
+
+    Tokens carry the user id, name, email and verified flag, so checking one
+    needs no database. Each token names its signing key in the `kid`
+    header: new tokens use the active key, and any configured key is
+    accepted, so a key can be rotated in before it becomes active and
+    removed once its last tokens have expired.
+    """
+
+    def __init__(self, settings=None, keys: Optional[Dict[str, str]] = None,
+                 active_kid: Optional[str] = None, ttl_seconds: Optional[int] = None):
+        settings = settings or get_settings()
+        self.keys = dict(keys if keys is not None else settings.TOKEN_SIGNING_KEYS)
+        if not self.keys:
+            logger.warning("No TOKEN_SIGNING_KEYS configured; using an ephemeral key. "
+                           "Tokens will not survive a restart or work across replicas.")
+            self.keys = {"ephemeral": secrets.token_urlsafe(32)}
+        self.active_kid = active_kid or settings.TOKEN_ACTIVE_KID or next(iter(self.keys))
+        if self.active_kid not in self.keys:
+            raise ValueError(f"TOKEN_ACTIVE_KID '{self.active_kid}' is not in TOKEN_SIGNING_KEYS")
+        self.ttl_seconds = ttl_seconds or settings.ACCESS_TOKEN_TTL_SECONDS
+        self.issuer = settings.APP_NAME
+
+    def issue(self, user: User) -> Tuple[str, int]:
+        """Return (token, expiry as unix seconds) for a logged-in user."""
+        now = int(time.time())
+        expires_at = now + self.ttl_seconds
+        claims = {
+            "iss": self.issuer,
+            "sub": user.user_id,
+            "name": user.name,
+            "email": user.email,
+            "email_verified": bool(user.email_verified),
+            "iat": now,
+            "exp": expires_at,
+        }
+        token = jwt.encode(claims, self.keys[self.active_kid], algorithm=ALGORITHM,
+                           headers={"kid": self.active_kid})
+        return token, expires_at
+
+    def verify(self, token: str) -> dict:
+        """Claims of a valid token; raises InvalidToken otherwise."""
+        try:
+            kid = jwt.get_unverified_header(token).get("kid")
+            key = self.keys.get(kid)
+            if key is None:
+                raise InvalidToken("unknown signing key")
+            return jwt.decode(
+                token, key, algorithms=[ALGORITHM], issuer=self.issuer,
+                options={"require": ["exp", "iat", "sub"]},
+            )
+        except jwt.ExpiredSignatureError:
+            raise InvalidToken("token expired")
+        except jwt.PyJWTError as e:
+            raise InvalidToken(str(e))
@@ -0,0 +1,89 @@
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Optional
+
+from core import metrics
+from core.config import get_settings
+from core.lifecycle import on_shutdown
+from repositories.usage_repository import UsageRepository
+
+logger = logging.getLogger(__name__)
+
+
+def usage_day(now: Optional[datetime] = None) -> str:
+    return (now or datetime.now(timezone.utc)).strftime("%Y-%m-%d")
+
+
+class UsageService:
+    """Counts calls per API key per UTC day in memory and flushes them to Mongo.
+
+    record() only bumps a counter. A background task swaps the counters out
+    every `flush_interval` seconds and writes them as one bulk of $inc
+    upserts; if that write fails the counts are merged back and retried on
+    the next flush, so nothing is lost short of a crash.
+    """
+
+    def __init__(self, repo: UsageRepository = None, flush_interval: float = None, clock=None):
+        settings = get_settings()
+        self.repo = repo or UsageRepository()
+        self.flush_interval = flush_interval if flush_interval is not None else settings.USAGE_FLUSH_INTERVAL_SECONDS
+        self._clock = clock or (lambda: datetime.now(timezone.utc))
+        self._pending: Counter = Counter()
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self.recorded = metrics.counter("api_key_calls_total", "Calls made with an API key")
+        self.pending_keys = metrics.gauge("api_key_usage_pending", "Key-days waiting to be flushed")
+
+    async def init(self):
+        await self.repo.ensure_indexes()
+        self.start()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="usage-flush")
+            on_shutdown(self.close)
+
+    def record(self, digest: str, calls: int = 1):
+        self._pending[(digest, usage_day(self._clock()))] += calls
+        self.recorded.inc(calls)
+        self.pending_keys.set(len(self._pending))
+
+    def pending(self, digest: str) -> int:
+        """Calls recorded today and not yet flushed."""
+        return self._pending.get((digest, usage_day(self._clock())), 0)
+
+    async def flush(self) -> int:
+        """Write the pending counts; returns how many key-days were written."""
+        async with self._lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, Counter()
+            ok = await self.repo.increment(dict(batch))
+            if not ok:
+                # Keep them for the next flush; calls recorded meanwhile add up.
+                self._pending.update(batch)
+                self.pending_keys.set(len(self._pending))
+                logger.error(f"Usage flush of {len(batch)} key-days failed; retrying later.")
+                return 0
+            self.pending_keys.set(len(self._pending))
+            return len(batch)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.exception(f"Usage flush failed: {e}")
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
@@ -1,23 +1,267 @@
-import openmeteo_requests
-import pandas as pd
-import requests_cache
-from retry_requests import retry
-from httpx import AsyncClient
 from httpx import HTTPError, TimeoutException
+import asyncio
 import logging 
+import time
+import numpy as np
+from datetime import date, timedelta
+from openmeteo_sdk.Aggregation import Aggregation
+from openmeteo_sdk.Variable import Variable
 from repositories.weather_repository import WeatherRepository
+from repositories.city_repository import CityRepository
+from models.city import City
+from core.cache import TTLCache
+from core.tiered_cache import JsonCodec, TieredCache, build_tiers
 from core.config import get_settings
+from core.deadline import DeadlineExceeded
+from core.lifecycle import on_shutdown
+from core.write_behind import WriteBehindQueue
+from services.open_meteo_client import OpenMeteoClient
 from models.daily_weather_data import DailyWeatherData
+from utils.city_index import CityIndex
+from utils.downsampling import downsample, LTTB
+from utils.geo_index import snap_to_grid, validate_coordinates
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_PAST_DAYS = 7
+DEFAULT_FORECAST_DAYS = 7
+# Open-Meteo forecast API limits.
+MAX_PAST_DAYS = 92
+MAX_FORECAST_DAYS = 16
+
+# Record field name -> Open-Meteo daily variable.
+DAILY_VARIABLES = {
+    "temperature_2m_max_c": "temperature_2m_max",
+    "temperature_2m_min_c": "temperature_2m_min",
+    "precipitation_sum_mm": "precipitation_sum",
+    "pressure_msl_mean_hpa": "pressure_msl_mean",
+    "wind_speed_10m_max_kmh": "wind_speed_10m_max",
+    "relative_humidity_2m_max_pct": "relative_humidity_2m_max",
+}
+# Record field name -> (variable, aggregation, altitude in m) Open-Meteo tags the daily column with.
+DAILY_COLUMN_KEYS = {
+    "temperature_2m_max_c": (Variable.temperature, Aggregation.maximum, 2),
+    "temperature_2m_min_c": (Variable.temperature, Aggregation.minimum, 2),
+    "precipitation_sum_mm": (Variable.precipitation, Aggregation.sum, 0),
+    "pressure_msl_mean_hpa": (Variable.pressure_msl, Aggregation.mean, 0),
+    "wind_speed_10m_max_kmh": (Variable.wind_speed, Aggregation.maximum, 10),
+    "relative_humidity_2m_max_pct": (Variable.relative_humidity, Aggregation.maximum, 2),
+}
+RECORD_VARIABLES = list(DAILY_VARIABLES)
+HISTORY_PROJECTION = {"_id": 0, "fetch_date": 1, "records": 1}
+INTEGER_VARIABLES = {"relative_humidity_2m_max_pct"}
+
+def normalize_selection(variables=None, past_days: int = 0, forecast_days: int = 0):
+    """Validate a variable/horizon selection; returns (variables, past_days, forecast_days).
+
+    Variables come back as a tuple in canonical order, so equal selections
+    compare and hash equal. Zero horizons fall back to the defaults.
+    """
+    variables = [v.strip() for v in (variables or []) if v and v.strip()]
+    unknown = [v for v in variables if v not in DAILY_VARIABLES]
+    if unknown:
+        raise ValueError(f"Unknown variables: {', '.join(unknown)}")
+    selected = tuple(v for v in RECORD_VARIABLES if not variables or v in variables)
+    past_days = past_days or DEFAULT_PAST_DAYS
+    forecast_days = forecast_days or DEFAULT_FORECAST_DAYS
+    if not 0 < past_days <= MAX_PAST_DAYS:
+        raise ValueError(f"past_days must be between 1 and {MAX_PAST_DAYS}")
+    if not 0 < forecast_days <= MAX_FORECAST_DAYS:
+        raise ValueError(f"forecast_days must be between 1 and {MAX_FORECAST_DAYS}")
+    return selected, past_days, forecast_days
+
+DEFAULT_FORECAST_HOURS = 48
+MAX_FORECAST_HOURS = 168
+
+# HourlyResponse column -> Open-Meteo hourly variable.
+HOURLY_VARIABLES = {
+    "temperature_2m_c": "temperature_2m",
+    "relative_humidity_2m_pct": "relative_humidity_2m",
+    "precipitation_mm": "precipitation",
+    "pressure_msl_hpa": "pressure_msl",
+    "wind_speed_10m_kmh": "wind_speed_10m",
+}
+HOURLY_COLUMN_KEYS = {
+    "temperature_2m_c": (Variable.temperature, Aggregation.none, 2),
+    "relative_humidity_2m_pct": (Variable.relative_humidity, Aggregation.none, 2),
+    "precipitation_mm": (Variable.precipitation, Aggregation.none, 0),
+    "pressure_msl_hpa": (Variable.pressure_msl, Aggregation.none, 0),
+    "wind_speed_10m_kmh": (Variable.wind_speed, Aggregation.none, 10),
+}
+HOURLY_COLUMNS = list(HOURLY_VARIABLES)
+
+def normalize_hourly_selection(variables=None, hours: int = 0):
+    """Validate an hourly selection; returns (variables, hours) like normalize_selection."""
+    variables = [v.strip() for v in (variables or []) if v and v.strip()]
+    unknown = [v for v in variables if v not in HOURLY_VARIABLES]
+    if unknown:
+        raise ValueError(f"Unknown hourly variables: {', '.join(unknown)}")
+    selected = tuple(v for v in HOURLY_COLUMNS if not variables or v in variables)
+    hours = hours or DEFAULT_FORECAST_HOURS
+    if not 0 < hours <= MAX_FORECAST_HOURS:
+        raise ValueError(f"hours must be between 1 and {MAX_FORECAST_HOURS}")
+    return selected, hours
+
+def match_columns(block, variables, column_keys) -> dict:
+    """Find each requested field's column in a daily or hourly block by what it holds, not where it is.
+
+    Raises ValueError when a requested variable is not in the block.
+    """
+    wanted = {column_keys[var]: var for var in variables}
+    found = {}
+    for i in range(block.VariablesLength()):
+        column = block.Variables(i)
+        var = wanted.get((column.Variable(), column.Aggregation(), column.Altitude()))
+        if var is not None:
+            found[var] = column
+    missing = [var for var in variables if var not in found]
+    if missing:
+        raise ValueError(f"Response is missing variables: {', '.join(missing)}")
+    return {var: found[var] for var in variables}
+
+def current_hour() -> int:
+    return int(time.time() // 3600)
+
+class ForecastEntry:
+    """A fetched daily forecast and the selection it was fetched with."""
+
+    def __init__(self, variables, past_days: int, forecast_days: int, records: dict):
+        self.variables = tuple(variables)
+        self.past_days = past_days
+        self.forecast_days = forecast_days
+        self.records = records
+
+    def covers(self, variables, past_days: int, forecast_days: int) -> bool:
+        return (
+            set(variables) <= set(self.variables)
+            and past_days <= self.past_days
+            and forecast_days <= self.forecast_days
+        )
+
+    def union(self, variables, past_days: int, forecast_days: int) -> "ForecastEntry":
+        wanted = set(variables) | set(self.variables)
+        return ForecastEntry(
+            [v for v in RECORD_VARIABLES if v in wanted],
+            max(past_days, self.past_days),
+            max(forecast_days, self.forecast_days),
+            {},
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "variables": list(self.variables),
+            "past_days": self.past_days,
+            "forecast_days": self.forecast_days,
+            "records": self.records,
+        }
+
+    @classmethod
+    def from_dict(cls, doc: dict) -> "ForecastEntry":
+        return cls(doc["variables"], doc["past_days"], doc["forecast_days"], doc["records"])
+
+    def select(self, variables, past_days: int, forecast_days: int) -> dict:
+        # Records run from `past_days` before the location's today through the
+        # forecast, so the window is sliced by position rather than by date.
+        dates = list(self.records)
+        today_index = self.past_days
+        window = dates[max(today_index - past_days, 0):today_index + forecast_days]
+        return {
+            day: {var: self.records[day].get(var) for var in variables}
+            for day in window
+        }
+
+class HourlyForecast:
+    """Columnar hourly forecast: value i of each column is for start_time + i * interval_seconds."""
+
+    def __init__(self, start_time: int, interval_seconds: int, utc_offset_seconds: int,
+                 hours: int, columns: dict):
+        self.start_time = start_time
+        self.interval_seconds = interval_seconds
+        self.utc_offset_seconds = utc_offset_seconds
+        self.hours = hours
+        self.columns = columns
+
+    @property
+    def count(self) -> int:
+        return min((len(c) for c in self.columns.values()), default=0)
+
+    def covers(self, variables, hours: int) -> bool:
+        return set(variables) <= set(self.columns) and hours <= self.hours
+
+    def union(self, variables, hours: int):
+        wanted = set(variables) | set(self.columns)
+        return [v for v in HOURLY_COLUMNS if v in wanted], max(hours, self.hours)
+
+    def to_dict(self) -> dict:
+        return {
+            "start_time": self.start_time,
+            "interval_seconds": self.interval_seconds,
+            "utc_offset_seconds": self.utc_offset_seconds,
+            "hours": self.hours,
+            "columns": {var: column.tolist() for var, column in self.columns.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, doc: dict) -> "HourlyForecast":
+        columns = {var: np.asarray(values, dtype=np.float32) for var, values in doc["columns"].items()}
+        return cls(doc["start_time"], doc["interval_seconds"], doc["utc_offset_seconds"], doc["hours"], columns)
+
+    def select(self, variables, hours: int) -> "HourlyForecast":
+        # Slices are numpy views; nothing is copied.
+        return HourlyForecast(
+            self.start_time, self.interval_seconds, self.utc_offset_seconds, hours,
+            {var: self.columns[var][:hours] for var in variables},
+        )
+
 class WeatherService:
-    def __init__(self):
-        cache_session = requests_cache.CachedSession('.cache', expire_after=3600)
-        retry_session = retry(cache_session, retries=5, backoff_factor=0.2)
-        self.client = openmeteo_requests.Client(session=retry_session)
-        self.url = get_settings().API_URL
+    def __init__(self, upstream: OpenMeteoClient = None):
+        settings = get_settings()
+        self.url = settings.API_URL
+        self.geocoding_url = settings.GEOCODING_API_URL
+        # One connection pool, concurrency limit and retry policy for every Open-Meteo call.
+        self.upstream = upstream or OpenMeteoClient(settings)
         self.repo = WeatherRepository()
+        self.city_repo = CityRepository()
+        self.cities = CityIndex()
+        self.history_cache = TTLCache(settings.HISTORY_CACHE_MAX_ENTRIES, settings.HISTORY_CACHE_TTL_SECONDS)
+        # Fetched forecasts per (grid point, day); an entry answers any request
+        # for a subset of its variables and horizons. Nearby cities and
+        # coordinates that snap to the same grid point share one entry.
+        self.grid_resolution = settings.FORECAST_GRID_RESOLUTION_DEG
+        self.nearest_city_km = settings.NEAREST_CITY_MAX_KM
+        # Tiers are set per deployment (FORECAST_CACHE_TIERS, GEOCODE_CACHE_TIERS), e.g. memory then sqlite.
+        self.forecast_cache = TieredCache(
+            "forecast",
+            build_tiers(settings.FORECAST_CACHE_TIERS, settings, settings.FORECAST_CACHE_MAX_ENTRIES),
+            JsonCodec(ForecastEntry.to_dict, ForecastEntry.from_dict),
+            settings.FORECAST_CACHE_TTL_SECONDS,
+        )
+        self.hourly_cache = TieredCache(
+            "hourly_forecast",
+            build_tiers(settings.FORECAST_CACHE_TIERS, settings, settings.FORECAST_CACHE_MAX_ENTRIES),
+            JsonCodec(HourlyForecast.to_dict, HourlyForecast.from_dict),
+            settings.FORECAST_CACHE_TTL_SECONDS,
+        )
+        # Geocoder answers by the name asked for, which need not be the name the index knows the city by.
+        self.geocode_cache = TieredCache(
+            "geocode",
+            build_tiers(settings.GEOCODE_CACHE_TIERS, settings, settings.GEOCODE_CACHE_MAX_ENTRIES),
+            JsonCodec(City.to_dict, City.from_dict),
+            settings.GEOCODE_CACHE_TTL_SECONDS,
+        )
+        # Created in init() when write-behind is enabled; until then writes go straight to Mongo.
+        self.write_behind = None
+        # (city, day) -> selection of the grid entry last stored for that city. Cities sharing an
+        # entry are each stored on their first request of the day, and again when it grows.
+        self.stored_forecasts = TTLCache(settings.FORECAST_CACHE_MAX_ENTRIES, 86400)
+
+    async def upstream_available(self) -> bool:
+        """Cheap reachability probe for Open-Meteo: any non-5xx answer counts as up.
+
+        It shares the connection pool but bypasses the limiter and retries.
+        """
+        response = await self.upstream.http.head(self.url, timeout=2.0)
+        return response.status_code < 500
 
     async def save_records(self, records, city, fetch_date):
         doc = {
@@ -26,68 +270,138 @@ class WeatherService:
             "fetch_date": fetch_date,
             "records": records
         }
+        if self.write_behind is not None:
+            await self.write_behind.put(doc)
+            return None
         try:
-            return await self.repo.insert(doc)
+            return await self.repo.bulk_upsert([doc])
         except Exception as e:
             logger.error(f"[WeatherService] Error caching records: {e}")
             raise
 
     def _build_daily_records(self, daily_data: DailyWeatherData):
         records = {}
-        for i in range(len(daily_data.times)):
-            date_key = daily_data.times[i]
-            record = {
-                "temperature_2m_max_c": float(daily_data.daily_temperature_2m_max[i]) if i < len(daily_data.daily_temperature_2m_max) else None,
-                "temperature_2m_min_c": float(daily_data.daily_temperature_2m_min[i]) if i < len(daily_data.daily_temperature_2m_min) else None,
-                "precipitation_sum_mm": float(daily_data.daily_precipitation_sum[i]) if i < len(daily_data.daily_precipitation_sum) else None,
-                "pressure_msl_mean_hpa": float(daily_data.daily_pressure_msl_mean[i]) if i < len(daily_data.daily_pressure_msl_mean) else None,
-                "wind_speed_10m_max_kmh": float(daily_data.daily_wind_speed_10m_max[i]) if i < len(daily_data.daily_wind_speed_10m_max) else None,
-                "relative_humidity_2m_max_pct": int(daily_data.daily_relative_humidity_2m_max[i]) if i < len(daily_data.daily_relative_humidity_2m_max) else None,
-            }
+        for i, date_key in enumerate(daily_data.times):
+            record = {}
+            for var, values in daily_data.values.items():
+                value = values[i] if i < len(values) else None
+                if value is None or value != value:
+                    record[var] = None
+                else:
+                    record[var] = int(value) if var in INTEGER_VARIABLES else float(value)
             records[date_key] = record
         return records
 
-    def parse_daily_response(self, response) -> list:
+    def parse_daily_response(self, response, variables=RECORD_VARIABLES) -> dict:
+        """Map the daily block of a response onto record fields.
+
+        Columns are matched by variable, aggregation and altitude, so a
+        reordered or substituted column is never read as another field.
+        """
         if not hasattr(response, "Daily"):
             logger.warning("Response has no 'Daily' attribute.")
-            return []
+            return {}
 
         try:
             daily_obj = response.Daily()
-            daily_vars = [daily_obj.Variables(i).ValuesAsNumpy() for i in range(6)]
-            daily_temperature_2m_max, daily_temperature_2m_min, daily_precipitation_sum, \
-            daily_pressure_msl_mean, daily_wind_speed_10m_max, daily_relative_humidity_2m_max = daily_vars
-
-            dates = pd.date_range(
-                start=pd.to_datetime(daily_obj.Time(), unit="s", utc=True),
-                end=pd.to_datetime(daily_obj.TimeEnd(), unit="s", utc=True),
-                freq=pd.Timedelta(seconds=daily_obj.Interval()),
-                inclusive="left"
-            )
-            times = [d.strftime("%Y-%m-%d") for d in dates]
-
-            daily_data = DailyWeatherData(
-                times=times,
-                daily_temperature_2m_max=daily_temperature_2m_max.tolist(),
-                daily_temperature_2m_min=daily_temperature_2m_min.tolist(),
-                daily_precipitation_sum=daily_precipitation_sum.tolist(),
-                daily_pressure_msl_mean=daily_pressure_msl_mean.tolist(),
-                daily_wind_speed_10m_max=daily_wind_speed_10m_max.tolist(),
-                daily_relative_humidity_2m_max=daily_relative_humidity_2m_max.tolist(),
-            )
-            
+            values = {
+                var: column.ValuesAsNumpy().tolist()
+                for var, column in match_columns(daily_obj, variables, DAILY_COLUMN_KEYS).items()
+            }
+
+            timestamps = np.arange(daily_obj.Time(), daily_obj.TimeEnd(), daily_obj.Interval())
+            times = timestamps.astype("datetime64[s]").astype("datetime64[D]").astype(str).tolist()
+
+            daily_data = DailyWeatherData(times=times, values=values)
             records = self._build_daily_records(daily_data)
             return records
 
         except (AttributeError, IndexError, ValueError, TypeError) as e:
             logger.error(f"Invalid or incomplete daily data structure: {e}")
-            return []
+            return {}
         except Exception as e:
             logger.exception(f"Unexpected error parsing daily response: {e}")
-            return []
+            return {}
+
+    def parse_hourly_response(self, response, variables=HOURLY_COLUMNS, hours: int = DEFAULT_FORECAST_HOURS):
+        """Keep the hourly block columnar: one float32 array per variable, no per-hour objects."""
+        if not hasattr(response, "Hourly"):
+            logger.warning("Response has no 'Hourly' attribute.")
+            return None
 
-    async def get_geocoding(self, name: str, count: int = 1, format: str = "json", language: str = "en"):
-        base_url = "https://geocoding-api.open-meteo.com/v1/search"
+        try:
+            hourly_obj = response.Hourly()
+            columns = {
+                var: column.ValuesAsNumpy().astype(np.float32, copy=False)
+                for var, column in match_columns(hourly_obj, variables, HOURLY_COLUMN_KEYS).items()
+            }
+            return HourlyForecast(
+                start_time=hourly_obj.Time(),
+                interval_seconds=hourly_obj.Interval(),
+                utc_offset_seconds=response.UtcOffsetSeconds(),
+                hours=hours,
+                columns=columns,
+            )
+        except (AttributeError, IndexError, ValueError, TypeError) as e:
+            logger.error(f"Invalid or incomplete hourly data structure: {e}")
+            return None
+        except Exception as e:
+            logger.exception(f"Unexpected error parsing hourly response: {e}")
+            return None
+
+    async def init(self):
+        """Start the write-behind queue and build the city index from the gazetteer and known cities."""
+        await self.city_repo.ensure_indexes()
+        await self.repo.ensure_indexes()
+        await self.upstream.init()
+        on_shutdown(self.upstream.close)
+        for cache in (self.forecast_cache, self.hourly_cache, self.geocode_cache):
+            await cache.init()
+            on_shutdown(cache.close)
+        settings = get_settings()
+        if settings.WRITE_BEHIND_ENABLED and self.write_behind is None:
+            self.write_behind = WriteBehindQueue(
+                "weather_write_behind",
+                self.repo.bulk_upsert,
+                batch_size=settings.WRITE_BEHIND_BATCH_SIZE,
+                flush_interval=settings.WRITE_BEHIND_FLUSH_INTERVAL_SECONDS,
+                max_queue=settings.WRITE_BEHIND_MAX_QUEUE,
+            )
+            self.write_behind.start()
+            on_shutdown(self.write_behind.close)
+        gazetteer = settings.CITY_GAZETTEER_PATH
+        if gazetteer:
+            try:
+                count = await asyncio.to_thread(self.cities.load_csv, gazetteer)
+                logger.info(f"[WeatherService] Loaded {count} cities from gazetteer '{gazetteer}'.")
+            except OSError as e:
+                logger.error(f"[WeatherService] Could not read gazetteer '{gazetteer}': {e}")
+        for city in await self.city_repo.find_all():
+            self.cities.add(city)
+        logger.info(f"[WeatherService] City index ready with {len(self.cities)} cities.")
+
+    def autocomplete(self, prefix: str, limit: int = 10):
+        return self.cities.search(prefix, limit)
+
+    async def resolve_city(self, name: str) -> City:
+        """Known cities come from the index; unknown ones are geocoded and added to it."""
+        city = self.cities.lookup(name)
+        if city is not None:
+            return city
+        geocode_key = name.strip().lower()
+        city = await self.geocode_cache.get(geocode_key)
+        if city is not None:
+            # Stored when it was first geocoded; only this process's index lacks it.
+            self.cities.add(city)
+            return city
+        city = await self.get_geocoding(name)
+        self.cities.add(city)
+        await self.city_repo.upsert(city)
+        await self.geocode_cache.set(geocode_key, city)
+        return city
+
+    async def get_geocoding(self, name: str, count: int = 1, format: str = "json", language: str = "en") -> City:
+        base_url = self.geocoding_url
         params = {
             "name": name,
             "count": count,
@@ -95,21 +409,25 @@ class WeatherService:
             "language": language,
         }
         try:
-            async with AsyncClient() as async_client:
-                response = await async_client.get(base_url, params=params)
-                response.raise_for_status()
-                try:
-                    data = response.json()
-                except Exception as json_err:
-                    raise ValueError(f"Invalid JSON response: {json_err}")
-                if not data.get("results"):
-                    raise LookupError(f"No geocoding results for '{name}'")
-                try:
-                    lat = float(data["results"][0]["latitude"])
-                    lon = float(data["results"][0]["longitude"])
-                except (KeyError, IndexError, ValueError) as parse_err:
-                    raise ValueError(f"Malformed geocoding data: {parse_err}")
-                return lat, lon
+            response = await self.upstream.get(base_url, params)
+            try:
+                data = response.json()
+            except Exception as json_err:
+                raise ValueError(f"Invalid JSON response: {json_err}")
+            if not data.get("results"):
+                raise LookupError(f"No geocoding results for '{name}'")
+            try:
+                result = data["results"][0]
+                return City(
+                    name=result.get("name") or name,
+                    country=result.get("country_code") or result.get("country") or "",
+                    latitude=float(result["latitude"]),
+                    longitude=float(result["longitude"]),
+                    admin1=result.get("admin1") or "",
+                    population=int(result.get("population") or 0),
+                )
+            except (KeyError, IndexError, ValueError) as parse_err:
+                raise ValueError(f"Malformed geocoding data: {parse_err}")
         except ValueError as e:
             logger.error(f"Geocoding error: {e}")
             raise
@@ -117,33 +435,14 @@ class WeatherService:
             logger.error(f"Geocoding request failed: {e}")
             raise
 
-    async def get_forecast(self, latitude: float, longitude: float) -> list:
+    async def _weather_api(self, params: dict):
         try:
-            openmeteo = openmeteo_requests.AsyncClient()
-            url = "https://api.open-meteo.com/v1/forecast"
-            params = {
-                "latitude": latitude,
-                "longitude": longitude,
-                "daily": [
-                    "temperature_2m_max",
-                    "temperature_2m_min",
-                    "precipitation_sum",
-                    "pressure_msl_mean",
-                    "wind_speed_10m_max",
-                    "relative_humidity_2m_max"
-                ],
-                "wind_speed_unit": "kmh",
-                "timezone": "auto",
-                "past_days": 7,
-                "forecast_days": 7
-            }
-
-            responses = await openmeteo.weather_api(url, params=params)
+            responses = await self.upstream.weather_api(self.url, params)
             if not responses:
                 raise LookupError("Empty response from Open-Meteo API")
-
-            response = responses[0]
-            return self.parse_daily_response(response)
+            return responses[0]
+        except DeadlineExceeded:
+            raise
         except (HTTPError, TimeoutException) as net_err:
             logger.error(f"[WeatherService] Network error: {net_err}")
             raise ConnectionError(f"Failed to reach Open-Meteo API: {net_err}") from net_err
@@ -156,15 +455,189 @@ class WeatherService:
         except Exception as e:
             logger.error(f"[WeatherService] Unexpected error: {e}")
             raise RuntimeError(f"Unexpected error while fetching forecast: {e}") from e
-        
-    async def get_forecast_by_city(self, city: str) -> list:
-        from datetime import date
-        today = date.today().isoformat()
+
+    async def get_forecast(self, latitude: float, longitude: float, variables=RECORD_VARIABLES,
+                           past_days: int = DEFAULT_PAST_DAYS, forecast_days: int = DEFAULT_FORECAST_DAYS) -> dict:
+        variables = list(variables)
+        response = await self._weather_api({
+            "latitude": latitude,
+            "longitude": longitude,
+            "daily": [DAILY_VARIABLES[v] for v in variables],
+            "wind_speed_unit": "kmh",
+            "timezone": "auto",
+            "past_days": past_days,
+            "forecast_days": forecast_days
+        })
+        return self.parse_daily_response(response, variables)
+
+    async def get_hourly_forecast(self, latitude: float, longitude: float, variables=HOURLY_COLUMNS,
+                                  hours: int = DEFAULT_FORECAST_HOURS):
+        variables = list(variables)
+        response = await self._weather_api({
+            "latitude": latitude,
+            "longitude": longitude,
+            "hourly": [HOURLY_VARIABLES[v] for v in variables],
+            "wind_speed_unit": "kmh",
+            "timezone": "auto",
+            "forecast_hours": hours,
+        })
+        forecast = self.parse_hourly_response(response, variables, hours)
+        if forecast is None:
+            raise LookupError("No hourly data in Open-Meteo response")
+        return forecast
+
+    def grid_point(self, latitude: float, longitude: float):
+        return snap_to_grid(latitude, longitude, self.grid_resolution)
+
+    async def _daily_forecast_at(self, latitude: float, longitude: float, variables,
+                                 past_days: int, forecast_days: int):
+        """Cached daily forecast for the grid point holding the coordinates.
+
+        Returns the selected records, the grid entry they came from and
+        whether it was fetched upstream.
+        """
+        lat, lon = self.grid_point(latitude, longitude)
+        cache_key = f"{lat}:{lon}:{date.today().isoformat()}"
+        entry = await self.forecast_cache.get(cache_key)
+        if entry and entry.covers(variables, past_days, forecast_days):
+            return entry.select(variables, past_days, forecast_days), entry, False
+        if entry:
+            # Grow the entry to a superset so both selections hit next time.
+            fetch = entry.union(variables, past_days, forecast_days)
+        else:
+            fetch = ForecastEntry(variables, past_days, forecast_days, {})
+        fetch.records = await self.get_forecast(lat, lon, fetch.variables, fetch.past_days, fetch.forecast_days)
+        if fetch.records:
+            await self.forecast_cache.set(cache_key, fetch)
+        return fetch.select(variables, past_days, forecast_days), fetch, True
+
+    async def _store_forecast(self, city: str, entry: ForecastEntry, fetched: bool):
+        """Store every record of the grid entry under `city`, unless that exact entry already is."""
+        key = (city, date.today().isoformat())
+        selection = (entry.variables, entry.past_days, entry.forecast_days)
+        if not entry.records or (not fetched and self.stored_forecasts.get(key) == selection):
+            return
+        await self.save_records(entry.records, city, key[1])
+        self.stored_forecasts.set(key, selection)
+
+    async def get_forecast_by_city(self, city: str, variables=None, past_days: int = 0,
+                                   forecast_days: int = 0) -> dict:
+        variables, past_days, forecast_days = normalize_selection(variables, past_days, forecast_days)
         try:
-            latitude, longitude = await self.get_geocoding(city)
-            records = await self.get_forecast(latitude, longitude)
-            await self.save_records(records, city, today)
+            location = await self.resolve_city(city)
+            records, entry, fetched = await self._daily_forecast_at(
+                location.latitude, location.longitude, variables, past_days, forecast_days
+            )
+            self.cities.record_request(location)
+            await self._store_forecast(city, entry, fetched)
             return records
         except Exception as e:
             logger.error(f"[WeatherService] Error getting daily forecast for city '{city}': {e}")
-            raise
\ No newline at end of file
+            raise
+
+    async def get_forecast_by_coordinates(self, latitude: float, longitude: float, variables=None,
+                                          past_days: int = 0, forecast_days: int = 0):
+        """Daily forecast for a point; returns (nearest known city or None, grid point, records)."""
+        validate_coordinates(latitude, longitude)
+        variables, past_days, forecast_days = normalize_selection(variables, past_days, forecast_days)
+        grid = self.grid_point(latitude, longitude)
+        try:
+            nearest = self.cities.nearest(latitude, longitude, self.nearest_city_km)
+            records, entry, fetched = await self._daily_forecast_at(
+                latitude, longitude, variables, past_days, forecast_days
+            )
+            # Only store the forecast under a city whose own requests read the same grid point.
+            if nearest is not None and self.grid_point(nearest.latitude, nearest.longitude) == grid:
+                await self._store_forecast(nearest.name, entry, fetched)
+            return nearest, grid, records
+        except Exception as e:
+            logger.error(f"[WeatherService] Error getting daily forecast for ({latitude}, {longitude}): {e}")
+            raise
+
+    async def get_hourly_forecast_by_city(self, city: str, variables=None, hours: int = 0):
+        variables, hours = normalize_hourly_selection(variables, hours)
+        try:
+            location = await self.resolve_city(city)
+            lat, lon = self.grid_point(location.latitude, location.longitude)
+            # Hourly forecasts start at the current hour, so entries are per hour.
+            cache_key = f"{lat}:{lon}:{current_hour()}"
+            entry = await self.hourly_cache.get(cache_key)
+            if entry and entry.covers(variables, hours):
+                return entry.select(variables, hours)
+            if entry:
+                variables_to_fetch, hours_to_fetch = entry.union(variables, hours)
+            else:
+                variables_to_fetch, hours_to_fetch = variables, hours
+            forecast = await self.get_hourly_forecast(lat, lon, variables_to_fetch, hours_to_fetch)
+            self.cities.record_request(location)
+            await self.hourly_cache.set(cache_key, forecast)
+            return forecast.select(variables, hours)
+        except Exception as e:
+            logger.error(f"[WeatherService] Error getting hourly forecast for city '{city}': {e}")
+            raise
+
+    async def get_history(self, city: str, start_date: str, end_date: str):
+        """Merge the stored fetches for a city into one daily series per variable.
+
+        Newer fetches win for dates covered by several documents. Documents are
+        streamed, so only the merged result is held in memory. Returns the
+        sorted ISO dates, their day numbers and a float column per variable
+        (NaN where a value is missing).
+        """
+        start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+        if start > end:
+            raise ValueError("start_date must not be after end_date")
+        # A fetch made on day F holds records for [F - past_days, F + forecast_days).
+        query = {
+            "city": city,
+            "date": {
+                "$gte": (start - timedelta(days=MAX_FORECAST_DAYS)).isoformat(),
+                "$lte": (end + timedelta(days=MAX_PAST_DAYS)).isoformat(),
+            },
+        }
+        merged = {}
+        # Oldest fetch first so newer values overwrite; only the records are read.
+        async for doc in self.repo.stream(query, projection=HISTORY_PROJECTION, sort=[("fetch_date", 1)]):
+            for day, record in (doc.get("records") or {}).items():
+                if start_date <= day <= end_date:
+                    merged.setdefault(day, {}).update(record)
+
+        days = np.array(sorted(merged), dtype="U10")
+        x = days.astype("datetime64[D]").astype(np.int64)
+        columns = {
+            var: np.array(
+                [merged[day].get(var) for day in days.tolist()], dtype=np.float64
+            )
+            for var in RECORD_VARIABLES
+        }
+        return days, x, columns
+
+    async def export(self, cities, start_date: str, end_date: str, chunk_days: int):
+        """Yield (city, dates, columns) chunks of at most `chunk_days` stored days.
+
+        Cities are read one at a time, so memory holds a single city's range.
+        """
+        for city in cities or await self.repo.distinct_cities():
+            days, _, columns = await self.get_history(city, start_date, end_date)
+            for i in range(0, len(days), chunk_days):
+                yield city, days[i:i + chunk_days], {var: col[i:i + chunk_days] for var, col in columns.items()}
+
+    async def get_downsampled_history(self, city: str, start_date: str, end_date: str,
+                                      max_points: int = 0, method: str = LTTB) -> list:
+        key = (city, start_date, end_date, max_points, method)
+        cached = self.history_cache.get(key)
+        if cached is not None:
+            return cached
+
+        days, x, columns = await self.get_history(city, start_date, end_date)
+        series = []
+        for var, y in columns.items():
+            idx = downsample(x, y, max_points, method)
+            series.append({
+                "variable": var,
+                "dates": days[idx].tolist(),
+                "values": y[idx].tolist(),
+                "source_points": int(np.count_nonzero(~np.isnan(y))),
+            })
+        self.history_cache.set(key, series)
+        return series
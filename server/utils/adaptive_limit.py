@@ -0,0 +1,109 @@
+import asyncio
+import time
+from collections import deque
+from typing import Optional
+
+
+class AdaptiveLimiter:
+    """Caps in-flight calls with an AIMD (additive increase, multiplicative decrease) limit.
+
+    A call that succeeds within `latency_target` seconds raises the limit by
+    1/limit, i.e. by about one per round of calls; slower successes leave it
+    alone, so a queueing upstream stops the growth. An overload signal
+    (reported with slot.failed()) multiplies it by `backoff`. Waiters are
+    admitted in FIFO order.
+    Not thread-safe: use it from a single event loop.
+    """
+
+    def __init__(self, initial: float = 16, min_limit: float = 1, max_limit: float = 128,
+                 latency_target: float = 2.0, backoff: float = 0.5, clock=time.monotonic):
+        self.limit = float(initial)
+        self.min_limit = float(min_limit)
+        self.max_limit = float(max_limit)
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.in_flight = 0
+        self._clock = clock
+        self._waiters: deque = deque()
+
+    @property
+    def has_capacity(self) -> bool:
+        return self.in_flight < int(self.limit)
+
+    async def acquire(self, timeout: Optional[float] = None):
+        """Wait for a slot; raises asyncio.TimeoutError after `timeout` seconds in the queue."""
+        if self.has_capacity and not self._waiters:
+            self.in_flight += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            # The slot is handed over by _release_slot, already counted.
+            await asyncio.wait_for(waiter, timeout)
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                self._release_slot()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+
+    def try_acquire(self) -> bool:
+        """Take a slot without waiting; for optional work such as hedged requests."""
+        if not self.has_capacity or self._waiters:
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self, ok: bool = True, latency: float = 0.0):
+        if not ok:
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+        elif latency <= self.latency_target:
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+        self._release_slot()
+
+    def _release_slot(self):
+        self.in_flight -= 1
+        while self._waiters and self.has_capacity:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def slot(self, acquired: bool = False) -> "Slot":
+        """A context manager holding one slot; pass acquired=True when the slot is already taken."""
+        return Slot(self, acquired)
+
+
+class Slot:
+    """`async with limiter.slot() as slot:` holds one slot; call slot.failed() on an overload signal."""
+
+    def __init__(self, limiter: AdaptiveLimiter, acquired: bool = False):
+        self.limiter = limiter
+        self.acquired = acquired
+        self.ok = True
+        self.counted = True
+        self.start = 0.0
+
+    def failed(self):
+        self.ok = False
+
+    def uncounted(self):
+        """Release without adjusting the limit: the call never reached the upstream."""
+        self.counted = False
+
+    def elapsed(self) -> float:
+        return self.limiter._clock() - self.start
+
+    async def __aenter__(self):
+        if not self.acquired:
+            await self.limiter.acquire()
+        self.start = self.limiter._clock()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is asyncio.CancelledError or not self.counted:
+            # A cancelled call, e.g. the losing half of a hedge, says nothing about the upstream.
+            self.limiter._release_slot()
+        else:
+            self.limiter.release(self.ok, self.elapsed())
+        return False
@@ -0,0 +1,124 @@
+import csv
+import heapq
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from models.city import City
+from utils.geo_index import GeoIndex
+
+# One request counts as much as this many inhabitants when ranking.
+POPULARITY_WEIGHT = 10_000
+# Results for prefixes this short are memoized until a city is added.
+MEMO_PREFIX_LENGTH = 2
+
+
+def normalize_name(name: str) -> str:
+    """Case- and accent-insensitive form used for matching ("São Paulo" -> "sao paulo")."""
+    decomposed = unicodedata.normalize("NFKD", name or "")
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold().strip()
+
+
+class CityIndex:
+    """In-memory prefix index over known cities.
+
+    Names are kept in a sorted array of (normalized name, city key), so a
+    prefix query is two binary searches plus a top-k over the matching slice.
+    Cities can be added at any time; the array stays sorted. A GeoIndex
+    over the same cities answers nearest-city queries for coordinates.
+
+    add_many() and load_csv() may run in a worker thread while the event
+    loop searches: they build new structures aside and swap them in, cities
+    first and memo last, so a reader never sees a key it cannot resolve and
+    never memoizes a result of the old array into the new memo.
+    """
+
+    def __init__(self):
+        self._entries: List[Tuple[str, str]] = []
+        self._cities: Dict[str, City] = {}
+        self._popularity: Counter = Counter()
+        self._memo: Dict[Tuple[str, int], List[City]] = {}
+        self._geo = GeoIndex()
+        # Serializes writers; readers go lock-free on whatever is swapped in.
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._cities)
+
+    def add(self, city: City):
+        key = city.key
+        with self._lock:
+            if key not in self._cities:
+                insort(self._entries, (normalize_name(city.name), key))
+            self._cities[key] = city
+            self._geo.add(city)
+            self._memo = {}
+
+    def add_many(self, cities: Iterable[City]):
+        """Add cities in bulk: one sort for the batch rather than one insertion per city."""
+        new = {city.key: city for city in cities}
+        fresh = sorted((normalize_name(city.name), key) for key, city in new.items())
+        with self._lock:
+            cities_by_key = {**self._cities, **new}
+            # Two sorted runs: the sort merges them in linear time.
+            entries = self._entries + [entry for entry in fresh if entry[1] not in self._cities]
+            entries.sort()
+            geo = GeoIndex(self._geo.cell_degrees)
+            for city in cities_by_key.values():
+                geo.add(city)
+            self._cities = cities_by_key
+            self._geo = geo
+            self._entries = entries
+            self._memo = {}
+
+    def load_csv(self, path: str) -> int:
+        """Load a gazetteer with a name,country,admin1,latitude,longitude,population header."""
+        with open(path, newline="", encoding="utf-8") as f:
+            cities = [City.from_dict(row) for row in csv.DictReader(f)]
+        self.add_many(cities)
+        return len(cities)
+
+    def _score(self, key: str) -> int:
+        return self._cities[key].population + POPULARITY_WEIGHT * self._popularity[key]
+
+    @staticmethod
+    def _matching_keys(entries: List[Tuple[str, str]], prefix: str) -> List[str]:
+        lo = bisect_left(entries, (prefix,))
+        hi = bisect_left(entries, (prefix + "\U0010ffff",))
+        return [key for _, key in entries[lo:hi]]
+
+    def search(self, prefix: str, limit: int = 10) -> List[City]:
+        prefix = normalize_name(prefix)
+        if not prefix:
+            return []
+        # Memo before entries: the reverse of the order add_many() swaps them in.
+        memo, entries = self._memo, self._entries
+        memo_key = (prefix, limit)
+        if len(prefix) <= MEMO_PREFIX_LENGTH and memo_key in memo:
+            return memo[memo_key]
+        keys = heapq.nlargest(limit, self._matching_keys(entries, prefix), key=self._score)
+        result = [self._cities[k] for k in keys]
+        if len(prefix) <= MEMO_PREFIX_LENGTH:
+            memo[memo_key] = result
+        return result
+
+    def lookup(self, name: str) -> Optional[City]:
+        """Best-ranked city whose name is exactly `name` (after normalization)."""
+        normalized = normalize_name(name)
+        entries = self._entries
+        lo = bisect_left(entries, (normalized,))
+        hi = bisect_left(entries, (normalized, "\U0010ffff"))
+        keys = [key for _, key in entries[lo:hi]]
+        if not keys:
+            return None
+        return self._cities[max(keys, key=self._score)]
+
+    def nearest(self, latitude: float, longitude: float, max_km: float = 25.0) -> Optional[City]:
+        return self._geo.nearest(latitude, longitude, max_km)
+
+    def record_request(self, city: City):
+        # Memoized short-prefix results pick the new ranking up on the next add().
+        if city.key in self._cities:
+            self._popularity[city.key] += 1
@@ -0,0 +1,74 @@
+import numpy as np
+
+LTTB = "lttb"
+MIN_MAX = "min_max"
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets. Returns the indices of the kept points."""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # n_out - 2 buckets over the interior points; first and last are always kept.
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+
+    csum_x = np.concatenate(([0.0], np.cumsum(x)))
+    csum_y = np.concatenate(([0.0], np.cumsum(y)))
+    counts = ends - starts
+    avg_x = (csum_x[ends] - csum_x[starts]) / counts
+    avg_y = (csum_y[ends] - csum_y[starts]) / counts
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.append(avg_y[1:], y[-1])
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        s, e = starts[i], ends[i]
+        ax, ay = x[a], y[a]
+        area = np.abs((ax - next_x[i]) * (y[s:e] - ay) - (ax - x[s:e]) * (next_y[i] - ay))
+        a = s + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def min_max(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Min/max bucketing: keeps the extremes of n_out // 2 buckets plus both ends."""
+    n = len(x)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype=np.float64)
+    n_buckets = (n_out - 2) // 2
+    bounds = np.linspace(0, n, n_buckets + 1).astype(np.int64)
+    bucket = np.repeat(np.arange(n_buckets), np.diff(bounds))
+
+    mins = np.minimum.reduceat(y, bounds[:-1])
+    maxs = np.maximum.reduceat(y, bounds[:-1])
+    min_idx = _first_per_bucket(np.flatnonzero(y == mins[bucket]), bucket)
+    max_idx = _first_per_bucket(np.flatnonzero(y == maxs[bucket]), bucket)
+
+    return np.unique(np.concatenate(([0, n - 1], min_idx, max_idx)))
+
+
+def _first_per_bucket(idx: np.ndarray, bucket: np.ndarray) -> np.ndarray:
+    _, first = np.unique(bucket[idx], return_index=True)
+    return idx[first]
+
+
+_METHODS = {LTTB: lttb, MIN_MAX: min_max}
+
+
+def downsample(x: np.ndarray, y: np.ndarray, n_out: int, method: str = LTTB) -> np.ndarray:
+    """Indices of a shape-preserving subset of (x, y). NaN values are dropped first."""
+    if method not in _METHODS:
+        raise ValueError(f"Unknown downsampling method '{method}'")
+    valid = np.flatnonzero(~np.isnan(y))
+    if n_out <= 0 or len(valid) <= n_out:
+        return valid
+    return valid[_METHODS[method](x[valid], y[valid], n_out)]
@@ -0,0 +1,76 @@
+import math
+from typing import Dict, Optional, Tuple
+
+from models.city import City
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def snap_to_grid(latitude: float, longitude: float, resolution: float) -> Tuple[float, float]:
+    """Centre of the grid cell holding the point; requests in one cell share a forecast."""
+    if resolution <= 0:
+        return latitude, longitude
+    lat = round(round(latitude / resolution) * resolution, 6)
+    lon = round(round(longitude / resolution) * resolution, 6)
+    # Keep the dateline on one side so +180 and -180 share an entry.
+    if lon >= 180:
+        lon = round(lon - 360, 6)
+    return lat, lon
+
+
+def validate_coordinates(latitude: float, longitude: float):
+    if not -90 <= latitude <= 90:
+        raise ValueError("latitude must be between -90 and 90")
+    if not -180 <= longitude <= 180:
+        raise ValueError("longitude must be between -180 and 180")
+
+
+class GeoIndex:
+    """Cities bucketed on a fixed lat/lon grid for nearest-neighbour lookups.
+
+    A query scans the ring of buckets around the point that can hold
+    anything within the search radius, so it touches only a few buckets.
+    """
+
+    def __init__(self, cell_degrees: float = 0.5):
+        self.cell_degrees = cell_degrees
+        self._buckets: Dict[Tuple[int, int], Dict[str, City]] = {}
+        self._cell_of: Dict[str, Tuple[int, int]] = {}
+
+    def _cell(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        return math.floor(latitude / self.cell_degrees), math.floor(longitude / self.cell_degrees)
+
+    def add(self, city: City):
+        key = city.key
+        old = self._cell_of.get(key)
+        if old is not None:
+            self._buckets[old].pop(key, None)
+        cell = self._cell(city.latitude, city.longitude)
+        self._buckets.setdefault(cell, {})[key] = city
+        self._cell_of[key] = cell
+
+    def nearest(self, latitude: float, longitude: float, max_km: float = 25.0) -> Optional[City]:
+        lat_cells = math.ceil(max_km / 111.0 / self.cell_degrees)
+        # Longitude degrees shrink towards the poles.
+        lon_km = 111.0 * max(math.cos(math.radians(latitude)), 0.01)
+        lon_cells = min(math.ceil(max_km / lon_km / self.cell_degrees), int(360 / self.cell_degrees))
+        ci, cj = self._cell(latitude, longitude)
+        lon_cell_count = round(360 / self.cell_degrees)
+        best, best_km = None, max_km
+        for i in range(ci - lat_cells, ci + lat_cells + 1):
+            for j in range(cj - lon_cells, cj + lon_cells + 1):
+                # Wrap around the antimeridian.
+                wrapped = (j + lon_cell_count // 2) % lon_cell_count - lon_cell_count // 2
+                for city in self._buckets.get((i, wrapped), {}).values():
+                    km = haversine_km(latitude, longitude, city.latitude, city.longitude)
+                    if km <= best_km:
+                        best, best_km = city, km
+        return best
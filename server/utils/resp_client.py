@@ -0,0 +1,111 @@
+import asyncio
+from typing import List, Optional, Sequence
+from urllib.parse import unquote, urlparse
+
+
+class RespError(Exception):
+    """An error reply (-ERR ...) from the server."""
+
+
+def encode_command(args: Sequence) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, str):
+            arg = arg.encode()
+        elif isinstance(arg, (int, float)):
+            arg = str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+async def read_reply(reader: asyncio.StreamReader):
+    line = await reader.readline()
+    if not line.endswith(b"\r\n"):
+        raise ConnectionError("Connection closed by the server")
+    kind, rest = line[:1], line[1:-2]
+    if kind == b"+":
+        return rest.decode()
+    if kind == b"-":
+        return RespError(rest.decode())
+    if kind == b":":
+        return int(rest)
+    if kind == b"$":
+        size = int(rest)
+        if size < 0:
+            return None
+        data = await reader.readexactly(size + 2)
+        return data[:-2]
+    if kind == b"*":
+        size = int(rest)
+        if size < 0:
+            return None
+        return [await read_reply(reader) for _ in range(size)]
+    raise ConnectionError(f"Unexpected reply type {kind!r}")
+
+
+class RespClient:
+    """Minimal client for the Redis protocol (RESP2): enough for a cache.
+
+    One connection, used by one pipeline at a time; it is opened on first use
+    and reopened after any connection error. Every round trip is bounded by
+    `timeout` seconds, so a stuck server costs a cache miss, not a request.
+    """
+
+    def __init__(self, url: str = "redis://localhost:6379/0", timeout: float = 0.5):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._lock = asyncio.Lock()
+
+    async def _connect(self):
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        setup = []
+        if self.password:
+            setup.append(("AUTH", self.password))
+        if self.db:
+            setup.append(("SELECT", self.db))
+        if setup:
+            for reply in await self._round_trip(setup):
+                if isinstance(reply, RespError):
+                    raise reply
+
+    async def _round_trip(self, commands) -> List:
+        self._writer.write(b"".join(encode_command(c) for c in commands))
+        await self._writer.drain()
+        return [await read_reply(self._reader) for _ in commands]
+
+    async def pipeline(self, *commands: Sequence) -> List:
+        """Send the commands in one write and return their replies; error replies come back as RespError."""
+        async with self._lock:
+            try:
+                if self._writer is None:
+                    await asyncio.wait_for(self._connect(), self.timeout)
+                return await asyncio.wait_for(self._round_trip(commands), self.timeout)
+            except BaseException:
+                # Including cancellation: the stream may hold half a reply, so start clean next time.
+                await self._disconnect()
+                raise
+
+    async def execute(self, *args):
+        reply = (await self.pipeline(args))[0]
+        if isinstance(reply, RespError):
+            raise reply
+        return reply
+
+    async def _disconnect(self):
+        writer, self._reader, self._writer = self._writer, None, None
+        if writer is not None:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (OSError, ConnectionError):
+                pass
+
+    async def close(self):
+        async with self._lock:
+            await self._disconnect()
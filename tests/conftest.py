@@ -0,0 +1,21 @@
+import os
+import sys
+
+# Mirror the PYTHONPATH the server image runs with (see server/Dockerfile).
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT, os.path.join(ROOT, "server"), os.path.join(ROOT, "proto"), os.path.join(ROOT, "proto", "generated")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+for name, value in {
+    "APP_NAME": "climatechart-test",
+    "API_KEY_HEADER": "x-api-key",
+    "AUTHZ_HEADER": "authorization",
+    "EXPECTED_API_KEY": "test",
+    "DB_URL": "mongodb://localhost:27017",
+    "API_URL": "https://api.open-meteo.com/v1/forecast",
+    "DEFAULT_SENDER": "noreply@example.com",
+    "PASSWORD": "test",
+    "TEMPLATE_UUID": "test",
+}.items():
+    os.environ.setdefault(name, value)
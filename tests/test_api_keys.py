@@ -0,0 +1,239 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+import grpc
+import pytest
+
+from core.config import get_settings
+from core.request_context import current_api_key
+from handlers.user_service_servicer import UserServiceServicer
+from interceptors.auth_interceptor import AuthInterceptor
+from proto.generated import user_pb2
+from repositories.api_key_repository import hash_key
+from services.api_key_service import ApiKeyService
+from services.token_service import TokenService
+
+
+class FakeRepo:
+    """In-memory stand-in for ApiKeyRepository keeping what would be stored."""
+
+    def __init__(self):
+        self.docs = []
+
+    async def insert(self, info):
+        self.docs.append(info.to_dict())
+        return info
+
+    async def find_by_digest(self, digest):
+        from models.api_key_info import ApiKeyInfo
+        now = datetime.now(timezone.utc)
+        for doc in self.docs:
+            if doc["digest"] == digest and doc.get("expires_at", now) >= now:
+                return ApiKeyInfo.from_dict(doc)
+        return None
+
+    async def find_by_user(self, user_email):
+        from models.api_key_info import ApiKeyInfo
+        return [ApiKeyInfo.from_dict(d) for d in reversed(self.docs) if d["user_email"] == user_email]
+
+
+def _service():
+    service = ApiKeyService()
+    service.repo = FakeRepo()
+    return service
+
+
+def test_keys_are_stored_as_prefix_and_digest_only():
+    service = _service()
+    created = asyncio.run(service.create_key("Ada@Example.com", ttl_days=30))
+    stored = service.repo.docs[0]
+    assert created.value and created.value not in str(stored)
+    assert stored["digest"] == hash_key(created.value)
+    assert stored["prefix"] == created.value[:8]
+    assert stored["user_email"] == "ada@example.com"
+    assert (stored["expires_at"] - stored["created_at"]).days == 30
+
+
+def test_authenticate_by_key_alone_with_several_keys_per_user():
+    service = _service()
+
+    async def run():
+        first = await service.create_key("ada@example.com")
+        second = await service.create_key("ada@example.com")
+        return first, second, await service.authenticate(first.value), await service.authenticate(second.value)
+
+    first, second, found_first, found_second = asyncio.run(run())
+    assert found_first.prefix == first.prefix and found_second.prefix == second.prefix
+    assert found_first.value == ""
+    assert asyncio.run(service.authenticate("not-a-key")) is None
+    assert asyncio.run(service.get_key("ada@example.com")).prefix == second.prefix
+
+
+def test_zero_ttl_keys_do_not_expire():
+    service = _service()
+    asyncio.run(service.create_key("ada@example.com", ttl_days=0))
+    assert "expires_at" not in service.repo.docs[0]
+
+
+class AbortContext:
+    async def abort(self, code, details):
+        self.code, self.details = code, details
+        raise grpc.aio.AbortError()
+
+
+def test_negative_ttl_is_rejected_before_a_key_is_created():
+    service = _service()
+    servicer = UserServiceServicer(users=object(), api_keys=service, emails=object(), tokens=object())
+    context = AbortContext()
+    request = user_pb2.CreateApiKeyRequest(user_email="ada@example.com", ttl_days=-1)
+    with pytest.raises(grpc.aio.AbortError):
+        asyncio.run(servicer.CreateApiKey(request, context))
+    assert context.code == grpc.StatusCode.INVALID_ARGUMENT
+    assert service.repo.docs == []
+
+
+def test_interceptor_accepts_key_without_email_and_never_logs_it(caplog):
+    service = _service()
+    key = asyncio.run(service.create_key("ada@example.com")).value
+    settings = get_settings().model_copy()
+    settings.API_KEY_METHODS = {"/test.Echo/Who"}
+    seen = []
+
+    async def who(request, context):
+        seen.append(current_api_key.get().user_email)
+        return b"ok"
+
+    handler = grpc.unary_unary_rpc_method_handler(who)
+
+    async def run():
+        server = grpc.aio.server(interceptors=[AuthInterceptor(service, settings, TokenService(keys={"k": "k" * 32}))])
+        server.add_generic_rpc_handlers((grpc.method_handlers_generic_handler("test.Echo", {"Who": handler}),))
+        port = server.add_insecure_port("127.0.0.1:0")
+        await server.start()
+        codes = []
+        try:
+            async with grpc.aio.insecure_channel(f"127.0.0.1:{port}") as channel:
+                call = channel.unary_unary("/test.Echo/Who")
+                for md in ([("x-api-key", key)],
+                           [("x-api-key", key), ("x-user-email", "ada@example.com")],
+                           [("x-api-key", key), ("x-user-email", "eve@example.com")],
+                           [("x-api-key", "wrong-key-value")]):
+                    try:
+                        await call(b"", metadata=md)
+                        codes.append(grpc.StatusCode.OK)
+                    except grpc.aio.AioRpcError as e:
+                        codes.append(e.code())
+        finally:
+            await server.stop(0)
+        return codes
+
+    with caplog.at_level(logging.INFO):
+        codes = asyncio.run(run())
+    assert codes == [grpc.StatusCode.OK, grpc.StatusCode.OK,
+                     grpc.StatusCode.UNAUTHENTICATED, grpc.StatusCode.UNAUTHENTICATED]
+    assert seen == ["ada@example.com", "ada@example.com"]
+    assert key not in caplog.text
+    assert "wrong-key-value" not in caplog.text
+
+
+class FakeCollection:
+    """Enough of a Mongo collection for the API key repository, enforcing unique indexes like Mongo:
+    a missing field indexes as null, so two documents without it collide."""
+
+    def __init__(self, docs, unique=("value",)):
+        self.docs = [dict(d) for d in docs]
+        self.unique = {f"{field}_1": field for field in unique}
+
+    @staticmethod
+    def _matches(doc, query):
+        for field, cond in query.items():
+            if field == "$or":
+                if not any(FakeCollection._matches(doc, q) for q in cond):
+                    return False
+            elif isinstance(cond, dict):
+                if "$exists" in cond and (field in doc) != cond["$exists"]:
+                    return False
+                if "$gt" in cond and not (field in doc and doc[field] > cond["$gt"]):
+                    return False
+            elif doc.get(field) != cond:
+                return False
+        return True
+
+    def _check_unique(self, candidate, skip=None):
+        from pymongo.errors import DuplicateKeyError
+        for name, field in self.unique.items():
+            if any(d is not skip and d.get(field) == candidate.get(field) for d in self.docs):
+                raise DuplicateKeyError(f"E11000 duplicate key error index: {name}")
+
+    async def index_information(self):
+        return {"_id_": {}, **{name: {"unique": True} for name in self.unique}}
+
+    async def drop_index(self, name):
+        del self.unique[name]
+
+    async def create_index(self, field, unique=False, **kwargs):
+        if unique:
+            values = [d.get(field) for d in self.docs]
+            if len(values) != len(set(values)):
+                from pymongo.errors import DuplicateKeyError
+                raise DuplicateKeyError(f"E11000 duplicate key error building {field}_1")
+            self.unique[f"{field}_1"] = field
+
+    async def find(self, query, projection=None):
+        for doc in [d for d in self.docs if self._matches(d, query)]:
+            yield dict(doc)
+
+    async def find_one(self, query, **kwargs):
+        return next((dict(d) for d in self.docs if self._matches(d, query)), None)
+
+    async def update_one(self, query, update):
+        from types import SimpleNamespace
+        doc = next((d for d in self.docs if self._matches(d, query)), None)
+        if doc is None:
+            return SimpleNamespace(modified_count=0)
+        updated = {**doc, **update.get("$set", {})}
+        for field in update.get("$unset", {}):
+            updated.pop(field, None)
+        self._check_unique(updated, skip=doc)
+        doc.clear()
+        doc.update(updated)
+        return SimpleNamespace(modified_count=1)
+
+    async def insert_one(self, doc):
+        self._check_unique(doc)
+        self.docs.append(dict(doc))
+
+
+def test_plaintext_keys_are_migrated_and_new_keys_can_still_be_created(monkeypatch):
+    import repositories.api_key_repository as api_key_repository
+    from repositories.api_key_repository import ApiKeyRepository
+
+    legacy = [
+        {"_id": i, "user_email": "ada@example.com", "value": f"legacy-key-{i}-0123456789",
+         "created_at": datetime.now(timezone.utc)}
+        for i in range(3)
+    ]
+    collection = FakeCollection(legacy)
+
+    async def get_collection(name):
+        return collection
+
+    monkeypatch.setattr(api_key_repository, "get_collection", get_collection)
+    service = ApiKeyService()
+    service.repo = ApiKeyRepository()
+
+    async def run():
+        await service.repo.ensure_indexes()
+        # Idempotent: a second start finds nothing left to do.
+        await service.repo.ensure_indexes()
+        created = [await service.create_key("ada@example.com") for _ in range(2)]
+        found_legacy = [await service.authenticate(doc["value"]) for doc in legacy]
+        found_new = [await service.authenticate(key.value) for key in created]
+        return created, found_legacy, found_new
+
+    created, found_legacy, found_new = asyncio.run(run())
+    assert all("value" not in doc for doc in collection.docs)
+    assert "value_1" not in collection.unique and "digest_1" in collection.unique
+    assert all(created) and len(collection.docs) == 5
+    assert all(found is not None for found in found_legacy + found_new)
@@ -0,0 +1,148 @@
+import asyncio
+import json
+import threading
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from services.backfill_service import BackfillService, date_windows, parse_archive_daily
+from services.weather_service import WeatherService
+from utils.rate_limit import TokenBucket
+
+CITIES = {
+    "London": (51.51, -0.13),
+    "Paris": (48.85, 2.35),
+    "Oslo": (59.91, 10.75),
+}
+
+
+class FakeUpstream(BaseHTTPRequestHandler):
+    """Open-Meteo geocoding and archive endpoints, with injectable failures."""
+
+    requests = []
+    flaky = {}       # latitude -> number of 503s still to return
+    broken = set()   # latitudes that always fail
+
+    def log_message(self, *args):
+        pass
+
+    def _json(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        FakeUpstream.requests.append((url.path, params))
+        if url.path == "/v1/search":
+            lat, lon = CITIES[params["name"]]
+            return self._json(200, {"results": [{"name": params["name"], "country_code": "XX",
+                                                 "latitude": lat, "longitude": lon}]})
+        lat = float(params["latitude"])
+        if lat in FakeUpstream.broken:
+            return self._json(500, {"error": True})
+        if FakeUpstream.flaky.get(lat):
+            FakeUpstream.flaky[lat] -= 1
+            return self._json(503, {"error": True})
+        start, end = date.fromisoformat(params["start_date"]), date.fromisoformat(params["end_date"])
+        days = [date.fromordinal(d).isoformat() for d in range(start.toordinal(), end.toordinal() + 1)]
+        daily = {"time": days}
+        for var in params["daily"].split(","):
+            daily[var] = [lat] * len(days)
+        daily["precipitation_sum"][0] = None
+        return self._json(200, {"daily": daily})
+
+
+class FakeRepo:
+    def __init__(self):
+        self.days = {}
+
+    async def bulk_merge_days(self, city, records):
+        for day, record in records.items():
+            self.days[(city, day)] = record
+        return len(records)
+
+
+@pytest.fixture
+def upstream():
+    FakeUpstream.requests = []
+    FakeUpstream.flaky = {}
+    FakeUpstream.broken = set()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeUpstream)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def _backfill(base_url, repo, checkpoint):
+    weather = WeatherService()
+    weather.geocoding_url = f"{base_url}/v1/search"
+
+    async def upsert(city):
+        return True
+
+    weather.city_repo.upsert = upsert
+    backfill = BackfillService(weather, repo, checkpoint_path=str(checkpoint), concurrency=2,
+                               requests_per_minute=6000, window_days=10,
+                               archive_url=f"{base_url}/v1/archive")
+    backfill.retry_base_seconds = 0.001
+    return backfill
+
+
+def test_date_windows_cover_range():
+    windows = date_windows(date(2024, 1, 1), date(2024, 1, 25), 10)
+    assert windows == [
+        (date(2024, 1, 1), date(2024, 1, 10)),
+        (date(2024, 1, 11), date(2024, 1, 20)),
+        (date(2024, 1, 21), date(2024, 1, 25)),
+    ]
+
+
+def test_parse_archive_daily():
+    records = parse_archive_daily({"daily": {
+        "time": ["2024-01-01"], "temperature_2m_max": [3.5], "relative_humidity_2m_max": [81.0],
+    }})
+    assert records["2024-01-01"]["temperature_2m_max_c"] == 3.5
+    assert records["2024-01-01"]["relative_humidity_2m_max_pct"] == 81
+    assert records["2024-01-01"]["precipitation_sum_mm"] is None
+
+
+def test_token_bucket_limits_rate():
+    now = [0.0]
+    bucket = TokenBucket.per_minute(60, burst=2)
+    bucket._clock = lambda: now[0]
+    bucket._updated = 0.0
+    assert bucket.try_acquire() == 0 and bucket.try_acquire() == 0
+    assert bucket.try_acquire() == pytest.approx(1.0)
+    now[0] = 1.0
+    assert bucket.try_acquire() == 0
+
+
+def test_backfill_end_to_end_with_retries_and_resume(upstream, tmp_path):
+    checkpoint = tmp_path / "checkpoint.json"
+    repo = FakeRepo()
+    FakeUpstream.flaky[51.51] = 2
+    FakeUpstream.broken.add(59.91)
+    start, end = date(2024, 1, 1), date(2024, 1, 25)
+
+    stats = asyncio.run(_backfill(upstream, repo, checkpoint).run(["London", "Paris", "Oslo", "London"], start, end))
+    assert stats["failed"] == 1
+    assert len([k for k in repo.days if k[0] == "London"]) == 25
+    assert repo.days[("Paris", "2024-01-11")]["temperature_2m_max_c"] == 48.85
+    assert json.loads(checkpoint.read_text()) == {"London": "2024-01-25", "Paris": "2024-01-25"}
+
+    # Second run: finished cities are skipped, the failed one is fetched.
+    FakeUpstream.broken.clear()
+    FakeUpstream.requests = []
+    stats = asyncio.run(_backfill(upstream, repo, checkpoint).run(["London", "Paris", "Oslo"], start, end))
+    assert stats == {"windows": 3, "days": 25, "skipped": 2, "failed": 0}
+    archive = [p for path, p in FakeUpstream.requests if path == "/v1/archive"]
+    assert {p["latitude"] for p in archive} == {"59.91"}
+    assert json.loads(checkpoint.read_text())["Oslo"] == "2024-01-25"
@@ -0,0 +1,80 @@
+import os
+
+from models.city import City
+from utils.city_index import CityIndex, normalize_name
+
+
+def _index():
+    index = CityIndex()
+    index.add(City("London", "GB", 51.51, -0.13, population=8_961_989))
+    index.add(City("London", "CA", 42.98, -81.23, population=422_324))
+    index.add(City("Londrina", "BR", -23.31, -51.16, population=575_377))
+    index.add(City("Lomé", "TG", 6.13, 1.22, population=837_437))
+    index.add(City("São Paulo", "BR", -23.55, -46.63, population=12_325_232))
+    return index
+
+
+def test_normalize_name_strips_case_and_accents():
+    assert normalize_name("  São PAULO ") == "sao paulo"
+
+
+def test_search_ranks_matches_by_population():
+    names = [(c.name, c.country) for c in _index().search("lon", 10)]
+    assert names == [("London", "GB"), ("Londrina", "BR"), ("London", "CA")]
+
+
+def test_search_is_accent_insensitive_and_limited():
+    index = _index()
+    assert [c.name for c in index.search("sao p")] == ["São Paulo"]
+    assert [c.name for c in index.search("lo", 2)] == ["London", "Lomé"]
+    assert index.search("xyz") == []
+
+
+def test_popularity_promotes_requested_cities():
+    index = _index()
+    assert index.lookup("London").country == "GB"
+    ontario = next(c for c in index.search("london") if c.country == "CA")
+    for _ in range(1000):
+        index.record_request(ontario)
+    assert index.search("londo")[0].country == "CA"
+    assert index.lookup("london").country == "CA"
+
+
+def test_add_updates_incrementally_and_dedupes():
+    index = _index()
+    index.add(City("Londonderry", "GB", 55.0, -7.32, population=85_016))
+    index.add(City("London", "GB", 51.51, -0.13, population=9_000_000))
+    assert len(index) == 6
+    assert [c.name for c in index.search("londond")] == ["Londonderry"]
+    assert index.lookup("LONDON").population == 9_000_000
+
+
+def test_load_csv(tmp_path):
+    path = os.path.join(tmp_path, "cities.csv")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("name,country,admin1,latitude,longitude,population\n")
+        f.write("Berlin,DE,Berlin,52.52,13.41,3426354\n")
+        f.write("Bern,CH,Bern,46.95,7.45,133115\n")
+        f.write("London,GB,England,51.51,-0.13,9000000\n")
+    index = _index()
+    # Memoized before the load; the swap must drop it.
+    assert index.search("be") == []
+    assert index.load_csv(path) == 3
+    assert len(index) == 7
+    assert [c.name for c in index.search("be")] == ["Berlin", "Bern"]
+    assert index.lookup("berlin").admin1 == "Berlin"
+    assert index.lookup("london").population == 9_000_000
+    assert index.nearest(46.9, 7.4).name == "Bern"
+    assert index._entries == sorted(index._entries)
+
+
+def test_search_scores_only_the_matching_slice(monkeypatch):
+    index = CityIndex()
+    index.add_many(City(f"City{i:05d}", "XX", i % 90, i % 180, population=i) for i in range(20_000))
+    scored = []
+    score = index._score
+    monkeypatch.setattr(index, "_score", lambda key: scored.append(key) or score(key))
+    result = index.search("city123", 10)
+    # Two binary searches find City12300..City12399; nothing outside them is ranked.
+    assert len(scored) == 100
+    assert [c.name for c in result] == [f"City{i:05d}" for i in range(12399, 12389, -1)]
@@ -0,0 +1,97 @@
+import asyncio
+
+import grpc
+import httpx
+import pytest
+
+from core import deadline
+from core.config import get_settings
+from db.mongo_client import max_time_ms
+from interceptors.deadline_interceptor import DeadlineInterceptor
+from services.open_meteo_client import OpenMeteoClient
+
+
+def test_scope_nests_and_caps_timeouts():
+    assert deadline.remaining() is None
+    assert deadline.timeout(10) == 10
+    with deadline.scope(5):
+        assert 4.9 < deadline.remaining() <= 5
+        # An inner scope cannot extend the outer deadline.
+        with deadline.scope(60):
+            assert deadline.remaining() <= 5
+        with deadline.scope(0.5):
+            assert deadline.timeout(10) <= 0.5
+            assert max_time_ms() <= 500
+    assert max_time_ms() == get_settings().MONGO_MAX_TIME_MS
+    with deadline.scope(0):
+        with pytest.raises(deadline.DeadlineExceeded):
+            deadline.timeout(10)
+
+
+def _client(handler):
+    return OpenMeteoClient(http=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+
+def test_upstream_timeout_follows_the_deadline():
+    timeouts = []
+
+    def handler(request):
+        timeouts.append(request.extensions["timeout"]["read"])
+        return httpx.Response(200, json={})
+
+    async def run():
+        with deadline.scope(0.3):
+            await _client(handler).get("https://api.test/v1/forecast", {})
+
+    asyncio.run(run())
+    assert 0 < timeouts[0] <= 0.3
+
+
+def test_request_that_cannot_finish_is_not_sent():
+    calls = []
+    client = _client(lambda request: calls.append(request) or httpx.Response(200))
+    client._latencies.extend([0.5] * 50)
+
+    async def run():
+        with deadline.scope(0.1):
+            await client.get("https://api.test/v1/forecast", {})
+
+    with pytest.raises(deadline.DeadlineExceeded):
+        asyncio.run(run())
+    assert calls == []
+
+
+def test_interceptor_sets_deadline_and_maps_exceeded():
+    seen = []
+
+    async def remaining(request, context):
+        seen.append(deadline.remaining())
+        return b""
+
+    async def too_slow(request, context):
+        raise deadline.DeadlineExceeded("no time left for Open-Meteo")
+
+    async def run():
+        server = grpc.aio.server(interceptors=[DeadlineInterceptor()])
+        server.add_generic_rpc_handlers((grpc.method_handlers_generic_handler("test.Deadline", {
+            "Remaining": grpc.unary_unary_rpc_method_handler(remaining),
+            "TooSlow": grpc.unary_unary_rpc_method_handler(too_slow),
+        }),))
+        port = server.add_insecure_port("127.0.0.1:0")
+        await server.start()
+        try:
+            async with grpc.aio.insecure_channel(f"127.0.0.1:{port}") as channel:
+                await channel.unary_unary("/test.Deadline/Remaining")(b"", timeout=2)
+                await channel.unary_unary("/test.Deadline/Remaining")(b"")
+                with pytest.raises(grpc.aio.AioRpcError) as err:
+                    await channel.unary_unary("/test.Deadline/TooSlow")(b"", timeout=30)
+                return err.value
+        finally:
+            await server.stop(0)
+
+    err = asyncio.run(run())
+    # The server derives its deadline from the grpc-timeout header, so allow for rounding.
+    assert 0 < seen[0] <= 2.1
+    assert seen[1] is None
+    assert err.code() == grpc.StatusCode.DEADLINE_EXCEEDED
+    assert "Open-Meteo" in err.details()
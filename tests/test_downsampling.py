@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from utils.downsampling import downsample, lttb, min_max, LTTB, MIN_MAX
+
+
+def _series(n=1000):
+    x = np.arange(n, dtype=np.float64)
+    y = np.sin(x / 25.0) * 10 + np.linspace(0, 5, n)
+    y[int(n * 0.437)] = 40.0  # a spike the downsampler must keep
+    return x, y
+
+
+def test_lttb_keeps_endpoints_and_spike():
+    x, y = _series()
+    idx = lttb(x, y, 100)
+    assert len(idx) == 100
+    assert idx[0] == 0 and idx[-1] == len(x) - 1
+    assert np.all(np.diff(idx) > 0)
+    assert 437 in idx
+
+
+def test_min_max_keeps_extremes():
+    x, y = _series()
+    idx = min_max(x, y, 100)
+    assert len(idx) <= 100
+    assert np.all(np.diff(idx) > 0)
+    assert int(np.argmax(y)) in idx
+    assert int(np.argmin(y)) in idx
+
+
+@pytest.mark.parametrize("method", [LTTB, MIN_MAX])
+def test_downsample_drops_nan_and_passes_short_series(method):
+    x, y = _series(50)
+    y[[3, 10]] = np.nan
+    idx = downsample(x, y, 100, method)
+    assert len(idx) == 48
+    assert not np.isnan(y[idx]).any()
+    assert len(downsample(x, y, 0, method)) == 48
+
+
+def test_downsample_rejects_unknown_method():
+    x, y = _series(10)
+    with pytest.raises(ValueError):
+        downsample(x, y, 5, "median")
@@ -0,0 +1,93 @@
+import asyncio
+import math
+
+import grpc
+import numpy as np
+
+from proto.generated import weather_pb2
+import weather_pb2_grpc
+from handlers.raw_bytes import add_servicer_to_server
+from handlers.weather_service_servicer import WeatherServiceServicer
+from services.weather_service import RECORD_VARIABLES
+
+
+class FakeWeather:
+    def __init__(self, gate=None):
+        self.gate = gate
+        self.requests = []
+
+    async def export(self, cities, start_date, end_date, chunk_days):
+        self.requests.append((cities, start_date, end_date, chunk_days))
+        if self.gate is not None:
+            await self.gate.wait()
+        days = np.array(["2025-01-01", "2025-01-02", "2025-01-03"], dtype="U10")
+        columns = {var: np.array([1.0, np.nan, 3.0]) for var in RECORD_VARIABLES}
+        for city in cities or ["London", "Paris"]:
+            for i in range(0, len(days), chunk_days):
+                yield city, days[i:i + chunk_days], {v: c[i:i + chunk_days] for v, c in columns.items()}
+
+
+async def _serve(servicer):
+    server = grpc.aio.server()
+    add_servicer_to_server(servicer, server, weather_pb2.DESCRIPTOR, "WeatherService")
+    port = server.add_insecure_port("127.0.0.1:0")
+    await server.start()
+    return server, port
+
+
+def test_export_streams_chunks_in_both_encodings():
+    async def run():
+        weather = FakeWeather()
+        server, port = await _serve(WeatherServiceServicer(weather))
+        try:
+            async with grpc.aio.insecure_channel(f"127.0.0.1:{port}") as channel:
+                stub = weather_pb2_grpc.WeatherServiceStub(channel)
+                records = [c async for c in stub.ExportWeather(weather_pb2.ExportRequest(
+                    start_date="2025-01-01", end_date="2025-01-03", chunk_days=2))]
+                packed = [c async for c in stub.ExportWeather(weather_pb2.ExportRequest(
+                    cities=["Oslo"], start_date="2025-01-01", end_date="2025-01-03",
+                    encoding=weather_pb2.PACKED_COLUMNS))]
+        finally:
+            await server.stop(0)
+        return weather, records, packed
+
+    weather, records, packed = asyncio.run(run())
+    assert [(c.city, len(c.records)) for c in records] == [("London", 2), ("London", 1), ("Paris", 2), ("Paris", 1)]
+    assert records[0].records[0].temperature_2m_max_c == 1.0
+    # Missing values are left unset.
+    assert records[0].records[1].temperature_2m_max_c == 0
+    assert len(packed) == 1
+    assert list(packed[0].dates) == ["2025-01-01", "2025-01-02", "2025-01-03"]
+    column = packed[0].columns[0]
+    assert column.variable == RECORD_VARIABLES[0]
+    assert column.values[0] == 1.0 and math.isnan(column.values[1])
+    assert weather.requests[0] == ([], "2025-01-01", "2025-01-03", 2)
+    assert weather.requests[1][3] == 366
+
+
+def test_export_rejects_when_budget_is_used():
+    async def run():
+        gate = asyncio.Event()
+        servicer = WeatherServiceServicer(FakeWeather(gate))
+        servicer.export_slots = asyncio.Semaphore(1)
+        server, port = await _serve(servicer)
+        try:
+            async with grpc.aio.insecure_channel(f"127.0.0.1:{port}") as channel:
+                stub = weather_pb2_grpc.WeatherServiceStub(channel)
+                request = weather_pb2.ExportRequest(start_date="2025-01-01", end_date="2025-01-03")
+                first = stub.ExportWeather(request)
+                await asyncio.sleep(0.1)
+                try:
+                    [c async for c in stub.ExportWeather(request)]
+                    rejected = None
+                except grpc.aio.AioRpcError as e:
+                    rejected = e.code()
+                gate.set()
+                completed = [c async for c in first]
+        finally:
+            await server.stop(0)
+        return rejected, completed
+
+    rejected, completed = asyncio.run(run())
+    assert rejected == grpc.StatusCode.RESOURCE_EXHAUSTED
+    assert len(completed) == 2
@@ -0,0 +1,49 @@
+import pytest
+
+from models.city import City
+from utils.geo_index import GeoIndex, haversine_km, snap_to_grid, validate_coordinates
+
+
+def test_haversine_london_paris():
+    assert haversine_km(51.5074, -0.1278, 48.8566, 2.3522) == pytest.approx(343.5, abs=1.0)
+
+
+def test_snap_to_grid_groups_nearby_points():
+    assert snap_to_grid(51.5074, -0.1278, 0.1) == (51.5, -0.1)
+    assert snap_to_grid(51.4812, -0.0712, 0.1) == (51.5, -0.1)
+    assert snap_to_grid(51.5074, -0.1278, 0.25) == (51.5, -0.25)
+    assert snap_to_grid(51.5074, -0.1278, 0) == (51.5074, -0.1278)
+    assert snap_to_grid(0.0, 179.99, 0.1) == snap_to_grid(0.0, -179.99, 0.1)
+
+
+@pytest.mark.parametrize("lat,lon", [(90.1, 0), (-91, 0), (0, 180.5), (0, -181)])
+def test_validate_coordinates_rejects_out_of_range(lat, lon):
+    with pytest.raises(ValueError):
+        validate_coordinates(lat, lon)
+
+
+def test_nearest_within_radius():
+    index = GeoIndex(cell_degrees=0.5)
+    index.add(City("London", "GB", 51.51, -0.13))
+    index.add(City("Croydon", "GB", 51.37, -0.10))
+    index.add(City("Paris", "FR", 48.86, 2.35))
+    assert index.nearest(51.50, -0.12).name == "London"
+    assert index.nearest(51.38, -0.09).name == "Croydon"
+    # Closest city across a bucket boundary is still found.
+    assert index.nearest(51.49, 0.01, max_km=50).name == "London"
+    assert index.nearest(50.0, -5.0, max_km=25) is None
+
+
+def test_nearest_across_antimeridian():
+    index = GeoIndex(cell_degrees=0.5)
+    index.add(City("Suva", "FJ", -18.14, 178.44))
+    index.add(City("Taveuni", "FJ", -16.80, -179.97))
+    assert index.nearest(-16.8, 179.95).name == "Taveuni"
+
+
+def test_add_moves_updated_city():
+    index = GeoIndex(cell_degrees=0.5)
+    city = City("Springfield", "US", 39.80, -89.64)
+    index.add(city)
+    index.add(City("Springfield", "US", 39.80, -89.64, population=1))
+    assert index.nearest(39.8, -89.64).population == 1
@@ -0,0 +1,50 @@
+import asyncio
+
+from grpc_health.v1 import health_pb2
+
+from core.health import HealthMonitor, OVERALL, SERVING, NOT_SERVING
+
+
+def _status(monitor, service):
+    return monitor.servicer._server_status.get(service)
+
+
+def test_health_monitor_gates_on_readiness_and_dependencies():
+    mongo_up = {"value": True}
+
+    async def mongo():
+        return mongo_up["value"]
+
+    async def upstream():
+        raise ConnectionError("unreachable")
+
+    async def run():
+        monitor = HealthMonitor(
+            probes={"mongo": mongo, "open-meteo": upstream},
+            dependencies={"user.UserService": ("mongo",), "weather.WeatherService": ("open-meteo",)},
+            local=("mongo",),
+            interval_seconds=3600,
+        )
+        await monitor.init()
+        await monitor.check()
+        # Probes pass, but nothing is SERVING before the server is marked ready.
+        assert _status(monitor, "user.UserService") == NOT_SERVING
+
+        await monitor.mark_ready()
+        assert _status(monitor, "user.UserService") == SERVING
+        assert _status(monitor, "weather.WeatherService") == NOT_SERVING
+        # The upstream being down does not make the server itself unready.
+        assert _status(monitor, OVERALL) == SERVING
+
+        mongo_up["value"] = False
+        await monitor.check()
+        assert _status(monitor, "user.UserService") == NOT_SERVING
+        assert _status(monitor, OVERALL) == NOT_SERVING
+
+        mongo_up["value"] = True
+        await monitor.shutdown()
+        await monitor.check()
+        assert _status(monitor, "user.UserService") == NOT_SERVING
+        assert _status(monitor, OVERALL) == health_pb2.HealthCheckResponse.NOT_SERVING
+
+    asyncio.run(run())
@@ -0,0 +1,162 @@
+import asyncio
+import gzip
+
+import httpx
+import pytest
+
+from core import deadline
+from core.config import get_settings
+from core.tiered_cache import MemoryBackend, SQLiteBackend, TieredCache
+from services.http_cache import CachingTransport, HttpResponseCodec, freshness_lifetime
+from services.open_meteo_client import OpenMeteoClient
+
+URL = "https://api.open-meteo.com/v1/forecast"
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _transport(handler, clock, tiers=None):
+    cache = TieredCache("t_http", tiers or [MemoryBackend(clock=clock)], HttpResponseCodec(), clock=clock)
+    return CachingTransport(httpx.MockTransport(handler), cache, stale_seconds=3600, clock=clock)
+
+
+def test_freshness_lifetime():
+    assert freshness_lifetime(httpx.Headers({"cache-control": "public, max-age=60, s-maxage=120"})) == 120
+    assert freshness_lifetime(httpx.Headers({"cache-control": "max-age=60, no-cache"})) == 0
+    assert freshness_lifetime(httpx.Headers({
+        "date": "Mon, 01 Jan 2024 12:00:00 GMT", "expires": "Mon, 01 Jan 2024 12:05:00 GMT",
+    })) == 300
+    assert freshness_lifetime(httpx.Headers({
+        "date": "Mon, 11 Jan 2024 00:00:00 GMT", "last-modified": "Mon, 01 Jan 2024 00:00:00 GMT",
+    })) == 86400
+    assert freshness_lifetime(httpx.Headers({})) == 0
+
+
+def test_fresh_responses_are_served_without_a_request(tmp_path):
+    clock = Clock()
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        body = gzip.compress(b'{"results": []}')
+        return httpx.Response(200, headers={"cache-control": "max-age=60", "content-encoding": "gzip"}, content=body)
+
+    async def run():
+        tiers = [SQLiteBackend(str(tmp_path / "http.sqlite3"), clock)]
+        async with httpx.AsyncClient(transport=_transport(handler, clock, tiers)) as client:
+            first = await client.get(URL, params={"latitude": 1, "longitude": 2})
+            clock.now += 30
+            # Same query in another order: same entry.
+            second = await client.get(URL, params={"longitude": 2, "latitude": 1})
+            clock.now += 31
+            third = await client.get(URL, params={"latitude": 1, "longitude": 2})
+            return first, second, third
+
+    first, second, third = asyncio.run(run())
+    assert len(calls) == 2
+    assert first.extensions["http_cache"] == "miss" and third.extensions["http_cache"] == "miss"
+    assert second.extensions["http_cache"] == "hit"
+    assert second.json() == {"results": []}
+    assert second.headers["age"] == "30"
+
+
+def test_stale_entries_are_revalidated_with_their_etag():
+    clock = Clock()
+    seen = []
+    version = {"etag": '"v1"', "body": b"first"}
+
+    def handler(request):
+        seen.append(request.headers.get("if-none-match"))
+        if request.headers.get("if-none-match") == version["etag"]:
+            return httpx.Response(304, headers={"etag": version["etag"], "cache-control": "max-age=10"})
+        return httpx.Response(200, headers={"etag": version["etag"], "cache-control": "max-age=0"},
+                              content=version["body"])
+
+    async def run():
+        async with httpx.AsyncClient(transport=_transport(handler, clock)) as client:
+            first = await client.get(URL)
+            revalidated = await client.get(URL)
+            # The 304 made the entry fresh for another 10 seconds.
+            fresh = await client.get(URL)
+            clock.now += 11
+            version.update(etag='"v2"', body=b"second")
+            changed = await client.get(URL)
+            return first, revalidated, fresh, changed
+
+    first, revalidated, fresh, changed = asyncio.run(run())
+    assert seen == [None, '"v1"', '"v1"']
+    assert revalidated.status_code == 200 and revalidated.content == b"first"
+    assert revalidated.extensions["http_cache"] == "revalidated"
+    assert fresh.extensions["http_cache"] == "hit"
+    assert changed.content == b"second" and changed.extensions["http_cache"] == "miss"
+
+
+def test_no_store_is_never_cached_and_hits_skip_upstream_latency():
+    clock = Clock()
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        cache_control = "no-store" if request.url.path == "/private" else "max-age=300"
+        return httpx.Response(200, headers={"cache-control": cache_control}, json={"ok": True})
+
+    settings = get_settings().model_copy(update={"OPEN_METEO_RETRIES": 0})
+    transport = _transport(handler, clock)
+    upstream = OpenMeteoClient(settings, http=httpx.AsyncClient(transport=transport), http_cache=transport)
+
+    async def run():
+        for _ in range(3):
+            await upstream.get("https://example.test/private", {})
+            await upstream.get("https://example.test/public", {})
+        await upstream.close()
+
+    asyncio.run(run())
+    assert calls == ["/private", "/public", "/private", "/private"]
+    assert len(upstream._latencies) == 4
+
+
+def test_fresh_hits_take_no_slot_and_ignore_the_deadline_precheck():
+    clock = Clock()
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(200, headers={"cache-control": "max-age=300"}, json={"ok": True})
+
+    settings = get_settings().model_copy(update={"OPEN_METEO_RETRIES": 0})
+    transport = _transport(handler, clock)
+    upstream = OpenMeteoClient(settings, http=httpx.AsyncClient(transport=transport), http_cache=transport)
+    upstream._latencies.extend([0.5] * 50)
+
+    async def run():
+        await upstream.get(URL, {"latitude": 1})
+        limit = upstream.limiter.limit
+        in_flight = []
+        acquire = upstream.limiter.acquire
+
+        async def counting_acquire(timeout=None):
+            in_flight.append(upstream.limiter.in_flight)
+            await acquire(timeout)
+
+        upstream.limiter.acquire = counting_acquire
+        # Less time left than a typical upstream answer, which a fresh entry does not need.
+        with deadline.scope(0.1):
+            hits = [await upstream.get(URL, {"latitude": 1}) for _ in range(50)]
+        # A miss is still held to it.
+        with deadline.scope(0.1), pytest.raises(deadline.DeadlineExceeded):
+            await upstream.get(URL, {"latitude": 2})
+        await upstream.close()
+        return hits, limit, in_flight
+
+    hits, limit, in_flight = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(r.extensions["http_cache"] == "hit" and r.json() == {"ok": True} for r in hits)
+    assert in_flight == []
+    assert upstream.limiter.limit == limit
+    assert upstream.limiter.in_flight == 0
@@ -0,0 +1,98 @@
+import asyncio
+
+import grpc
+
+from core.config import get_settings
+from interceptors.load_shed_interceptor import (
+    AUTH, BATCH, CRITICAL, INTERACTIVE, LoadShedInterceptor, method_priority,
+)
+
+
+class FakeMonitor:
+    lag = 0.0
+
+
+def _shedder(monitor=None, max_in_flight=4):
+    settings = get_settings().model_copy(update={
+        "LOAD_SHED_ENABLED": True,
+        "LOAD_SHED_MAX_IN_FLIGHT": max_in_flight,
+        "LOAD_SHED_MAX_LOOP_LAG_MS": 100,
+    })
+    return LoadShedInterceptor(settings, monitor)
+
+
+def test_method_priorities():
+    assert method_priority("/grpc.health.v1.Health/Check") == CRITICAL
+    assert method_priority("/user.UserService/Login") == AUTH
+    assert method_priority("/weather.WeatherService/ExportWeather") == BATCH
+    assert method_priority("/weather.WeatherService/GetWeather") == INTERACTIVE
+    assert method_priority("/other.Service/Call") == INTERACTIVE
+
+
+def test_loop_lag_sheds_lowest_priority_first():
+    monitor = FakeMonitor()
+    shedder = _shedder(monitor)
+    admitted = lambda: [p for p in (BATCH, INTERACTIVE, AUTH, CRITICAL) if shedder.admit(p)]
+    assert admitted() == [BATCH, INTERACTIVE, AUTH, CRITICAL]
+    monitor.lag = 0.06
+    assert admitted() == [INTERACTIVE, AUTH, CRITICAL]
+    monitor.lag = 0.12
+    assert admitted() == [AUTH, CRITICAL]
+    monitor.lag = 1.0
+    assert admitted() == [CRITICAL]
+
+
+def test_in_flight_calls_shed_export_but_not_health():
+    shedder = _shedder(max_in_flight=4)
+
+    async def run():
+        gate = asyncio.Event()
+
+        async def slow(request, context):
+            await gate.wait()
+            return b"weather"
+
+        async def export(request, context):
+            return b"export"
+
+        async def health(request, context):
+            return b"serving"
+
+        server = grpc.aio.server(interceptors=[shedder])
+        server.add_generic_rpc_handlers((
+            grpc.method_handlers_generic_handler("weather.WeatherService", {
+                "GetWeather": grpc.unary_unary_rpc_method_handler(slow),
+                "ExportWeather": grpc.unary_unary_rpc_method_handler(export),
+            }),
+            grpc.method_handlers_generic_handler("grpc.health.v1.Health", {
+                "Check": grpc.unary_unary_rpc_method_handler(health),
+            }),
+        ))
+        port = server.add_insecure_port("127.0.0.1:0")
+        await server.start()
+        try:
+            async with grpc.aio.insecure_channel(f"127.0.0.1:{port}") as channel:
+                weather = channel.unary_unary("/weather.WeatherService/GetWeather")
+                pending = [asyncio.ensure_future(weather(b"")) for _ in range(2)]
+                while shedder.in_flight < 2:
+                    await asyncio.sleep(0.01)
+                # Half the in-flight budget is used: exports are shed, health is not.
+                try:
+                    await channel.unary_unary("/weather.WeatherService/ExportWeather")(b"")
+                    export_code = grpc.StatusCode.OK
+                except grpc.aio.AioRpcError as e:
+                    export_code = e.code()
+                health_reply = await channel.unary_unary("/grpc.health.v1.Health/Check")(b"")
+                gate.set()
+                replies = await asyncio.gather(*pending)
+                after = await channel.unary_unary("/weather.WeatherService/ExportWeather")(b"")
+                return export_code, health_reply, replies, after
+        finally:
+            await server.stop(0)
+
+    export_code, health_reply, replies, after = asyncio.run(run())
+    assert export_code == grpc.StatusCode.RESOURCE_EXHAUSTED
+    assert health_reply == b"serving"
+    assert replies == [b"weather", b"weather"]
+    assert after == b"export"
+    assert shedder.in_flight == 0
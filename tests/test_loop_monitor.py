@@ -0,0 +1,52 @@
+import asyncio
+import time
+
+from core.loop_monitor import LoopLagMonitor, mark_rpc
+
+
+def block_the_loop(seconds):
+    time.sleep(seconds)
+
+
+def test_blocking_handler_is_reported_with_its_method_and_stack():
+    monitor = LoopLagMonitor(interval=0.01, block_threshold=0.05)
+
+    async def handler():
+        mark_rpc("/weather.WeatherService/GetWeather")
+        await asyncio.sleep(0.03)
+        block_the_loop(0.3)
+
+    async def well_behaved():
+        await asyncio.sleep(0.2)
+
+    async def run():
+        monitor.start()
+        await asyncio.sleep(0.05)
+        await well_behaved()
+        assert monitor.reports == []
+        await asyncio.create_task(handler())
+        await asyncio.sleep(0.05)
+        await monitor.close()
+
+    asyncio.run(run())
+    assert len(monitor.reports) == 1
+    report = monitor.reports[0]
+    assert report.method == "/weather.WeatherService/GetWeather"
+    assert report.blocked_seconds >= 0.05
+    assert "block_the_loop" in report.stack
+    assert monitor.lag_seconds.quantile(1.0) >= 0.25
+
+
+def test_lag_is_measured_without_the_watchdog():
+    monitor = LoopLagMonitor(interval=0.01)
+
+    async def run():
+        monitor.start()
+        await asyncio.sleep(0.03)
+        block_the_loop(0.1)
+        await asyncio.sleep(0.03)
+        await monitor.close()
+
+    asyncio.run(run())
+    assert monitor.lag_seconds.count > 0
+    assert monitor.reports == []
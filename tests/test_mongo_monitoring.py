@@ -0,0 +1,81 @@
+import asyncio
+import logging
+from types import SimpleNamespace
+
+from db.mongo_monitoring import CommandMonitor, explain_command, filter_shape, plan_summary
+
+FIND = {
+    "find": "weather",
+    "filter": {"city": "Cluj-Napoca", "date": {"$gte": "2024-01-01", "$lte": "2024-12-31"},
+               "$or": [{"source": "archive"}, {"source": "forecast"}], "tags": {"$in": ["a", "b", "c"]}},
+    "sort": {"date": 1},
+    "maxTimeMS": 5000,
+    "lsid": {"id": "session"},
+    "$db": "climatechart",
+}
+
+EXPLAIN = {
+    "queryPlanner": {
+        "winningPlan": {
+            "stage": "SORT",
+            "inputStage": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "city_1_date_1"}},
+        },
+    },
+}
+
+
+def _events(command, micros, request_id=1):
+    name = next(iter(command))
+    common = dict(command_name=name, request_id=request_id, connection_id=("mongo", 27017), database_name="climatechart")
+    return SimpleNamespace(command=command, **common), SimpleNamespace(duration_micros=micros, **common)
+
+
+def test_filter_shape_redacts_every_value():
+    shape = filter_shape(FIND["filter"])
+    assert shape == {
+        "city": "?",
+        "date": {"$gte": "?", "$lte": "?"},
+        "$or": [{"source": "?"}],
+        "tags": {"$in": ["?"]},
+    }
+    assert "Cluj" not in str(shape) and "2024" not in str(shape)
+
+
+def test_plan_summary_and_explain_command():
+    assert plan_summary(EXPLAIN) == "SORT <- FETCH <- IXSCAN(city_1_date_1)"
+    nested = {"stages": [{"$cursor": {"queryPlanner": {"winningPlan": {"stage": "COLLSCAN"}}}}]}
+    assert plan_summary(nested) == "COLLSCAN"
+    command = explain_command(FIND)
+    assert command["verbosity"] == "queryPlanner"
+    assert set(command["explain"]) == {"find", "filter", "sort"}
+
+
+def test_slow_read_is_logged_redacted_with_its_plan(caplog):
+    explained = []
+
+    async def explain(database, command):
+        explained.append((database, command))
+        return EXPLAIN
+
+    monitor = CommandMonitor(slow_ms=50, explain=explain)
+
+    async def run():
+        for request_id, micros in ((1, 2_000), (2, 80_000), (3, 90_000)):
+            started, succeeded = _events(FIND, micros, request_id)
+            monitor.started(started)
+            monitor.succeeded(succeeded)
+        await asyncio.gather(*monitor._tasks)
+
+    with caplog.at_level(logging.WARNING, logger="db.mongo_monitoring"):
+        asyncio.run(run())
+
+    timer = monitor._timer("weather", "find")
+    assert timer.count >= 3
+    slow = [r.getMessage() for r in caplog.records if r.getMessage().startswith("Slow Mongo find")]
+    assert len(slow) == 2
+    assert '"city": "?"' in slow[0] and "Cluj" not in slow[0]
+    # The same shape is explained once.
+    assert len(explained) == 1
+    plans = [r.getMessage() for r in caplog.records if r.getMessage().startswith("Plan of slow")]
+    assert plans and plans[0].endswith("SORT <- FETCH <- IXSCAN(city_1_date_1)")
+    assert monitor._pending == {}
@@ -0,0 +1,106 @@
+import asyncio
+
+import httpx
+import pytest
+
+from core.config import get_settings
+from services.open_meteo_client import OpenMeteoClient
+from utils.adaptive_limit import AdaptiveLimiter
+
+
+def _client(handler, **overrides):
+    settings = get_settings().model_copy(update={
+        "OPEN_METEO_RETRIES": 2,
+        "OPEN_METEO_RETRY_BASE_SECONDS": 0.001,
+        **overrides,
+    })
+    return OpenMeteoClient(settings, http=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+
+def test_limiter_grows_additively_and_halves_on_failure():
+    limiter = AdaptiveLimiter(initial=4, min_limit=1, max_limit=8, latency_target=1.0)
+
+    async def run():
+        for _ in range(4):
+            async with limiter.slot():
+                pass
+        grown = limiter.limit
+        async with limiter.slot() as slot:
+            slot.failed()
+        return grown, limiter.limit
+
+    grown, shrunk = asyncio.run(run())
+    assert 4.9 < grown < 5.0
+    assert shrunk == pytest.approx(grown / 2)
+    assert limiter.in_flight == 0
+
+
+def test_limiter_caps_in_flight_calls():
+    limiter = AdaptiveLimiter(initial=2, max_limit=2)
+    peak = 0
+
+    async def call():
+        nonlocal peak
+        async with limiter.slot():
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0.01)
+
+    async def run():
+        await asyncio.gather(*(call() for _ in range(10)))
+
+    asyncio.run(run())
+    assert peak == 2 and limiter.in_flight == 0
+    assert limiter.try_acquire() and limiter.in_flight == 1
+
+
+def test_retries_overload_statuses_then_succeeds():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) < 3:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"results": []})
+
+    client = _client(handler)
+    response = asyncio.run(client.get("https://geo.test/v1/search", {"name": "Oslo"}))
+    assert response.json() == {"results": []}
+    assert len(calls) == 3
+    # Each 503 halved the limit.
+    assert client.limiter.limit < get_settings().OPEN_METEO_CONCURRENCY_INITIAL
+
+
+def test_bad_request_is_not_retried():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(400, json={"error": True, "reason": "Cannot initialize WeatherVariable"})
+
+    with pytest.raises(ValueError, match="WeatherVariable"):
+        asyncio.run(_client(handler).get("https://api.test/v1/forecast", {"daily": "nope"}))
+    assert len(calls) == 1
+
+
+def test_slow_request_is_hedged_and_first_answer_wins():
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        # The first copy hits a slow replica; the hedge does not.
+        await asyncio.sleep(1.0 if len(calls) == 1 else 0.001)
+        return httpx.Response(200, json={"copy": len(calls)})
+
+    client = _client(handler, OPEN_METEO_HEDGE_ENABLED=True)
+    client._latencies.extend([0.01] * 50)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        response = await client.get("https://api.test/v1/forecast", {})
+        return response, loop.time() - start
+
+    response, elapsed = asyncio.run(run())
+    assert response.json() == {"copy": 2}
+    assert elapsed < 0.5
+    assert client.limiter.in_flight == 0
@@ -0,0 +1,93 @@
+import asyncio
+import marshal
+import time
+
+import grpc
+
+from core import profiler
+from core.config import get_settings
+from core.loop_monitor import mark_rpc
+from handlers.admin_servicer import AdminServiceServicer
+from proto.generated import admin_pb2, admin_pb2_grpc
+
+WEATHER = "/weather.WeatherService/GetWeather"
+
+
+def crunch_numbers(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+async def busy_handler():
+    mark_rpc(WEATHER)
+    for _ in range(20):
+        crunch_numbers(0.01)
+        await asyncio.sleep(0.005)
+
+
+async def idle_handler():
+    mark_rpc("/user.UserService/GetMe")
+    await asyncio.sleep(0.3)
+
+
+def _profile(mode):
+    async def run():
+        work = [asyncio.create_task(busy_handler()), asyncio.create_task(idle_handler())]
+        result = await profiler.sample(0.25, 0.002, mode)
+        await asyncio.gather(*work)
+        return result
+
+    return asyncio.run(run())
+
+
+def test_wall_samples_are_rooted_at_the_rpc_method():
+    result = _profile(profiler.WALL)
+    assert result.samples > 0
+    assert result.by_method[WEATHER] > 0
+    busy = [line for line in result.collapsed().splitlines() if line.startswith(WEATHER + ";")]
+    assert any("crunch_numbers" in line for line in busy)
+    stack, count = busy[0].rsplit(" ", 1)
+    assert int(count) > 0
+
+
+def test_cpu_samples_ignore_waiting_methods():
+    result = _profile(profiler.CPU)
+    assert result.by_method[WEATHER] > 0
+    # The idle handler never runs long enough on the loop to be caught using CPU.
+    assert result.by_method[WEATHER] > result.by_method.get("/user.UserService/GetMe", 0)
+
+
+def test_admin_profile_requires_the_admin_key_and_a_valid_interval():
+    settings = get_settings().model_copy(update={"ADMIN_API_KEY": "s3cret"})
+
+    async def run():
+        server = grpc.aio.server()
+        admin_pb2_grpc.add_AdminServiceServicer_to_server(AdminServiceServicer(settings), server)
+        port = server.add_insecure_port("127.0.0.1:0")
+        await server.start()
+        try:
+            async with grpc.aio.insecure_channel(f"127.0.0.1:{port}") as channel:
+                stub = admin_pb2_grpc.AdminServiceStub(channel)
+                request = admin_pb2.ProfileRequest(seconds=1, mode=admin_pb2.CPROFILE)
+                try:
+                    await stub.Profile(request, metadata=(("x-admin-key", "wrong"),))
+                    denied = grpc.StatusCode.OK
+                except grpc.aio.AioRpcError as e:
+                    denied = e.code()
+                spinning = admin_pb2.ProfileRequest(seconds=1, mode=admin_pb2.WALL, interval_ms=-1)
+                try:
+                    await stub.Profile(spinning, metadata=(("x-admin-key", "s3cret"),))
+                    rejected = grpc.StatusCode.OK
+                except grpc.aio.AioRpcError as e:
+                    rejected = e.code()
+                reply = await stub.Profile(request, metadata=(("x-admin-key", "s3cret"),))
+                return denied, rejected, reply
+        finally:
+            await server.stop(0)
+
+    denied, rejected, reply = asyncio.run(run())
+    assert denied == grpc.StatusCode.UNAUTHENTICATED
+    assert rejected == grpc.StatusCode.INVALID_ARGUMENT
+    assert reply.mode == admin_pb2.CPROFILE
+    assert isinstance(marshal.loads(reply.data), dict)
@@ -0,0 +1,125 @@
+import asyncio
+from datetime import datetime, timezone
+
+import grpc
+
+from core.config import get_settings
+from interceptors.auth_interceptor import AuthInterceptor
+from interceptors.rate_limit_interceptor import RateLimitInterceptor
+from models.api_key_info import ApiKeyInfo
+from services.token_service import TokenService
+from services.usage_service import UsageService
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeUsageRepo:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.batches = []
+
+    async def ensure_indexes(self):
+        pass
+
+    async def increment(self, counts):
+        if self.fail:
+            return None
+        self.batches.append(counts)
+        return True
+
+
+class FakeKeys:
+    """Authenticates any key; its tier is the part before the first dash."""
+
+    async def authenticate(self, value):
+        return ApiKeyInfo("ada@example.com", prefix=value[:8], digest=value, tier=value.split("-")[0])
+
+
+def _settings():
+    settings = get_settings().model_copy()
+    settings.API_KEY_METHODS = {"/test.Echo/Ping"}
+    settings.RATE_LIMIT_TIERS = {"free": (60.0, 2.0), "pro": (0.0, 0.0)}
+    settings.DEFAULT_API_KEY_TIER = "free"
+    return settings
+
+
+def _usage(repo):
+    return UsageService(repo, flush_interval=3600, clock=lambda: datetime(2026, 1, 2, tzinfo=timezone.utc))
+
+
+def test_bucket_per_key_and_tier():
+    clock = FakeClock()
+    limiter = RateLimitInterceptor(None, _settings(), clock=clock)
+    free = ApiKeyInfo("a", digest="a", tier="free")
+    other = ApiKeyInfo("b", digest="b", tier="")
+    pro = ApiKeyInfo("c", digest="c", tier="pro")
+    assert limiter.check(free) == 0 and limiter.check(free) == 0
+    assert limiter.check(free) == 1.0
+    # Keys have separate buckets; an empty tier uses the default.
+    assert limiter.check(other) == 0 and limiter.check(other) == 0 and limiter.check(other) > 0
+    # A zero rate is unlimited.
+    assert all(limiter.check(pro) == 0 for _ in range(100))
+    clock.now += 1.0
+    assert limiter.check(free) == 0
+
+
+def test_over_limit_calls_fail_fast_with_retry_after():
+    repo = FakeUsageRepo()
+    usage = _usage(repo)
+    settings = _settings()
+
+    async def ping(request, context):
+        return b"pong"
+
+    async def run():
+        server = grpc.aio.server(interceptors=[
+            AuthInterceptor(FakeKeys(), settings, TokenService(keys={"k": "k" * 32})),
+            RateLimitInterceptor(usage, settings, clock=FakeClock()),
+        ])
+        server.add_generic_rpc_handlers((grpc.method_handlers_generic_handler(
+            "test.Echo", {"Ping": grpc.unary_unary_rpc_method_handler(ping)}),))
+        port = server.add_insecure_port("127.0.0.1:0")
+        await server.start()
+        results = []
+        try:
+            async with grpc.aio.insecure_channel(f"127.0.0.1:{port}") as channel:
+                call = channel.unary_unary("/test.Echo/Ping")
+                for _ in range(3):
+                    try:
+                        await call(b"", metadata=[("x-api-key", "free-key")])
+                        results.append((grpc.StatusCode.OK, None))
+                    except grpc.aio.AioRpcError as e:
+                        results.append((e.code(), e.trailing_metadata().get("retry-after")))
+        finally:
+            await server.stop(0)
+        return results
+
+    results = asyncio.run(run())
+    assert results == [(grpc.StatusCode.OK, None), (grpc.StatusCode.OK, None),
+                       (grpc.StatusCode.RESOURCE_EXHAUSTED, "1")]
+    # Only accepted calls count as usage.
+    assert usage.pending("free-key") == 2
+
+
+def test_usage_is_flushed_as_one_batch_and_kept_on_failure():
+    repo = FakeUsageRepo(fail=True)
+    usage = _usage(repo)
+
+    async def run():
+        for _ in range(3):
+            usage.record("a")
+        usage.record("b")
+        assert await usage.flush() == 0
+        usage.record("a")
+        repo.fail = False
+        assert await usage.flush() == 2
+        assert await usage.flush() == 0
+
+    asyncio.run(run())
+    assert repo.batches == [{("a", "2026-01-02"): 4, ("b", "2026-01-02"): 1}]
@@ -0,0 +1,147 @@
+import asyncio
+import time
+
+import numpy as np
+
+from core.tiered_cache import JsonCodec, MemoryBackend, RedisBackend, SQLiteBackend, TieredCache
+from services.weather_service import ForecastEntry, HourlyForecast, RECORD_VARIABLES
+from utils.resp_client import RespClient, encode_command, read_reply
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRedis:
+    """Just enough of a Redis server for the cache: GET, SET with PX, PTTL, DEL."""
+
+    def __init__(self):
+        self.data = {}
+        self.commands = []
+
+    async def handle(self, reader, writer):
+        while True:
+            try:
+                args = await read_reply(reader)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                break
+            name = args[0].decode().upper()
+            self.commands.append(name)
+            key = args[1].decode() if len(args) > 1 else None
+            entry = self.data.get(key)
+            if entry and entry[1] is not None and entry[1] <= time.monotonic():
+                del self.data[key]
+                entry = None
+            if name == "GET":
+                reply = b"$-1\r\n" if entry is None else b"$%d\r\n%s\r\n" % (len(entry[0]), entry[0])
+            elif name == "PTTL":
+                reply = b":%d\r\n" % (-2 if entry is None else int((entry[1] - time.monotonic()) * 1000))
+            elif name == "SET":
+                expires = time.monotonic() + int(args[4]) / 1000 if len(args) > 4 else None
+                self.data[key] = (args[2], expires)
+                reply = b"+OK\r\n"
+            elif name == "DEL":
+                reply = b":%d\r\n" % (self.data.pop(key, None) is not None)
+            else:
+                reply = b"-ERR unknown command\r\n"
+            writer.write(reply)
+            await writer.drain()
+        writer.close()
+
+
+def test_lower_tier_hit_fills_memory_with_the_same_expiry(tmp_path):
+    clock = Clock()
+    path = str(tmp_path / "cache.sqlite3")
+
+    def cache(memory):
+        return TieredCache("t_sqlite", [memory, SQLiteBackend(path, clock)], ttl_seconds=60, clock=clock)
+
+    async def run():
+        first = cache(MemoryBackend(clock=clock))
+        await first.init()
+        await first.set("k", {"city": "Cluj"})
+        await first.close()
+
+        # A new process: empty memory, same file.
+        memory = MemoryBackend(clock=clock)
+        second = cache(memory)
+        assert await second.get("k") == {"city": "Cluj"}
+        assert memory._entries["t_sqlite:k"][1] == clock.now + 60
+        clock.now += 30
+        assert await second.get("k") == {"city": "Cluj"}
+        clock.now += 31
+        assert await second.get("k") is None
+        stats = second.stats()
+        await second.close()
+        return stats
+
+    stats = asyncio.run(run())
+    assert stats["hits"]["sqlite"] >= 1 and stats["hits"]["memory"] >= 1
+    assert stats["misses"] >= 1
+
+
+def test_redis_backend_against_a_local_stand_in():
+    fake = FakeRedis()
+
+    async def run():
+        server = await asyncio.start_server(fake.handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        backend = RedisBackend(RespClient(f"redis://127.0.0.1:{port}/0"))
+        cache = TieredCache("t_redis", [backend], ttl_seconds=60)
+        await cache.set("k", [1, 2, 3])
+        value = await cache.get("k")
+        expires_at = (await backend.get("t_redis:k"))[1]
+        await cache.delete("k")
+        gone = await cache.get("k")
+        await cache.close()
+        server.close()
+        await server.wait_closed()
+        return value, expires_at, gone
+
+    value, expires_at, gone = asyncio.run(run())
+    assert value == [1, 2, 3]
+    assert 55 < expires_at - time.time() <= 60
+    assert gone is None
+    # GET and PTTL go out in one pipeline per lookup.
+    assert fake.commands[:3] == ["SET", "GET", "PTTL"]
+
+
+def test_unreachable_tier_is_a_miss_not_an_error():
+    async def run():
+        client = RespClient("redis://127.0.0.1:1/0", timeout=0.2)
+        cache = TieredCache("t_down", [MemoryBackend(), RedisBackend(client)], ttl_seconds=60)
+        await cache.set("k", "v")
+        hit = await cache.get("k")
+        await cache.delete("k")
+        miss = await cache.get("k")
+        return hit, miss, cache.stats()
+
+    hit, miss, stats = asyncio.run(run())
+    assert hit == "v"
+    assert miss is None
+    assert stats["errors"]["redis"] >= 2
+
+
+def test_forecast_codecs_round_trip():
+    records = {f"2025-01-{i:02d}": {v: float(i) for v in RECORD_VARIABLES} for i in range(1, 15)}
+    codec = JsonCodec(ForecastEntry.to_dict, ForecastEntry.from_dict)
+    entry = codec.decode(codec.encode(ForecastEntry(RECORD_VARIABLES, 7, 7, records)))
+    assert entry.covers(RECORD_VARIABLES, 7, 7)
+    assert list(entry.records) == list(records)
+    assert entry.select(("temperature_2m_max_c",), 1, 1) == {"2025-01-07": {"temperature_2m_max_c": 7.0},
+                                                              "2025-01-08": {"temperature_2m_max_c": 8.0}}
+
+    codec = JsonCodec(HourlyForecast.to_dict, HourlyForecast.from_dict)
+    hourly = HourlyForecast(1735689600, 3600, 7200, 3, {"temperature_2m_c": np.array([1.5, np.nan, 3.0], np.float32)})
+    decoded = codec.decode(codec.encode(hourly))
+    assert decoded.utc_offset_seconds == 7200
+    assert decoded.columns["temperature_2m_c"].dtype == np.float32
+    np.testing.assert_array_equal(decoded.columns["temperature_2m_c"], hourly.columns["temperature_2m_c"])
+
+
+def test_resp_encoding():
+    assert encode_command(("SET", "k", b"v", "PX", 1000)) == b"*5\r\n$3\r\nSET\r\n$1\r\nk\r\n$1\r\nv\r\n$2\r\nPX\r\n$4\r\n1000\r\n"
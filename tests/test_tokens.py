@@ -0,0 +1,102 @@
+import asyncio
+import time
+
+import grpc
+import jwt
+import pytest
+
+from core.config import Settings, get_settings
+from handlers.user_service_servicer import UserServiceServicer
+from interceptors.auth_interceptor import AuthInterceptor
+from models.user import User
+from proto.generated import user_pb2
+import user_pb2_grpc
+from services.token_service import InvalidToken, TokenService
+
+K1 = "first-signing-key-0123456789abcdef"
+K2 = "second-signing-key-0123456789abcdef"
+USER = User("u1", "Ada", "ada@example.com", "hash", email_verified=True)
+
+
+def _tokens(keys=None, active=None, ttl=900):
+    return TokenService(keys=keys or {"k1": K1}, active_kid=active, ttl_seconds=ttl)
+
+
+def test_issue_and_verify_round_trip():
+    tokens = _tokens()
+    token, expires_at = tokens.issue(USER)
+    claims = tokens.verify(token)
+    assert claims["sub"] == "u1"
+    assert claims["email"] == "ada@example.com"
+    assert claims["email_verified"] is True
+    assert expires_at == claims["exp"]
+    assert jwt.get_unverified_header(token)["kid"] == "k1"
+
+
+def test_rotation_accepts_old_key_and_signs_with_active():
+    old = _tokens({"k1": K1})
+    old_token, _ = old.issue(USER)
+    rotated = _tokens({"k1": K1, "k2": K2}, active="k2")
+    assert rotated.verify(old_token)["sub"] == "u1"
+    assert jwt.get_unverified_header(rotated.issue(USER)[0])["kid"] == "k2"
+    # Once k1 is retired its tokens stop working.
+    with pytest.raises(InvalidToken):
+        _tokens({"k2": K2}).verify(old_token)
+
+
+def test_rejects_tampered_expired_and_foreign_tokens():
+    tokens = _tokens()
+    token, _ = tokens.issue(USER)
+    header, payload, signature = token.split(".")
+    with pytest.raises(InvalidToken):
+        tokens.verify(f"{header}.{payload}.{signature[::-1]}")
+    with pytest.raises(InvalidToken):
+        _tokens({"k1": "o" * 32}).verify(token)
+    expired = jwt.encode({"sub": "u1", "iss": tokens.issuer, "iat": 0, "exp": int(time.time()) - 1},
+                         K1, algorithm="HS256", headers={"kid": "k1"})
+    with pytest.raises(InvalidToken, match="expired"):
+        tokens.verify(expired)
+    with pytest.raises(InvalidToken):
+        tokens.verify("not-a-token")
+
+
+def test_settings_parse_signing_keys():
+    settings = Settings(TOKEN_SIGNING_KEYS="old:abc, new:d:e", TOKEN_ACTIVE_KID="new")
+    assert settings.TOKEN_SIGNING_KEYS == {"old": "abc", "new": "d:e"}
+
+
+class NoDatabase:
+    """Any attribute access is a database call the token path must not make."""
+
+    def __getattr__(self, name):
+        raise AssertionError(f"database used: {name}")
+
+
+def test_get_me_is_answered_from_token_without_database():
+    tokens = _tokens()
+    token, _ = tokens.issue(USER)
+
+    async def run():
+        settings = get_settings()
+        server = grpc.aio.server(interceptors=[AuthInterceptor(NoDatabase(), settings, tokens)])
+        user_pb2_grpc.add_UserServiceServicer_to_server(
+            UserServiceServicer(NoDatabase(), NoDatabase(), NoDatabase(), tokens), server
+        )
+        port = server.add_insecure_port("127.0.0.1:0")
+        await server.start()
+        try:
+            async with grpc.aio.insecure_channel(f"127.0.0.1:{port}") as channel:
+                stub = user_pb2_grpc.UserServiceStub(channel)
+                me = await stub.GetMe(user_pb2.GetMeRequest(), metadata=[("authorization", f"Bearer {token}")])
+                try:
+                    await stub.GetMe(user_pb2.GetMeRequest(), metadata=[("authorization", "Bearer forged")])
+                    code = None
+                except grpc.aio.AioRpcError as e:
+                    code = e.code()
+        finally:
+            await server.stop(0)
+        return me, code
+
+    me, code = asyncio.run(run())
+    assert (me.user_id, me.name, me.email, me.email_verified) == ("u1", "Ada", "ada@example.com", True)
+    assert code == grpc.StatusCode.UNAUTHENTICATED
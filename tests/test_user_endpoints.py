@@ -35,6 +35,20 @@ async def test_login():
         login_data = resp.json()
         assert "userId" in login_data or "apiKey" in login_data or "token" in login_data
 
+@pytest.mark.asyncio
+async def test_get_me_with_access_token():
+    user = UserFactory.build()
+    async with httpx.AsyncClient() as client:
+        await client.post(f"{BASE_URL}/sign-up", json={"name": user["name"], "email": user["email"], "password": user["password"]})
+        login = await client.post(f"{BASE_URL}/login", json={"email": user["email"], "password": user["password"]})
+        token = login.json()["accessToken"]
+        resp = await client.get(f"{BASE_URL}/me", headers={"authorization": f"Bearer {token}"})
+        print("GetMe status:", resp.status_code)
+        assert resp.status_code == 200
+        assert resp.json()["email"] == user["email"].lower()
+        resp = await client.get(f"{BASE_URL}/me", headers={"authorization": "Bearer invalid"})
+        assert resp.status_code == 401
+
 @pytest.mark.asyncio
 async def test_send_verification_email():
     user = UserFactory.build()
@@ -81,4 +95,5 @@ async def test_get_api_key():
             if resp.text:
                 data = resp.json()
                 print("API Key response json:", data)
-                assert "value" in data or "apiKey" in data or "key" in data
+                # Keys are stored hashed, so only the prefix comes back after creation.
+                assert "prefix" in data or "key" in data
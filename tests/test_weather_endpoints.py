@@ -62,3 +62,107 @@ async def test_get_weather_external_api_error():
             print("External API error body:", resp.text)
             assert resp.status_code == 503 or resp.status_code == 500
             assert "error" in resp.text.lower()
+
+@pytest.mark.asyncio
+async def test_get_weather_history_downsampled():
+    city = "London"
+    async with httpx.AsyncClient() as client:
+        resp = await client.get(f"{BASE_URL}/{city}/history", params={"startDate": "2020-01-01", "maxPoints": 50})
+        print("History status:", resp.status_code)
+        print("History body:", resp.text)
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["city"].lower() == city.lower()
+        for series in data["series"]:
+            assert len(series["dates"]) == len(series["values"])
+            assert len(series["values"]) <= 50
+
+@pytest.mark.asyncio
+async def test_get_weather_not_modified():
+    city = "London"
+    async with httpx.AsyncClient() as client:
+        first = await client.get(f"{BASE_URL}/{city}")
+        assert first.status_code == 200
+        version = first.json()["version"]
+        assert version
+        resp = await client.get(f"{BASE_URL}/{city}", params={"ifNoneMatch": version})
+        print("Not modified status:", resp.status_code)
+        print("Not modified body:", resp.text)
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["notModified"] is True
+        assert data["version"] == version
+        assert data["records"] == []
+
+@pytest.mark.asyncio
+async def test_get_weather_selected_variables_and_horizon():
+    city = "London"
+    async with httpx.AsyncClient() as client:
+        resp = await client.get(
+            f"{BASE_URL}/{city}",
+            params={"variables": "temperature_2m_max_c", "pastDays": 2, "forecastDays": 3},
+        )
+        print("Selected variables status:", resp.status_code)
+        print("Selected variables body:", resp.text)
+        assert resp.status_code == 200
+        records = resp.json()["records"]
+        assert len(records) == 5
+        assert all(r["precipitationSumMm"] == 0 for r in records)
+
+@pytest.mark.asyncio
+async def test_get_weather_unknown_variable():
+    async with httpx.AsyncClient() as client:
+        resp = await client.get(f"{BASE_URL}/London", params={"variables": "snowfall"})
+        assert resp.status_code == 400
+
+@pytest.mark.asyncio
+async def test_get_hourly_forecast_columnar():
+    city = "London"
+    async with httpx.AsyncClient() as client:
+        resp = await client.get(f"{BASE_URL}/{city}/hourly", params={"hours": 72, "variables": "temperature_2m_c"})
+        print("Hourly status:", resp.status_code)
+        print("Hourly body:", resp.text[:500])
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["intervalSeconds"] == 3600
+        assert data["count"] == 72
+        assert len(data["temperature2mC"]) == 72
+        assert data["precipitationMm"] == []
+
+@pytest.mark.asyncio
+async def test_autocomplete_city():
+    async with httpx.AsyncClient() as client:
+        await client.get(f"{BASE_URL}/London")
+        resp = await client.get("http://localhost:8089/v1/cities/autocomplete", params={"prefix": "lond", "limit": 5})
+        print("Autocomplete status:", resp.status_code)
+        print("Autocomplete body:", resp.text)
+        assert resp.status_code == 200
+        suggestions = resp.json()["suggestions"]
+        assert 0 < len(suggestions) <= 5
+        assert all(s["name"].lower().startswith("lond") for s in suggestions)
+
+@pytest.mark.asyncio
+async def test_get_weather_by_coordinates_shares_grid_point():
+    async with httpx.AsyncClient() as client:
+        first = await client.get("http://localhost:8089/v1/weather-at", params={"latitude": 51.5074, "longitude": -0.1278})
+        second = await client.get("http://localhost:8089/v1/weather-at", params={"latitude": 51.4812, "longitude": -0.0712})
+        print("Coordinates status:", first.status_code, second.status_code)
+        assert first.status_code == 200 and second.status_code == 200
+        assert first.json()["version"] == second.json()["version"]
+        assert first.json()["latitude"] == 51.5
+        resp = await client.get("http://localhost:8089/v1/weather-at", params={"latitude": 95, "longitude": 0})
+        assert resp.status_code == 400
+
+@pytest.mark.asyncio
+async def test_export_weather_packed_columns():
+    async with httpx.AsyncClient() as client:
+        await client.get(f"{BASE_URL}/London")
+        resp = await client.post(
+            f"{BASE_URL}/export",
+            json={"cities": ["London"], "encoding": "PACKED_COLUMNS", "chunkDays": 30},
+        )
+        print("Export status:", resp.status_code)
+        assert resp.status_code == 200
+        chunks = resp.json()
+        assert all(c["city"] == "London" for c in chunks)
+        assert all(len(col["values"]) == len(c["dates"]) for c in chunks for col in c["columns"])
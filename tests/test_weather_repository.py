@@ -0,0 +1,137 @@
+"""Streaming reads against a local MongoDB (DB_URL); skipped when none is reachable."""
+import asyncio
+import os
+import tracemalloc
+
+import pytest
+from pymongo import AsyncMongoClient
+
+from db import mongo_client
+from repositories.weather_repository import WeatherRepository
+
+COLLECTION = "weather_stream_test"
+DOCS = 20_000
+
+
+def _doc(i):
+    city = f"city-{i % 20:02d}"
+    day = f"2024-{(i // 20) % 12 + 1:02d}-{(i // 240) % 28 + 1:02d}-{i // 6720}"
+    records = {f"d{k}": {"temperature_2m_max_c": float(k), "precipitation_sum_mm": 0.1 * k} for k in range(14)}
+    return {"city": city, "date": day, "fetch_date": day, "records": records}
+
+
+async def _mongo_available():
+    client = AsyncMongoClient(os.environ["DB_URL"], serverSelectionTimeoutMS=500)
+    try:
+        await client.admin.command("ping")
+        return True
+    except Exception:
+        return False
+    finally:
+        await client.close()
+
+
+def test_stream_is_memory_bounded_and_resumable():
+    async def run():
+        if not await _mongo_available():
+            pytest.skip("MongoDB is not reachable")
+        repo = WeatherRepository(COLLECTION)
+        collection = await mongo_client.get_collection(COLLECTION)
+        try:
+            await collection.drop()
+            await repo.ensure_indexes()
+            for start in range(0, DOCS, 2000):
+                await collection.insert_many([_doc(i) for i in range(start, start + 2000)])
+
+            tracemalloc.start()
+            everything = await repo.find({})
+            _, list_peak = tracemalloc.get_traced_memory()
+            del everything
+            tracemalloc.stop()
+
+            tracemalloc.start()
+            count = 0
+            async for doc in repo.stream({}, batch_size=200, raw=True):
+                count += 1
+            _, stream_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            assert count == DOCS
+            assert stream_peak * 10 < list_peak
+
+            # Keyset pages cover every document exactly once, in (city, date) order.
+            seen, after = [], None
+            while True:
+                page = [d async for d in repo.stream(projection={"_id": 0, "city": 1, "date": 1},
+                                                     after=after, limit=3000)]
+                if not page:
+                    break
+                assert set(page[0]) == {"city", "date"}
+                seen.extend((d["city"], d["date"]) for d in page)
+                after = seen[-1]
+            assert len(seen) == DOCS
+            assert seen == sorted(seen)
+        finally:
+            await collection.drop()
+            await mongo_client.close_client()
+
+    asyncio.run(run())
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __aiter__(self):
+        return self._iter()
+
+    async def _iter(self):
+        for doc in self.docs:
+            yield doc
+
+
+class FakeCollection:
+    def __init__(self):
+        self.calls = []
+        self.codec_options = None
+
+    def with_options(self, codec_options):
+        self.codec_options = codec_options
+        return self
+
+    def find(self, query, projection, **kwargs):
+        self.calls.append((query, projection, kwargs))
+        return FakeCursor([{"city": "a", "date": "2025-01-01"}])
+
+
+def test_stream_builds_keyset_query(monkeypatch):
+    collection = FakeCollection()
+
+    async def get_collection(name):
+        return collection
+
+    monkeypatch.setattr("repositories.weather_repository.get_collection", get_collection)
+    repo = WeatherRepository()
+
+    async def run():
+        return [d async for d in repo.stream({"city": {"$in": ["a", "b"]}}, projection={"records": 1},
+                                             after=("a", "2025-01-01"), batch_size=50, raw=True,
+                                             time_limit_ms=0)]
+
+    assert asyncio.run(run()) == [{"city": "a", "date": "2025-01-01"}]
+    query, projection, kwargs = collection.calls[0]
+    assert query == {"$and": [
+        {"city": {"$in": ["a", "b"]}},
+        {"$or": [{"city": {"$gt": "a"}}, {"city": "a", "date": {"$gt": "2025-01-01"}}]},
+    ]}
+    assert projection == {"records": 1}
+    assert kwargs["sort"] == [("city", 1), ("date", 1)]
+    assert kwargs["batch_size"] == 50
+    assert kwargs["max_time_ms"] is None
+    assert collection.codec_options.document_class.__name__ == "RawBSONDocument"
@@ -0,0 +1,317 @@
+import asyncio
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from models.city import City
+from repositories import weather_repository
+from services.weather_service import (
+    DAILY_COLUMN_KEYS, ForecastEntry, HOURLY_COLUMN_KEYS, WeatherService, match_columns, normalize_selection,
+    RECORD_VARIABLES,
+)
+
+DAY = 86400
+
+
+class FakeVariable:
+    def __init__(self, values, key):
+        self.values = np.asarray(values, dtype=np.float32)
+        self.variable, self.aggregation, self.altitude = key
+
+    def Variable(self):
+        return self.variable
+
+    def Aggregation(self):
+        return self.aggregation
+
+    def Altitude(self):
+        return self.altitude
+
+    def ValuesAsNumpy(self):
+        return self.values
+
+
+class FakeDaily:
+    def __init__(self, start, columns):
+        self.start = start
+        self.columns = columns
+
+    def Time(self):
+        return self.start
+
+    def TimeEnd(self):
+        return self.start + DAY * len(self.columns[0].values)
+
+    def Interval(self):
+        return DAY
+
+    def VariablesLength(self):
+        return len(self.columns)
+
+    def Variables(self, i):
+        return self.columns[i]
+
+
+class FakeResponse:
+    def __init__(self, daily):
+        self.daily = daily
+
+    def Daily(self):
+        return self.daily
+
+
+def _records(days, past_days, variables=RECORD_VARIABLES):
+    return {
+        f"2025-01-{i + 1:02d}": {var: float(i) for var in variables}
+        for i in range(days)
+    }
+
+
+def test_normalize_selection_defaults_and_order():
+    assert normalize_selection() == (tuple(RECORD_VARIABLES), 7, 7)
+    variables, past, forecast = normalize_selection(
+        ["relative_humidity_2m_max_pct", "temperature_2m_max_c"], 3, 16
+    )
+    assert variables == ("temperature_2m_max_c", "relative_humidity_2m_max_pct")
+    assert (past, forecast) == (3, 16)
+
+
+@pytest.mark.parametrize("args", [(["snowfall"], 0, 0), ([], 93, 0), ([], 0, 17)])
+def test_normalize_selection_rejects_invalid(args):
+    with pytest.raises(ValueError):
+        normalize_selection(*args)
+
+
+def test_parse_daily_response_maps_variables_by_name():
+    svc = WeatherService()
+    # Columns arrive in neither request nor table order; temperature min shares max's variable.
+    response = FakeResponse(FakeDaily(1735689600, [
+        FakeVariable([-3.0, -4.0], DAILY_COLUMN_KEYS["temperature_2m_min_c"]),
+        FakeVariable([1.5, 2.5], DAILY_COLUMN_KEYS["temperature_2m_max_c"]),
+        FakeVariable([70.0, float("nan")], DAILY_COLUMN_KEYS["relative_humidity_2m_max_pct"]),
+    ]))
+    records = svc.parse_daily_response(
+        response, ["relative_humidity_2m_max_pct", "temperature_2m_max_c"]
+    )
+    assert records == {
+        "2025-01-01": {"relative_humidity_2m_max_pct": 70, "temperature_2m_max_c": 1.5},
+        "2025-01-02": {"relative_humidity_2m_max_pct": None, "temperature_2m_max_c": 2.5},
+    }
+    # A requested variable the response does not hold is an error, not a shifted column.
+    assert svc.parse_daily_response(response, ["precipitation_sum_mm", "temperature_2m_max_c"]) == {}
+    with pytest.raises(ValueError, match="precipitation_sum_mm"):
+        match_columns(response.Daily(), ["precipitation_sum_mm"], DAILY_COLUMN_KEYS)
+
+
+def test_forecast_entry_answers_subsets():
+    entry = ForecastEntry(RECORD_VARIABLES, 7, 7, _records(14, 7))
+    assert entry.covers(("temperature_2m_max_c",), 2, 3)
+    assert not entry.covers(("temperature_2m_max_c",), 8, 3)
+    subset = entry.select(("temperature_2m_max_c",), 2, 3)
+    assert list(subset) == ["2025-01-06", "2025-01-07", "2025-01-08", "2025-01-09", "2025-01-10"]
+    assert subset["2025-01-08"] == {"temperature_2m_max_c": 7.0}
+
+
+def test_get_forecast_by_city_grows_cache_to_superset():
+    svc = WeatherService()
+    fetches = []
+
+    geocoded = []
+
+    async def geocoding(city):
+        geocoded.append(city)
+        return City("London", "GB", 51.5, -0.1, population=8_961_989)
+
+    async def upsert(city):
+        return True
+
+    async def forecast(lat, lon, variables, past_days, forecast_days):
+        fetches.append((tuple(variables), past_days, forecast_days))
+        return _records(past_days + forecast_days, past_days, variables)
+
+    async def save_records(*args):
+        return None
+
+    svc.get_geocoding = geocoding
+    svc.city_repo.upsert = upsert
+    svc.get_forecast = forecast
+    svc.save_records = save_records
+
+    async def run():
+        await svc.get_forecast_by_city("London", ["temperature_2m_max_c"])
+        await svc.get_forecast_by_city("London", ["precipitation_sum_mm"], 2, 10)
+        await svc.get_forecast_by_city("london", ["temperature_2m_max_c", "precipitation_sum_mm"], 7, 3)
+
+    asyncio.run(run())
+    assert fetches == [
+        (("temperature_2m_max_c",), 7, 7),
+        (("temperature_2m_max_c", "precipitation_sum_mm"), 7, 10),
+    ]
+    # Geocoded once; later requests resolve the city from the index.
+    assert geocoded == ["London"]
+
+
+class FakeHourlyResponse:
+    def __init__(self, hourly):
+        self.hourly = hourly
+
+    def Hourly(self):
+        return self.hourly
+
+    def UtcOffsetSeconds(self):
+        return 3600
+
+
+def test_parse_hourly_response_is_columnar():
+    svc = WeatherService()
+    hourly = FakeDaily(1735689600, [
+        FakeVariable(np.arange(72) * 2, HOURLY_COLUMN_KEYS["precipitation_mm"]),
+        FakeVariable(np.arange(72), HOURLY_COLUMN_KEYS["temperature_2m_c"]),
+    ])
+    hourly.Interval = lambda: 3600
+    forecast = svc.parse_hourly_response(
+        FakeHourlyResponse(hourly), ["temperature_2m_c", "precipitation_mm"], 72
+    )
+    assert forecast.start_time == 1735689600
+    assert forecast.interval_seconds == 3600
+    assert forecast.utc_offset_seconds == 3600
+    assert forecast.count == 72
+    assert forecast.columns["precipitation_mm"].dtype == np.float32
+    np.testing.assert_array_equal(forecast.columns["temperature_2m_c"], np.arange(72))
+
+    subset = forecast.select(["precipitation_mm"], 48)
+    assert list(subset.columns) == ["precipitation_mm"]
+    assert subset.count == 48
+    assert forecast.covers(["temperature_2m_c"], 72)
+    assert not forecast.covers(["wind_speed_10m_kmh"], 24)
+
+
+def test_nearby_cities_and_coordinates_share_a_grid_forecast():
+    svc = WeatherService()
+    svc.grid_resolution = 0.1
+    svc.cities.add(City("London", "GB", 51.51, -0.13, population=8_961_989))
+    svc.cities.add(City("City of Westminster", "GB", 51.50, -0.12, population=255_324))
+    fetches, saved = [], []
+
+    async def forecast(lat, lon, variables, past_days, forecast_days):
+        fetches.append((lat, lon))
+        return _records(past_days + forecast_days, past_days, variables)
+
+    async def save_records(records, city, fetch_date):
+        saved.append(city)
+
+    svc.get_forecast = forecast
+    svc.save_records = save_records
+
+    async def run():
+        await svc.get_forecast_by_city("London")
+        await svc.get_forecast_by_city("City of Westminster")
+        return await svc.get_forecast_by_coordinates(51.515, -0.135)
+
+    nearest, grid, records = asyncio.run(run())
+    assert fetches == [(51.5, -0.1)]
+    # One fetch, stored once per city that asked for it today.
+    assert saved == ["London", "City of Westminster"]
+    assert grid == (51.5, -0.1)
+    assert nearest.name == "London"
+    assert len(records) == 14
+
+    with pytest.raises(ValueError):
+        asyncio.run(svc.get_forecast_by_coordinates(91, 0))
+
+
+class FakeWeatherCollection:
+    """Applies UpdateOne upserts ($set with dotted paths, $setOnInsert) and filtered, sorted finds."""
+
+    def __init__(self):
+        self.docs = []
+
+    @staticmethod
+    def _matches(doc, query):
+        for field, cond in query.items():
+            value = doc.get(field)
+            if isinstance(cond, dict):
+                if "$gte" in cond and not value >= cond["$gte"]:
+                    return False
+                if "$lte" in cond and not value <= cond["$lte"]:
+                    return False
+            elif value != cond:
+                return False
+        return True
+
+    async def bulk_write(self, ops, ordered=True):
+        matched = upserted = 0
+        for op in ops:
+            doc = next((d for d in self.docs if self._matches(d, op._filter)), None)
+            if doc is None:
+                doc = dict(op._filter, **op._doc.get("$setOnInsert", {}))
+                self.docs.append(doc)
+                upserted += 1
+            else:
+                matched += 1
+            for path, value in op._doc.get("$set", {}).items():
+                *parents, leaf = path.split(".")
+                target = doc
+                for key in parents:
+                    target = target.setdefault(key, {})
+                target[leaf] = value
+        return SimpleNamespace(matched_count=matched, upserted_count=upserted)
+
+    def find(self, query, projection=None, sort=None, **kwargs):
+        docs = [d for d in self.docs if self._matches(d, query)]
+        for field, direction in reversed(sort or []):
+            docs.sort(key=lambda d: d[field], reverse=direction < 0)
+        return FakeCursor(docs)
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def __aiter__(self):
+        for doc in self.docs:
+            yield doc
+
+
+def test_wider_fetch_on_the_same_day_is_merged_into_history(monkeypatch):
+    collection = FakeWeatherCollection()
+
+    async def get_collection(name):
+        return collection
+
+    monkeypatch.setattr(weather_repository, "get_collection", get_collection)
+    svc = WeatherService()
+    svc.cities.add(City("London", "GB", 51.51, -0.13, population=8_961_989))
+    today = date.today()
+
+    async def forecast(lat, lon, variables, past_days, forecast_days):
+        return {
+            (today + timedelta(days=i)).isoformat(): {var: float(i) for var in variables}
+            for i in range(-past_days, forecast_days)
+        }
+
+    svc.get_forecast = forecast
+
+    async def run():
+        await svc.get_forecast_by_city("London", ["temperature_2m_max_c"], 1, 2)
+        await svc.get_forecast_by_city("London", ["precipitation_sum_mm"], 3, 5)
+        # Served from the grid entry: stores nothing new and must not narrow what is stored.
+        await svc.get_forecast_by_city("London", ["temperature_2m_max_c"], 1, 1)
+        return await svc.get_history(
+            "London", (today - timedelta(days=3)).isoformat(), (today + timedelta(days=4)).isoformat()
+        )
+
+    days, _, columns = asyncio.run(run())
+    assert len(collection.docs) == 1
+    assert len(days) == 8
+    # The second fetch was the union of both selections; every value of it was kept.
+    np.testing.assert_array_equal(columns["temperature_2m_max_c"], np.arange(-3, 5, dtype=np.float64))
+    np.testing.assert_array_equal(columns["precipitation_sum_mm"], np.arange(-3, 5, dtype=np.float64))
@@ -0,0 +1,98 @@
+import asyncio
+
+from core import metrics
+from core.write_behind import WriteBehindQueue
+
+
+class Sink:
+    def __init__(self, delay=0.0, fail=False):
+        self.batches = []
+        self.delay = delay
+        self.fail = fail
+
+    async def flush(self, batch):
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            return None
+        self.batches.append(list(batch))
+        return len(batch)
+
+
+def test_flushes_full_batches_without_waiting_for_the_interval():
+    async def run():
+        sink = Sink()
+        queue = WriteBehindQueue("wb_size", sink.flush, batch_size=3, flush_interval=60)
+        queue.start()
+        for i in range(6):
+            await queue.put(i)
+        await asyncio.sleep(0.05)
+        assert sink.batches == [[0, 1, 2], [3, 4, 5]]
+        await queue.close()
+
+    asyncio.run(run())
+
+
+def test_flushes_partial_batch_after_interval():
+    async def run():
+        sink = Sink()
+        queue = WriteBehindQueue("wb_time", sink.flush, batch_size=100, flush_interval=0.05)
+        queue.start()
+        await queue.put("a")
+        await queue.put("b")
+        await asyncio.sleep(0.02)
+        assert sink.batches == []
+        await asyncio.sleep(0.1)
+        assert sink.batches == [["a", "b"]]
+        await queue.close()
+
+    asyncio.run(run())
+
+
+def test_put_waits_when_queue_is_full():
+    async def run():
+        sink = Sink(delay=0.2)
+        queue = WriteBehindQueue("wb_backpressure", sink.flush, batch_size=1, flush_interval=0.01, max_queue=2)
+        queue.start()
+        await queue.put(0)
+        await asyncio.sleep(0.01)  # 0 is being flushed
+        await queue.put(1)
+        await queue.put(2)
+        blocked = asyncio.create_task(queue.put(3))
+        await asyncio.sleep(0.05)
+        assert not blocked.done()
+        await asyncio.wait_for(blocked, 1)
+        await queue.close()
+        assert [b[0] for b in sink.batches] == [0, 1, 2, 3]
+
+    asyncio.run(run())
+
+
+def test_close_flushes_everything_queued_and_late_writes():
+    async def run():
+        sink = Sink()
+        queue = WriteBehindQueue("wb_close", sink.flush, batch_size=100, flush_interval=60)
+        queue.start()
+        for i in range(5):
+            await queue.put(i)
+        await queue.close()
+        assert sink.batches == [[0, 1, 2, 3, 4]]
+        await queue.put(5)
+        assert sink.batches[-1] == [5]
+
+    asyncio.run(run())
+
+
+def test_metrics_track_depth_latency_and_failures():
+    async def run():
+        queue = WriteBehindQueue("wb_metrics", Sink(fail=True).flush, batch_size=2, flush_interval=60)
+        queue.start()
+        await queue.put(1)
+        await queue.put(2)
+        await queue.close()
+
+    asyncio.run(run())
+    snap = metrics.snapshot()
+    assert snap["wb_metrics_failed_total"] == 2
+    assert snap["wb_metrics_written_total"] == 0
+    assert snap["wb_metrics_queue_depth"] == 0
+    assert snap["wb_metrics_flush_seconds"]["count"] == 1
@@ -17,7 +17,9 @@ const Account = () => {
     const user = localStorage.getItem("climateapp_currentUser");
     if (user) {
       const parsedUser = JSON.parse(user);
-      fetch(`http://localhost:8089/v1/user/me/${parsedUser.email}`)
+      fetch(`http://localhost:8089/v1/user/me/${parsedUser.email}`, {
+        headers: parsedUser.accessToken ? { Authorization: `Bearer ${parsedUser.accessToken}` } : {},
+      })
         .then(async (res) => {
           if (!res.ok) throw new Error("Failed to fetch user info");
           const meData = await res.json();
@@ -26,7 +28,8 @@ const Account = () => {
               let apiKey = null;
               if (res.ok) {
                 const data = await res.json();
-                apiKey = data?.value || null;
+                // Only a prefix is returned after creation; keep the full key if this browser has it.
+                apiKey = parsedUser.apiKey || (data?.prefix ? `${data.prefix}…` : null);
               }
               setCurrentUser({
                 ...parsedUser,